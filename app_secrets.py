@@ -0,0 +1,16 @@
+# app_secrets.py
+import os
+
+
+def get_secret(name, default=""):
+    """
+    ✅ st.secrets → 환경변수 순서로 조회 (호출 시점에만 읽음)
+    - secrets.toml 이 없거나 키가 없어도 import/시작 단계에서 죽지 않음
+    """
+    try:
+        import streamlit as st
+
+        value = st.secrets.get(name)
+    except Exception:
+        value = None
+    return value or os.environ.get(name, default)
@@ -0,0 +1,117 @@
+# benchmarks/bench_dart_parser.py
+"""
+✅ DART 공시 파서 벤치마크 (기존 BeautifulSoup 방식 vs 단일 순회 lxml iterparse)
+
+사용 예:
+    # 실제 공시 XML 파일 (document.xml ZIP 안의 본문) 로 측정
+    python benchmarks/bench_dart_parser.py data/docs/20240515000123.xml ...
+    # 파일이 없으면 사업보고서 크기(1/5/20MB)의 합성 문서로 측정
+    python benchmarks/bench_dart_parser.py --sizes-mb 1 5 20
+
+- 시간(초), 추출 문단/표 수, tracemalloc 최대 메모리(MB) 출력
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+import warnings
+
+from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dart_parser import parse_dart_document  # noqa: E402
+
+warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+
+
+def legacy_parse(xml_content):
+    """
+    ✅ 기존 fetch_disclosure_with_tables 의 BeautifulSoup 로직 그대로
+    """
+    soup = BeautifulSoup(xml_content, "lxml")
+    paragraphs = [
+        tag.get_text(strip=True)
+        for tag in soup.find_all(["p", "div", "span", "tt"])
+        if tag.get_text(strip=True)
+    ]
+    table_texts = []
+    for table in soup.find_all("table"):
+        rows = []
+        for tr in table.find_all("tr"):
+            cols = [td.get_text(strip=True) for td in tr.find_all(["td", "th"])]
+            if any(cols):
+                rows.append("\t".join(cols))
+        if rows:
+            table_texts.append("\n".join(rows))
+    return paragraphs, table_texts
+
+
+def new_parse(xml_content):
+    doc = parse_dart_document(xml_content)
+    return doc.paragraphs, doc.tables
+
+
+def synthetic_report(target_bytes, seed=0):
+    """
+    ✅ 사업보고서 구조를 흉내낸 합성 XML (섹션/문단/SPAN/재무표 반복)
+    """
+    rng = random.Random(seed)
+    words = ["매출액", "영업이익", "당기순이익", "증가", "감소", "전년", "대비", "사업", "부문", "반도체", "수출"]
+    parts = ['<?xml version="1.0" encoding="utf-8"?>\n<DOCUMENT><BODY>']
+    size = 0
+    section = 0
+    while size < target_bytes:
+        section += 1
+        chunk = [f"<SECTION-1><TITLE>{section}. 사업의 내용</TITLE>"]
+        for _ in range(20):
+            sentence = " ".join(rng.choice(words) for _ in range(25))
+            chunk.append(f"<P>{sentence} <SPAN USERMARK=\"B\">{rng.choice(words)}</SPAN> 입니다.</P>")
+        chunk.append('<TABLE BORDER="1"><THEAD><TR><TH>과목</TH><TH>당기</TH><TH>전기</TH></TR></THEAD><TBODY>')
+        for w in words:
+            chunk.append(
+                f"<TR><TD><P>{w}</P></TD><TD>{rng.randint(-9_999_999, 99_999_999):,}</TD>"
+                f"<TD>({rng.randint(1, 9_999_999):,})</TD></TR>"
+            )
+        chunk.append("</TBODY></TABLE></SECTION-1>")
+        text = "".join(chunk)
+        parts.append(text)
+        size += len(text.encode("utf-8"))
+    parts.append("</BODY></DOCUMENT>")
+    return "".join(parts)
+
+
+def measure(func, xml_content):
+    tracemalloc.start()
+    start = time.perf_counter()
+    paragraphs, tables = func(xml_content)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, len(paragraphs), sum(len(p) for p in paragraphs), len(tables), peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*", help="실제 공시 XML 파일 경로")
+    parser.add_argument("--sizes-mb", nargs="+", type=float, default=[1, 5, 20])
+    args = parser.parse_args()
+
+    inputs = []
+    for path in args.files:
+        with open(path, "rb") as f:
+            raw = f.read()
+        inputs.append((os.path.basename(path), raw.decode("utf-8", errors="replace")))
+    if not inputs:
+        inputs = [(f"synthetic {mb:g}MB", synthetic_report(int(mb * 1e6))) for mb in args.sizes_mb]
+
+    print(f"{'input':<28}{'parser':<10}{'sec':>8}{'paras':>9}{'chars':>12}{'tables':>8}{'peakMB':>9}")
+    for name, xml_content in inputs:
+        for label, func in (("bs4", legacy_parse), ("iterparse", new_parse)):
+            sec, n_par, n_chars, n_tab, peak = measure(func, xml_content)
+            print(f"{name:<28}{label:<10}{sec:>8.2f}{n_par:>9,}{n_chars:>12,}{n_tab:>8}{peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/bench_vector_index.py
+"""
+✅ 벡터 인덱스 recall vs latency 벤치마크 (flat 정확 검색 기준)
+
+사용 예:
+    python benchmarks/bench_vector_index.py --n 200000 --dim 384 --queries 500
+    python benchmarks/bench_vector_index.py --n 1000000 --kinds ivfpq --nprobe 8 16 32 64
+
+- 문장 임베딩과 비슷하게 군집된 가우시안 벡터를 생성 → L2 정규화
+- IndexFlatIP 결과를 정답으로 recall@k 계산
+- 쿼리 1건당 평균 지연시간(ms) 출력 → 10ms 이하 유지되는 efSearch/nprobe 선택 후
+  VectorStore.tune(ef_search=..., nprobe=...) 로 저장
+"""
+import argparse
+import os
+import sys
+import time
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vector_store import DEFAULT_INDEX_PARAMS, build_index, normalize, search_parameters  # noqa: E402
+
+
+def make_vectors(n, dim, n_clusters, seed):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    assign = rng.integers(0, n_clusters, size=n)
+    vecs = centers[assign] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    return normalize(vecs)
+
+
+def timed_search(index, queries, k, params, threads):
+    build_threads = faiss.omp_get_max_threads()
+    faiss.omp_set_num_threads(threads)
+    start = time.perf_counter()
+    _, ids = index.search(queries, k, params=params)
+    elapsed = time.perf_counter() - start
+    faiss.omp_set_num_threads(build_threads)
+    return ids, elapsed * 1000 / len(queries)
+
+
+def recall_at_k(truth, found):
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    return hits / truth.size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--kinds", nargs="+", default=["hnsw", "ivfpq"])
+    parser.add_argument("--ef-search", nargs="+", type=int, default=[16, 32, 64, 128, 256])
+    parser.add_argument("--nprobe", nargs="+", type=int, default=[4, 8, 16, 32, 64])
+    parser.add_argument("--threads", type=int, default=1, help="1 → 단일 쿼리 지연시간 기준")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data = make_vectors(args.n, args.dim, args.clusters, args.seed)
+    queries = make_vectors(args.queries, args.dim, args.clusters, args.seed + 1)
+    ids = np.arange(args.n, dtype=np.int64)
+    params = dict(DEFAULT_INDEX_PARAMS)
+
+    print(f"N={args.n:,} dim={args.dim} queries={args.queries} k={args.k} threads={args.threads}")
+    print(f"{'index':<8}{'param':<16}{'build(s)':>10}{'recall':>10}{'ms/query':>10}")
+
+    start = time.perf_counter()
+    flat = build_index("flat", args.dim, params)
+    flat.add_with_ids(data, ids)
+    build_s = time.perf_counter() - start
+    truth, ms = timed_search(flat, queries, args.k, None, args.threads)
+    print(f"{'flat':<8}{'-':<16}{build_s:>10.1f}{1.0:>10.3f}{ms:>10.3f}")
+
+    for kind in args.kinds:
+        start = time.perf_counter()
+        train = data[np.random.default_rng(args.seed).choice(args.n, min(args.n, 100_000), replace=False)]
+        index = build_index(kind, args.dim, params, train_vectors=train if kind == "ivfpq" else None)
+        index.add_with_ids(data, ids)
+        build_s = time.perf_counter() - start
+
+        sweep = args.ef_search if kind == "hnsw" else args.nprobe
+        name = "efSearch" if kind == "hnsw" else "nprobe"
+        for value in sweep:
+            if kind == "hnsw":
+                params["ef_search"] = value
+            else:
+                params["nprobe"] = value
+            found, ms = timed_search(index, queries, args.k, search_parameters(kind, params), args.threads)
+            print(f"{kind:<8}{f'{name}={value}':<16}{build_s:>10.1f}"
+                  f"{recall_at_k(truth, found):>10.3f}{ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# corp_registry.py
+import tempfile
+import threading
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+
+import local_db
+from http_client import get_http_client
+
+CORP_CODE_URL = "https://opendart.fss.or.kr/api/corpCode.xml"
+REGISTRY_DB_PATH = "data/corp_registry.db"
+REGISTRY_TTL_SECONDS = 24 * 60 * 60  # 하루에 한 번만 변경 여부 확인
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024  # ZIP은 1MB씩 임시파일로 스트리밍
+INSERT_BATCH_ROWS = 5000  # SQLite에 이 단위로 흘려 넣음 → 행 리스트를 통째로 들고 있지 않음
+
+
+# ================================
+# ✅ corpCode.xml 스트리밍 파서
+# ================================
+def iter_corp_codes(xml_stream, listed_only=False):
+    """
+    ✅ corpCode.xml → (corp_code, corp_name, stock_code) 스트리밍
+    - iterparse로 <list> 하나씩 읽고 바로 clear → 메모리 사용량 일정
+    - listed_only=True 면 stock_code 없는(비상장) 회사는 파싱 중에 제외
+    """
+    context = ET.iterparse(xml_stream, events=("start", "end"))
+    root = None
+    for event, elem in context:
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+        if elem.tag != "list":
+            continue
+
+        corp_code = (elem.findtext("corp_code") or "").strip()
+        corp_name = (elem.findtext("corp_name") or "").strip()
+        stock_code = (elem.findtext("stock_code") or "").strip()
+        # 처리한 <list>는 루트에서 떼어내 트리가 자라지 않게 함
+        elem.clear()
+        root.clear()
+
+        if not corp_code or not corp_name:
+            continue
+        if listed_only and not stock_code:
+            continue
+        yield corp_code, corp_name, stock_code
+
+
+def iter_batches(rows, size=INSERT_BATCH_ROWS):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class CorpRegistry:
+    """
+    ✅ DART 고유번호(corp_code) 레지스트리
+    - corpCode.xml을 SQLite에 저장 → 재실행마다 다시 받지 않음
+    - TTL 경과 시 ETag/Last-Modified 조건부 요청으로 변경된 경우만 갱신
+    - 이름 → corp_code/stock_code 조회는 메모리 dict 인덱스로 O(1)
+    - 다운로드/파싱/저장 모두 스트리밍 → 레지스트리 크기와 무관하게 메모리 일정
+    """
+
+    def __init__(self, api_key, db_path=REGISTRY_DB_PATH, ttl_seconds=REGISTRY_TTL_SECONDS,
+                 listed_only=False):
+        self.api_key = api_key
+        self.ttl_seconds = ttl_seconds
+        self.listed_only = listed_only
+        self._conn = local_db.connect(db_path)
+        self._lock = threading.RLock()
+        self._init_schema()
+
+        self._checked_at = 0.0
+        self._index = None  # (회사명 → 행, 회사명 목록) 한 번에 교체
+
+    def _init_schema(self):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS corps ("
+                "corp_code TEXT PRIMARY KEY, corp_name TEXT NOT NULL, stock_code TEXT NOT NULL DEFAULT '')"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_corps_name ON corps(corp_name)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    # ================================
+    # ✅ 메타 정보 (ETag, 마지막 확인 시각)
+    # ================================
+    def _get_meta(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, **values):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(k, str(v)) for k, v in values.items() if v is not None],
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM corps").fetchone()[0]
+
+    # ================================
+    # ✅ 갱신 (TTL + 조건부 요청)
+    # ================================
+    def refresh(self, force=False):
+        """
+        ✅ 필요할 때만 corpCode.xml 재다운로드
+        - 반환값: 실제로 목록이 바뀌었으면 True
+        """
+        now = time.time()
+        with self._lock:
+            if not force and now - self._checked_at < self.ttl_seconds:
+                return False
+
+            has_rows = len(self) > 0
+            checked_at = float(self._get_meta("checked_at", 0) or 0)
+            if not force and has_rows and now - checked_at < self.ttl_seconds:
+                self._checked_at = checked_at
+                return False
+
+            headers = {}
+            if has_rows and not force:
+                etag = self._get_meta("etag")
+                last_modified = self._get_meta("last_modified")
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+
+            try:
+                res = get_http_client().get(
+                    CORP_CODE_URL,
+                    params={"crtfc_key": self.api_key},
+                    headers=headers,
+                    timeout=60,
+                    stream=True,
+                )
+            except Exception as e:
+                if has_rows:
+                    print(f"⚠️ corpCode.xml 갱신 실패 → 기존 목록 사용: {e}")
+                    self._checked_at = now
+                    return False
+                raise
+
+            with res:
+                if res.status_code == 304:
+                    with self._conn:
+                        self._set_meta(checked_at=now)
+                    self._checked_at = now
+                    return False
+                if res.status_code != 200:
+                    if has_rows:
+                        print(f"⚠️ corpCode.xml 갱신 실패({res.status_code}) → 기존 목록 사용")
+                        self._checked_at = now
+                        return False
+                    raise Exception("DART API 연결 실패")
+
+                count = self._load_zip_stream(res)
+                with self._conn:
+                    self._set_meta(
+                        checked_at=now,
+                        etag=res.headers.get("ETag"),
+                        last_modified=res.headers.get("Last-Modified"),
+                    )
+
+            self._checked_at = now
+            self._index = None
+            print(f"✅ DART 고유번호 {count}건 갱신")
+            return True
+
+    def _load_zip_stream(self, res):
+        """
+        ✅ 응답 본문 → 임시파일 → ZIP 멤버 스트림 → iterparse → SQLite 배치 insert
+        - 파싱 도중 실패하면 트랜잭션 롤백 → 기존 목록 유지
+        """
+        count = 0
+        with tempfile.TemporaryFile() as tmp:
+            for block in res.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                tmp.write(block)
+            tmp.seek(0)
+
+            with zipfile.ZipFile(tmp) as z, z.open(z.namelist()[0]) as xml_stream:
+                rows = iter_corp_codes(xml_stream, listed_only=self.listed_only)
+                with self._conn:
+                    self._conn.execute("DELETE FROM corps")
+                    for batch in iter_batches(rows):
+                        self._conn.executemany(
+                            "INSERT OR REPLACE INTO corps (corp_code, corp_name, stock_code) "
+                            "VALUES (?, ?, ?)",
+                            batch,
+                        )
+                        count += len(batch)
+        return count
+
+    # ================================
+    # ✅ 메모리 인덱스 조회
+    # ================================
+    def _ensure_index(self):
+        """
+        ✅ (by_name, names) 반환 - 호출하는 쪽은 반환값만 사용
+          (다른 세션의 refresh() 가 self._index 를 None 으로 바꿔도 안전)
+        """
+        index = self._index
+        if index is not None:
+            return index
+        with self._lock:
+            if self._index is not None:
+                return self._index
+            by_name = {}
+            names = []
+            # 상장사(stock_code 있음)를 먼저 → 동명 회사는 상장사가 우선 매핑
+            cursor = self._conn.execute(
+                "SELECT corp_code, corp_name, stock_code FROM corps "
+                "ORDER BY stock_code = '', corp_name"
+            )
+            for corp_code, corp_name, stock_code in cursor:
+                if corp_name in by_name:
+                    continue
+                by_name[corp_name] = {
+                    "corp_code": corp_code,
+                    "corp_name": corp_name,
+                    "stock_code": stock_code,
+                }
+                names.append(corp_name)
+            self._index = (by_name, names)
+            return self._index
+
+    def lookup(self, corp_name):
+        """
+        ✅ 회사명 → {"corp_code", "corp_name", "stock_code"} (없으면 None)
+        """
+        by_name, _ = self._ensure_index()
+        return by_name.get(corp_name)
+
+    def names(self, listed_only=False):
+        """
+        ✅ selectbox 옵션용 회사명 목록 (상장사 먼저)
+        """
+        by_name, names = self._ensure_index()
+        if listed_only:
+            return [n for n in names if by_name[n]["stock_code"]]
+        return names
+
+    def iter_rows(self, listed_only=False):
+        """
+        ✅ (corp_code, corp_name, stock_code) 커서 스트리밍 (CSV 내보내기 등)
+        """
+        sql = "SELECT corp_code, corp_name, stock_code FROM corps"
+        if listed_only:
+            sql += " WHERE stock_code != ''"
+        with self._lock:
+            rows = self._conn.execute(sql)
+        while True:
+            with self._lock:
+                batch = rows.fetchmany(INSERT_BATCH_ROWS)
+            if not batch:
+                break
+            yield from batch
@@ -1,16 +1,44 @@
-from bs4 import BeautifulSoup
-import requests
+import asyncio
 import json
 import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-def crawl_naver_view_titles(keyword, limit=10):
-    base_url = "https://search.naver.com/search.naver?where=view&sm=tab_jum&query="
-    extra_url = "&sm=tab_smr&sort=0&ssc=tab.news.all"
-    search_url = base_url + keyword + extra_url
+from http_client import get_http_client
+
+PER_HOST_CONCURRENCY = int(os.environ.get("CRAWL_PER_HOST_CONCURRENCY", "2"))  # 같은 언론사 동시 요청 수
+ARTICLE_TIMEOUT = float(os.environ.get("CRAWL_ARTICLE_TIMEOUT", "10"))
+EXTRACT_WORKERS = int(os.environ.get("CRAWL_EXTRACT_WORKERS", "2"))  # 본문 추출 프로세스 수
+ARTICLE_MAX_CHARS = 4000
+SEARCH_CACHE_SECONDS = int(os.environ.get("CRAWL_SEARCH_CACHE_SECONDS", "600"))  # 같은 키워드 검색 결과 재사용
+
+_TRACKING_PARAMS = re.compile(r"^(utm_|fbclid$|gclid$|ref$|from$)")
+_CANONICAL_LINK = re.compile(
+    r"<link[^>]+rel=[\"']canonical[\"'][^>]*href=[\"']([^\"']+)[\"']|"
+    r"<link[^>]+href=[\"']([^\"']+)[\"'][^>]*rel=[\"']canonical[\"']",
+    re.IGNORECASE,
+)
+
+
+def canonical_url(url):
+    """
+    ✅ 중복 판별용 URL 정규화 (스킴/호스트 소문자, 추적 파라미터·fragment·끝 슬래시 제거, 쿼리 정렬)
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not _TRACKING_PARAMS.match(k))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
 
-    headers = {"User-Agent": "Mozilla/5.0"}
-    r = requests.get(search_url, headers=headers)
-    soup = BeautifulSoup(r.text, "html.parser")
+
+def parse_search_results(html, limit=10):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
 
     items = soup.select(".sds-comps-vertical-layout.sds-comps-full-layout._sghYQmdqcpm83O1jqen")
 
@@ -33,10 +61,119 @@ def crawl_naver_view_titles(keyword, limit=10):
             "preview": text,
             "url": url
         })
+    return results
+
+
+# ================================
+# ✅ 기사 본문 추출 (CPU 작업 → 프로세스 풀)
+# ================================
+def extract_article(html, url):
+    """
+    ✅ 기사 HTML → (본문, canonical URL)  (프로세스 풀에서 실행되므로 모듈 최상위 함수)
+    """
+    import trafilatura
+
+    text = trafilatura.extract(html, url=url, include_comments=False, include_tables=False) or ""
+    m = _CANONICAL_LINK.search(html)
+    canonical = (m.group(1) or m.group(2)) if m else url
+    return text.strip(), canonical
+
+
+_extract_pool = None
+_extract_pool_lock = threading.Lock()
+
+
+def get_extract_pool():
+    global _extract_pool
+    if _extract_pool is None:
+        with _extract_pool_lock:
+            if _extract_pool is None:
+                _extract_pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+    return _extract_pool
+
+
+# ================================
+# ✅ 비동기 기사 수집 (호스트별 동시 요청 제한)
+# ================================
+async def _fetch_article(item, host_limits, fetched):
+    url = item["url"]
+    host = urlsplit(url).netloc.lower()
+    semaphore = host_limits.setdefault(host, asyncio.Semaphore(PER_HOST_CONCURRENCY))
+    try:
+        async with semaphore:
+            res = await asyncio.to_thread(get_http_client().get, url, timeout=ARTICLE_TIMEOUT)
+        if res.status_code != 200:
+            return item
+        loop = asyncio.get_running_loop()
+        body, canonical = await loop.run_in_executor(get_extract_pool(), extract_article, res.text, res.url or url)
+    except Exception as e:
+        print(f"⚠️ 기사 본문 수집 실패 ({url}): {e}")
+        return item
+
+    # 다른 URL 로 같은 기사에 도착한 경우 (리다이렉트/모바일 주소 등)
+    # - 이미 받은 기사들의 canonical 만 비교 (검색 결과 URL 집합과 섞으면 자기 자신과 겹쳐 전부 버려짐)
+    canonical = canonical_url(canonical)
+    if canonical in fetched:
+        return None
+    fetched.add(canonical)
+    return {**item, "body": body[:ARTICLE_MAX_CHARS], "canonical_url": canonical}
+
+
+async def iter_naver_articles(keyword, limit=10):
+    """
+    ✅ 네이버 검색 결과 → 기사 본문을 동시에 받아 도착하는 순서대로 yield
+    - 검색 결과 URL 기준 1차 중복 제거, 기사 canonical 링크 기준 2차 중복 제거
+    - 본문 수집 실패 시 검색 미리보기만 담긴 항목 그대로 반환
+    """
+    base_url = "https://search.naver.com/search.naver?where=view&sm=tab_jum&query="
+    extra_url = "&sm=tab_smr&sort=0&ssc=tab.news.all"
+    search_url = base_url + keyword + extra_url
+
+    headers = {"User-Agent": "Mozilla/5.0"}
+    # 검색 결과 페이지는 디스크 HTTP 캐시 (SEARCH_CACHE_SECONDS 안의 같은 검색은 네트워크 없이)
+    r = await asyncio.to_thread(
+        get_http_client().get, search_url, headers=headers,
+        cache=True, fresh_for=SEARCH_CACHE_SECONDS, cache_if=lambda res: "total_tit" in res.text,
+    )
+    results = parse_search_results(r.text, limit)
+
+    seen, pending = set(), []
+    for item in results:
+        key = canonical_url(item["url"])
+        if not key:
+            yield item
+            continue
+        if key in seen:
+            continue
+        seen.add(key)
+        pending.append(item)
+
+    host_limits = {}
+    fetched = set()
+    tasks = [asyncio.ensure_future(_fetch_article(item, host_limits, fetched)) for item in pending]
+    for done in asyncio.as_completed(tasks):
+        item = await done
+        if item is not None:
+            yield item
+
+
+def crawl_naver_view_titles(keyword, limit=10, on_item=None):
+    """
+    ✅ 네이버 뉴스 검색 + 기사 본문 수집 (동기 호출용)
+    - on_item(item): 기사가 도착할 때마다 호출 → 벡터DB에 바로 추가
+    """
+    async def collect():
+        items = []
+        async for item in iter_naver_articles(keyword, limit):
+            print(f"{item['rank']}. {item['title']}")
+            print(f"URL: {item['url']}")
+            print()
+            if on_item:
+                await asyncio.to_thread(on_item, item)
+            items.append(item)
+        return items
 
-        print(f"{rank_num}. {title}")
-        print(f"URL: {url}")
-        print()
+    results = sorted(asyncio.run(collect()), key=lambda x: x["rank"])
 
     # 저장
     if results:
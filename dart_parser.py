@@ -0,0 +1,168 @@
+# dart_parser.py
+import html.entities
+import io
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from lxml import etree
+
+# 안쪽 글자는 부모 문단에 합쳐지는 인라인 태그 (따로 문단으로 내보내지 않음)
+INLINE_TAGS = {"span", "a", "b", "i", "u", "em", "strong", "font", "sup", "sub", "br", "img", "usermark"}
+TABLE_TAG = "table"
+ROW_TAG = "tr"
+CELL_TAGS = {"td", "th", "te", "tu"}
+HEADER_CELL_TAGS = {"th"}
+
+_XML_DECL = re.compile(r"^\s*<\?xml[^>]*\?>")
+_SPACES = re.compile(r"\s+")
+_NUMERIC = re.compile(r"^[\s\-−+(),.%0-9△▲]+$")
+# & 뒤에 오는 문자 참조 / 이름 참조 (없으면 그냥 & 문자)
+_AMPERSAND = re.compile(r"&(#[0-9]+;|#[xX][0-9A-Fa-f]+;|[A-Za-z][A-Za-z0-9]*;)?")
+_XML_ENTITIES = {"amp;", "lt;", "gt;", "quot;", "apos;"}
+_XML_ESCAPES = {"&": "&amp;", "<": "&lt;", ">": "&gt;"}
+
+
+@dataclass
+class Table:
+    header: Optional[List[str]]
+    rows: List[List[str]]
+    context: str = ""  # 표 바로 앞 문단/작은 표 (예: "(단위 : 백만원)")
+
+    def to_text(self):
+        lines = ["\t".join(self.header)] if self.header else []
+        lines.extend("\t".join(r) for r in self.rows)
+        return "\n".join(lines)
+
+
+@dataclass
+class ParsedDocument:
+    paragraphs: List[str] = field(default_factory=list)
+    tables: List[Table] = field(default_factory=list)
+
+
+def _tag(elem):
+    tag = elem.tag
+    if not isinstance(tag, str):  # 주석/PI
+        return ""
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+def _text(elem):
+    return _SPACES.sub(" ", "".join(elem.itertext())).strip()
+
+
+def _is_numeric(cell):
+    return bool(cell) and bool(_NUMERIC.match(cell))
+
+
+def _replace_entity(m):
+    ref = m.group(1)
+    if ref is None:
+        return "&amp;"  # R&D 같은 맨 & 문자
+    if ref[0] == "#" or ref in _XML_ENTITIES:
+        return m.group(0)
+    char = html.entities.html5.get(ref)
+    if char is None:
+        return "&amp;" + ref  # 모르는 이름은 글자 그대로
+    return _XML_ESCAPES.get(char, char)
+
+
+def replace_html_entities(xml):
+    """
+    ✅ XML 에 선언되지 않은 HTML 엔티티(&nbsp; &middot; ...) → 문자, 맨 & → &amp;
+    - lxml recover 는 이런 참조를 조용히 버려서 앞뒤 단어가 붙거나 (만듭니다.&nbsp;끝 → 만듭니다.끝)
+      같은 텍스트 노드의 글자까지 잃음
+    """
+    return _AMPERSAND.sub(_replace_entity, xml)
+
+
+def _detect_header(rows, header_flags):
+    """
+    ✅ 헤더 판별
+    - 첫 행 셀이 모두 <TH>
+    - 또는 첫 행엔 숫자가 없고 아래 행에는 숫자가 있음
+    """
+    if len(rows) < 2:
+        return None, rows
+    first = rows[0]
+    if header_flags[0] or (
+        not any(_is_numeric(c) for c in first)
+        and any(_is_numeric(c) for r in rows[1:] for c in r)
+    ):
+        return first, rows[1:]
+    return None, rows
+
+
+def iter_dart_document(xml):
+    """
+    ✅ DART 공시 XML 한 번 순회 → ("paragraph", str) / ("table", Table) 스트리밍
+    - lxml iterparse(recover) → 깨진 태그가 있어도 계속 진행
+    - 처리한 요소는 바로 clear(keep_tail) → 부모 문단에 자식 글자가 중복되지 않음
+    - 같은 문단이 반복되면 한 번만 내보냄
+    - HTML 엔티티는 파싱 전에 문자로 바꿈 (replace_html_entities)
+    """
+    if isinstance(xml, bytes):
+        xml = xml.decode("utf-8", errors="replace")
+    xml = replace_html_entities(_XML_DECL.sub("", xml, count=1)).encode("utf-8")
+
+    seen = set()
+    last_text = ""
+    table_stack = []  # 중첩 표: [rows, header_flags, current_row, row_all_header]
+    context = etree.iterparse(
+        io.BytesIO(xml), events=("start", "end"), recover=True, huge_tree=True, encoding="utf-8"
+    )
+    for event, elem in context:
+        tag = _tag(elem)
+        if event == "start":
+            if tag == TABLE_TAG:
+                table_stack.append([[], [], None, True])
+            elif tag == ROW_TAG and table_stack:
+                table_stack[-1][2] = []
+                table_stack[-1][3] = True
+            continue
+
+        if table_stack:
+            state = table_stack[-1]
+            if tag in CELL_TAGS and state[2] is not None:
+                state[2].append(_text(elem))
+                state[3] = state[3] and tag in HEADER_CELL_TAGS
+                elem.clear(keep_tail=True)
+            elif tag == ROW_TAG:
+                row = state[2] or []
+                if any(row):
+                    state[0].append(row)
+                    state[1].append(state[3])
+                state[2] = None
+                elem.clear(keep_tail=True)
+            elif tag == TABLE_TAG:
+                rows, header_flags = table_stack.pop()[:2]
+                elem.clear(keep_tail=True)
+                if rows:
+                    header, body = _detect_header(rows, header_flags)
+                    table = Table(header=header, rows=body, context=last_text)
+                    last_text = table.to_text()[:200]
+                    yield "table", table
+            continue
+
+        if tag in INLINE_TAGS or not tag:
+            continue
+        text = _text(elem)
+        elem.clear(keep_tail=True)
+        if text and text not in seen:
+            seen.add(text)
+            last_text = text
+            yield "paragraph", text
+
+
+def parse_dart_document(xml):
+    """
+    ✅ DART 공시 XML → ParsedDocument(paragraphs, tables)
+    """
+    doc = ParsedDocument()
+    for kind, value in iter_dart_document(xml):
+        if kind == "paragraph":
+            doc.paragraphs.append(value)
+        else:
+            doc.tables.append(value)
+    return doc
@@ -0,0 +1,392 @@
+# dart_sync.py
+import datetime
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import local_db
+from http_client import get_http_client
+from rate_limiter import RateLimiter
+
+DART_LIST_URL = "https://opendart.fss.or.kr/api/list.json"
+DISCLOSURE_DB_PATH = "data/disclosures.db"
+PAGE_COUNT = 100  # list.json 최대 페이지 크기
+MAX_WINDOW_DAYS = 90  # corp_code 없이 조회하면 DART 가 3개월까지만 허용
+DART_MAX_WORKERS = int(os.environ.get("DART_MAX_WORKERS", "4"))
+ALL_CORPS = "*"  # 시장 전체 동기화 범위 키
+
+# ✅ 실적 관련 공시만 서버에서 걸러 받음 (pblntf_detail_ty 는 요청당 하나)
+EARNINGS_DETAIL_TYPES = {
+    "A001": "사업보고서",
+    "A002": "반기보고서",
+    "A003": "분기보고서",
+    "I002": "공정공시",  # 영업(잠정)실적 → report_nm 으로 한 번 더 거름
+}
+EARNINGS_KEYWORDS = ["분기보고서", "반기보고서", "사업보고서", "잠정실적"]
+
+_limiter = RateLimiter(
+    requests_per_minute=int(os.environ.get("DART_RPM", "600")),
+    max_concurrency=DART_MAX_WORKERS,
+)
+
+
+def _to_date(yyyymmdd):
+    return datetime.datetime.strptime(yyyymmdd, "%Y%m%d").date()
+
+
+def _fmt(date):
+    return date.strftime("%Y%m%d")
+
+
+def date_windows(start_date, end_date, days=MAX_WINDOW_DAYS):
+    """
+    ✅ [start, end] (YYYYMMDD) → days 일 이하 구간들
+    """
+    start, end = _to_date(start_date), _to_date(end_date)
+    while start <= end:
+        stop = min(end, start + datetime.timedelta(days=days - 1))
+        yield _fmt(start), _fmt(stop)
+        start = stop + datetime.timedelta(days=1)
+
+
+def uncovered(intervals, start_date, end_date):
+    """
+    ✅ [start, end] 중 intervals([(from, until)] 양끝 포함) 어디에도 안 들어가는 구간들
+    """
+    gaps, cursor = [], _to_date(start_date)
+    end = _to_date(end_date)
+    for bgn, until in sorted(intervals):
+        bgn, until = _to_date(bgn), _to_date(until)
+        if until < cursor:
+            continue
+        if bgn > end:
+            break
+        if bgn > cursor:
+            gaps.append((_fmt(cursor), _fmt(bgn - datetime.timedelta(days=1))))
+        cursor = max(cursor, until + datetime.timedelta(days=1))
+        if cursor > end:
+            return gaps
+    if cursor <= end:
+        gaps.append((_fmt(cursor), _fmt(end)))
+    return gaps
+
+
+def merge_intervals(intervals):
+    """
+    ✅ 겹치거나 바로 이어지는 구간 합치기 (양끝 포함 YYYYMMDD)
+    """
+    merged = []
+    for bgn, until in sorted(intervals):
+        if merged and _to_date(bgn) <= _to_date(merged[-1][1]) + datetime.timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], until))
+        else:
+            merged.append((bgn, until))
+    return merged
+
+
+def is_earnings_report(report_nm):
+    return any(k in report_nm.replace(" ", "").replace("(", "").replace(")", "") for k in EARNINGS_KEYWORDS)
+
+
+class DisclosureSync:
+    """
+    ✅ DART list.json 증분 동기화
+    - 공시유형(pblntf_ty/pblntf_detail_ty) 서버 필터 → 실적 관련 공시만 전송받음
+    - 첫 페이지로 total_page 확인 후 나머지 페이지 동시 요청 (DART 호출 한도 공유)
+    - SQLite 저장 + 범위(corp_code 또는 시장 전체)별 동기화된 구간 목록 → 다음엔 빠진 날짜만 요청
+      (떨어진 구간을 따로 기록 → 사이의 받지 않은 날짜를 동기화된 것으로 치지 않음)
+    """
+
+    def __init__(self, api_key, db_path=DISCLOSURE_DB_PATH):
+        self.api_key = api_key
+        self._conn = local_db.connect(db_path)
+        self._lock = threading.RLock()
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS disclosures ("
+                "rcept_no TEXT PRIMARY KEY, corp_code TEXT NOT NULL, corp_name TEXT NOT NULL, "
+                "stock_code TEXT NOT NULL DEFAULT '', report_nm TEXT NOT NULL, "
+                "rcept_dt TEXT NOT NULL, detail_ty TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_disclosures_corp ON disclosures(corp_code, rcept_dt)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_disclosures_dt ON disclosures(rcept_dt)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS synced_ranges ("
+                "scope TEXT NOT NULL, synced_from TEXT NOT NULL, synced_until TEXT NOT NULL, "
+                "synced_at REAL NOT NULL, PRIMARY KEY (scope, synced_from))"
+            )
+
+    # ================================
+    # ✅ list.json 페이지 요청
+    # ================================
+    def _fetch_page(self, params, page_no):
+        with _limiter.acquire():
+            res = get_http_client().get(DART_LIST_URL, params={**params, "page_no": page_no}, timeout=20)
+        data = res.json()
+        status = data.get("status")
+        if status == "013":  # 조회된 데이터 없음
+            return {"total_page": 0, "list": []}
+        if status != "000":
+            raise Exception(f"DART API 오류({status}): {data.get('message')}")
+        return data
+
+    def _fetch_all_pages(self, executor, params):
+        first = self._fetch_page(params, 1)
+        rows = list(first.get("list", []))
+        total_page = int(first.get("total_page") or 0)
+        if total_page > 1:
+            pages = executor.map(lambda p: self._fetch_page(params, p), range(2, total_page + 1))
+            for page in pages:
+                rows.extend(page.get("list", []))
+        return rows
+
+    def fetch(self, start_date, end_date, corp_code=None):
+        """
+        ✅ [start, end] 실적 관련 공시 전체 (유형 × 90일 구간 × 페이지 병렬)
+        """
+        requests_params = []
+        for bgn_de, end_de in date_windows(start_date, end_date):
+            for detail_ty in EARNINGS_DETAIL_TYPES:
+                params = {
+                    "crtfc_key": self.api_key,
+                    "bgn_de": bgn_de,
+                    "end_de": end_de,
+                    "pblntf_ty": detail_ty[0],
+                    "pblntf_detail_ty": detail_ty,
+                    "page_count": PAGE_COUNT,
+                }
+                if corp_code:
+                    params["corp_code"] = corp_code
+                requests_params.append(params)
+
+        rows = []
+        # 구간/유형은 바깥 풀, 페이지는 안쪽 풀 → 바깥 작업이 안쪽 풀 자리를 막지 않음
+        with ThreadPoolExecutor(DART_MAX_WORKERS) as outer, ThreadPoolExecutor(DART_MAX_WORKERS) as inner:
+            for params, page_rows in zip(
+                requests_params, outer.map(lambda p: self._fetch_all_pages(inner, p), requests_params)
+            ):
+                rows.extend((params["pblntf_detail_ty"], r) for r in page_rows)
+        return rows
+
+    # ================================
+    # ✅ 증분 동기화 (동기화된 구간 목록)
+    # ================================
+    def _ranges(self, *scopes):
+        """
+        ✅ [(synced_from, synced_until, synced_at)]
+        """
+        marks = ",".join("?" * len(scopes))
+        return self._conn.execute(
+            f"SELECT synced_from, synced_until, synced_at FROM synced_ranges WHERE scope IN ({marks})", scopes
+        ).fetchall()
+
+    def _missing_ranges(self, scope, start_date, end_date):
+        """
+        ✅ 아직 동기화 안 된 구간만 (시장 전체로 받은 구간은 기업 범위에서도 동기화된 것으로 봄)
+        - 동기화한 날(synced_at) 이후 날짜는 그날 뒤늦게 올라온 공시가 있을 수 있어 다시 요청
+          (지난 구간은 다시 요청하지 않음 → 다 받은 구간의 sync() 는 호출 없이 끝남)
+        """
+        covered = []
+        for bgn, until, synced_at in self._ranges(*{scope, ALL_CORPS}):
+            synced_day = datetime.date.fromtimestamp(synced_at)
+            complete_until = min(_to_date(until), synced_day - datetime.timedelta(days=1))
+            if _fmt(complete_until) >= bgn:
+                covered.append((bgn, _fmt(complete_until)))
+        return uncovered(covered, start_date, end_date)
+
+    def _record_range(self, scope, start_date, end_date):
+        """
+        ✅ 구간 목록에 [start, end] 합치기
+        - 합쳐진 구간의 synced_at 은 마지막 날(synced_until)을 받은 시각
+        """
+        existing = self._ranges(scope)
+        synced_at = {}
+        for _, until, at in existing:
+            synced_at[until] = max(synced_at.get(until, 0), at)
+        synced_at[end_date] = time.time()
+        ranges = merge_intervals([(bgn, until) for bgn, until, _ in existing] + [(start_date, end_date)])
+        self._conn.execute("DELETE FROM synced_ranges WHERE scope = ?", (scope,))
+        self._conn.executemany(
+            "INSERT INTO synced_ranges (scope, synced_from, synced_until, synced_at) VALUES (?, ?, ?, ?)",
+            [(scope, bgn, until, synced_at[until]) for bgn, until in ranges],
+        )
+
+    def sync(self, start_date, end_date, corp_code=None):
+        """
+        ✅ 빠진 구간만 받아 저장 → 새로 저장한 공시 수 반환
+        """
+        scope = corp_code or ALL_CORPS
+        with self._lock:
+            ranges = self._missing_ranges(scope, start_date, end_date)
+        if not ranges:
+            return 0
+
+        added = 0
+        for bgn_de, end_de in ranges:
+            rows = [
+                (r["rcept_no"], r["corp_code"], r["corp_name"], r.get("stock_code") or "",
+                 r["report_nm"], r["rcept_dt"], detail_ty)
+                for detail_ty, r in self.fetch(bgn_de, end_de, corp_code)
+                if detail_ty != "I002" or is_earnings_report(r["report_nm"])
+            ]
+            with self._lock, self._conn:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO disclosures "
+                    "(rcept_no, corp_code, corp_name, stock_code, report_nm, rcept_dt, detail_ty) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                added += self._conn.total_changes - before
+
+        # 빠진 구간을 모두 받았으니 [start, end] 전체가 동기화됨
+        with self._lock, self._conn:
+            self._record_range(scope, start_date, end_date)
+        print(f"✅ DART 공시 동기화 ({scope}): {ranges} → 신규 {added}건")
+        return added
+
+    def covers(self, start_date, end_date, corp_code=None):
+        """
+        ✅ [start, end] 가 이미 한 번 이상 동기화됐는지 (마지막 날 재확인은 주기 동기화가 담당)
+        """
+        with self._lock:
+            ranges = [(bgn, until) for bgn, until, _ in self._ranges(*{ALL_CORPS, corp_code or ALL_CORPS})]
+        return not uncovered(ranges, start_date, end_date)
+
+    def query(self, start_date, end_date, corp_code=None):
+        """
+        ✅ 저장된 실적 관련 공시 (최신순)
+        """
+        sql = (
+            "SELECT corp_code, corp_name, stock_code, report_nm, rcept_dt, rcept_no FROM disclosures "
+            "WHERE rcept_dt BETWEEN ? AND ?"
+        )
+        args = [start_date, end_date]
+        if corp_code:
+            sql += " AND corp_code = ?"
+            args.append(corp_code)
+        sql += " ORDER BY rcept_dt DESC, rcept_no DESC"
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        keys = ("corp_code", "corp_name", "stock_code", "report_nm", "rcept_dt", "rcept_no")
+        return [dict(zip(keys, r)) for r in rows]
+
+
+_sync = None
+_sync_lock = threading.Lock()
+
+
+def get_disclosure_sync(api_key):
+    global _sync
+    if _sync is None:
+        with _sync_lock:
+            if _sync is None:
+                _sync = DisclosureSync(api_key)
+    return _sync
+
+
+# ================================
+# ✅ 시장 전체 백그라운드 동기화 (요청 경로에서 DART 지연 제거)
+# ================================
+SYNC_INTERVAL_SECONDS = int(os.environ.get("DART_SYNC_INTERVAL", "600"))
+SYNC_LOOKBACK_DAYS = int(os.environ.get("DART_SYNC_LOOKBACK_DAYS", "90"))
+
+
+class BackgroundSync(threading.Thread):
+    """
+    ✅ 주기적으로 최근 lookback_days 일치 실적 공시를 시장 전체로 동기화하는 데몬 스레드
+    - request(start, end): 캘린더가 보고 있는 달처럼 추가 구간을 바로 동기화 요청
+      (같은 구간이 이미 대기/진행 중이면 다시 넣지 않음 → Streamlit 재실행마다 쌓이지 않음)
+    """
+
+    def __init__(self, disclosure_sync, interval_seconds=SYNC_INTERVAL_SECONDS,
+                 lookback_days=SYNC_LOOKBACK_DAYS):
+        super().__init__(name="dart-sync", daemon=True)
+        self.disclosure_sync = disclosure_sync
+        self.interval_seconds = interval_seconds
+        self.lookback_days = lookback_days
+        self._requests = queue.Queue()
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.last_synced_at = None
+
+    def request(self, start_date, end_date):
+        with self._pending_lock:
+            if (start_date, end_date) in self._pending:
+                return False
+            self._pending.add((start_date, end_date))
+        self._requests.put((start_date, end_date))
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+        self._requests.put(None)
+
+    def _sync(self, start_date, end_date):
+        try:
+            self.disclosure_sync.sync(start_date, end_date)
+            self.last_synced_at = time.time()
+        except Exception as e:
+            print(f"⚠️ 백그라운드 공시 동기화 실패 ({start_date}~{end_date}): {e}")
+
+    def run(self):
+        while not self._stop_event.is_set():
+            today = datetime.date.today()
+            self._sync(_fmt(today - datetime.timedelta(days=self.lookback_days)), _fmt(today))
+
+            deadline = time.monotonic() + self.interval_seconds
+            while not self._stop_event.is_set():
+                try:
+                    item = self._requests.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is not None:
+                    self._sync(*item)
+                    with self._pending_lock:
+                        self._pending.discard(item)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_background_sync(api_key, interval_seconds=SYNC_INTERVAL_SECONDS, lookback_days=SYNC_LOOKBACK_DAYS):
+    """
+    ✅ 프로세스당 1개 동기화 스레드 시작 (이미 있으면 그대로 반환)
+    """
+    global _worker
+    disclosure_sync = get_disclosure_sync(api_key)
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = BackgroundSync(
+                disclosure_sync, interval_seconds=interval_seconds, lookback_days=lookback_days
+            )
+            _worker.start()
+    return _worker
+
+
+# 별도 프로세스로 실행: DART_API_KEY=... python dart_sync.py
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interval", type=int, default=SYNC_INTERVAL_SECONDS)
+    parser.add_argument("--lookback-days", type=int, default=SYNC_LOOKBACK_DAYS)
+    parser.add_argument("--once", action="store_true", help="한 번만 동기화하고 종료")
+    args = parser.parse_args()
+
+    worker = BackgroundSync(
+        DisclosureSync(os.environ["DART_API_KEY"]),
+        interval_seconds=args.interval,
+        lookback_days=args.lookback_days,
+    )
+    if args.once:
+        today = datetime.date.today()
+        worker._sync(_fmt(today - datetime.timedelta(days=args.lookback_days)), _fmt(today))
+    else:
+        worker.run()
@@ -0,0 +1,115 @@
+# disclosure_store.py
+import gzip
+import json
+import os
+import threading
+import time
+
+import local_db
+from dart_parser import ParsedDocument, Table
+
+DISCLOSURE_DIR = "data/disclosures"
+
+# ✅ 파이프라인 단계 (뒤로 갈수록 깊은 단계)
+STAGES = ("raw", "parsed", "chunk_summaries", "summary")
+
+
+def _doc_to_json(doc):
+    return {
+        "paragraphs": doc.paragraphs,
+        "tables": [{"header": t.header, "rows": t.rows, "context": t.context} for t in doc.tables],
+    }
+
+
+def _doc_from_json(data):
+    return ParsedDocument(
+        paragraphs=data["paragraphs"],
+        tables=[Table(header=t["header"], rows=t["rows"], context=t.get("context", "")) for t in data["tables"]],
+    )
+
+
+class DisclosureStore:
+    """
+    ✅ rcept_no 별 공시 저장소 (공시는 게시 후 바뀌지 않음 → 한 번만 받고 한 번만 분석)
+    - 단계별 결과: gzip JSON 파일 (data/disclosures/{rcept_no}/{stage}.json.gz)
+    - SQLite 인덱스: 어떤 단계까지 저장됐는지 + 회사/보고서명
+    """
+
+    def __init__(self, root=DISCLOSURE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._conn = local_db.connect(os.path.join(root, "index.db"))
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS stages ("
+                "rcept_no TEXT NOT NULL, stage TEXT NOT NULL, bytes INTEGER NOT NULL, "
+                "updated_at REAL NOT NULL, PRIMARY KEY (rcept_no, stage))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS filings ("
+                "rcept_no TEXT PRIMARY KEY, corp_name TEXT NOT NULL DEFAULT '', "
+                "report_nm TEXT NOT NULL DEFAULT '', created_at REAL NOT NULL)"
+            )
+
+    def _path(self, rcept_no, stage):
+        return os.path.join(self.root, rcept_no, f"{stage}.json.gz")
+
+    def register(self, rcept_no, corp_name="", report_nm=""):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO filings (rcept_no, corp_name, report_nm, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (rcept_no, corp_name, report_nm, time.time()),
+            )
+
+    def put(self, rcept_no, stage, value):
+        if stage not in STAGES:
+            raise ValueError(f"❌ 알 수 없는 단계: {stage}")
+        if stage == "parsed":
+            value = _doc_to_json(value)
+        path = self._path(rcept_no, stage)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = gzip.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stages (rcept_no, stage, bytes, updated_at) VALUES (?, ?, ?, ?)",
+                (rcept_no, stage, len(data), time.time()),
+            )
+
+    def get(self, rcept_no, stage):
+        """
+        ✅ 저장된 단계 결과 (없으면 None)
+        """
+        path = self._path(rcept_no, stage)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            value = json.loads(gzip.decompress(f.read()).decode("utf-8"))
+        return _doc_from_json(value) if stage == "parsed" else value
+
+    def deepest_stage(self, rcept_no):
+        with self._lock:
+            stored = {r[0] for r in self._conn.execute(
+                "SELECT stage FROM stages WHERE rcept_no = ?", (rcept_no,)
+            )}
+        for stage in reversed(STAGES):
+            if stage in stored:
+                return stage
+        return None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_disclosure_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DisclosureStore()
+    return _store
@@ -0,0 +1,144 @@
+# earnings_calendar.py
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import local_db
+
+EARNINGS_CACHE_DB_PATH = "data/earnings_calendar.db"
+EARNINGS_TTL_SECONDS = int(os.environ.get("EARNINGS_TTL_SECONDS", str(24 * 60 * 60)))  # 어닝 일정은 잘 안 바뀜
+EARNINGS_MAX_WORKERS = int(os.environ.get("EARNINGS_MAX_WORKERS", "8"))
+
+
+def _plain(value):
+    """
+    ✅ numpy/pandas 스칼라 → 파이썬 기본형 (JSON 저장용)
+    """
+    if hasattr(value, "item"):
+        try:
+            return value.item()
+        except (ValueError, AttributeError):
+            pass
+    return value
+
+
+def normalize_calendar(symbol, info):
+    """
+    ✅ yf.Ticker.calendar (DataFrame 형태 / dict 형태) → 캘린더 이벤트 (어닝 일정 없으면 None)
+    """
+    if hasattr(info, "index") and "Earnings Date" in info.index:
+        earnings_date_raw = info.loc["Earnings Date"][0]
+        eps_estimate = (
+            info.loc["Earnings Average"][0]
+            if "Earnings Average" in info.index else "N/A"
+        )
+    elif isinstance(info, dict) and "Earnings Date" in info:
+        earnings_date_raw = info["Earnings Date"]
+        eps_estimate = info.get("Earnings Average", "N/A")
+    else:
+        return None
+
+    if isinstance(earnings_date_raw, list) and len(earnings_date_raw) > 0:
+        earnings_date = earnings_date_raw[0]
+    else:
+        earnings_date = earnings_date_raw
+
+    if hasattr(earnings_date, "strftime"):
+        earnings_date = earnings_date.strftime("%Y-%m-%d")
+    elif not isinstance(earnings_date, str):
+        earnings_date = str(earnings_date)
+
+    eps_estimate = _plain(eps_estimate)
+    return {
+        "title": f"{symbol} 어닝콜 (EPS {eps_estimate})",
+        "start": earnings_date,
+        "symbol": symbol,
+        "eps_estimate": eps_estimate
+    }
+
+
+def fetch_symbol_event(symbol):
+    import yfinance as yf
+
+    return normalize_calendar(symbol, yf.Ticker(symbol).calendar)
+
+
+class EarningsCalendarCache:
+    """
+    ✅ 심볼별 어닝 이벤트 SQLite 캐시 (TTL)
+    - 어닝 일정이 없는 심볼도 None 으로 저장 → TTL 동안 다시 묻지 않음
+    """
+
+    def __init__(self, db_path=EARNINGS_CACHE_DB_PATH, ttl_seconds=EARNINGS_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = local_db.connect(db_path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "symbol TEXT PRIMARY KEY, event TEXT, fetched_at REAL NOT NULL)"
+            )
+
+    def get_many(self, symbols):
+        """
+        ✅ TTL 안에 저장된 심볼만 {symbol: event 또는 None}
+        """
+        if not symbols:
+            return {}
+        cutoff = time.time() - self.ttl_seconds
+        placeholders = ",".join("?" * len(symbols))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT symbol, event FROM events WHERE fetched_at >= ? AND symbol IN ({placeholders})",
+                [cutoff, *symbols],
+            ).fetchall()
+        return {symbol: json.loads(event) if event else None for symbol, event in rows}
+
+    def put_many(self, events):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO events (symbol, event, fetched_at) VALUES (?, ?, ?)",
+                [(symbol, json.dumps(event, ensure_ascii=False) if event else None, now)
+                 for symbol, event in events.items()],
+            )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_earnings_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EarningsCalendarCache()
+    return _cache
+
+
+def get_earnings_calendar(symbols, max_workers=EARNINGS_MAX_WORKERS):
+    """
+    ✅ 심볼들의 어닝 일정 이벤트
+    - 캐시에 없는/만료된 심볼만 스레드 풀로 동시에 조회
+    - 조회 실패한 심볼은 캐시하지 않음 (다음 호출 때 다시 시도)
+    """
+    symbols = list(dict.fromkeys(symbols))
+    cache = get_earnings_cache()
+    events = cache.get_many(symbols)
+    missing = [s for s in symbols if s not in events]
+
+    if missing:
+        fetched = {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+            for symbol, future in [(s, pool.submit(fetch_symbol_event, s)) for s in missing]:
+                try:
+                    fetched[symbol] = future.result()
+                except Exception as e:
+                    print(f"⚠️ {symbol} 어닝 일정 조회 실패: {e}")
+        cache.put_many(fetched)
+        events.update(fetched)
+
+    return [events[s] for s in symbols if events.get(s)]
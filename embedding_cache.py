@@ -0,0 +1,161 @@
+# embedding_cache.py
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+
+import local_db
+
+CACHE_DIR = "embeddings/cache"
+CACHE_MAX_BYTES = int(os.environ.get("EMBED_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+EVICT_FRACTION = 0.1  # 가득 차면 가장 오래 안 쓴 10%를 한 번에 비움
+INITIAL_ROWS = 1024
+
+
+def cache_key(model_name, text):
+    """
+    ✅ 내용 기반 키: hash(모델명 + 텍스트)
+    """
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    ✅ 디스크 임베딩 캐시
+    - 벡터: memory-mapped float32 행렬 (vectors.f32)
+    - 오프셋 인덱스: SQLite (key → row, last_used)
+    - 크기 기반 LRU: max_bytes 넘으면 last_used 오래된 행부터 재사용
+    """
+
+    def __init__(self, dim, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.dim = int(dim)
+        self.max_rows = max(1, max_bytes // (self.dim * 4))
+        self._lock = threading.Lock()
+        self._vectors_path = os.path.join(cache_dir, f"vectors_{self.dim}.f32")
+        self._conn = local_db.connect(os.path.join(cache_dir, f"index_{self.dim}.db"))
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, row INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_used ON entries(last_used)")
+
+        self._capacity = 0
+        self._mmap = None
+        self._open_mmap(max(self._stored_rows(), INITIAL_ROWS))
+
+    # ================================
+    # ✅ memmap 파일 관리
+    # ================================
+    def _stored_rows(self):
+        if not os.path.exists(self._vectors_path):
+            return 0
+        return os.path.getsize(self._vectors_path) // (self.dim * 4)
+
+    def _open_mmap(self, rows):
+        rows = min(rows, self.max_rows)
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap = None
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < rows * self.dim * 4:
+                f.truncate(rows * self.dim * 4)
+        self._capacity = rows
+        self._mmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(rows, self.dim))
+
+    def _allocate_rows(self, n):
+        """
+        ✅ 새 벡터가 들어갈 행 번호 n개 확보 (빈 행 → 파일 확장 → LRU 축출 순)
+        """
+        count, max_row = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(row), -1) FROM entries"
+        ).fetchone()
+        if count == max_row + 1:
+            # 빈 구멍 없음 → 끝에서부터 이어 붙임 (전체 스캔 생략)
+            used = None
+            free = list(range(max_row + 1, min(max_row + 1 + n, self._capacity)))
+        else:
+            used = {r for (r,) in self._conn.execute("SELECT row FROM entries")}
+            free = [r for r in range(self._capacity) if r not in used][:n]
+
+        if len(free) < n and self._capacity < self.max_rows:
+            start = self._capacity
+            self._open_mmap(max(self._capacity * 2, self._capacity + n))
+            taken = set(free)
+            free.extend(
+                r for r in range(start, self._capacity)
+                if r not in taken and (used is None or r not in used)
+            )
+            free = free[:n]
+
+        if len(free) < n:
+            evict = max(n - len(free), int(self.max_rows * EVICT_FRACTION))
+            victims = self._conn.execute(
+                "SELECT key, row FROM entries ORDER BY last_used LIMIT ?", (evict,)
+            ).fetchall()
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k, _ in victims])
+            free.extend(r for _, r in victims)
+            free = free[:n]
+        return free
+
+    # ================================
+    # ✅ 조회 / 저장
+    # ================================
+    def get_many(self, keys):
+        """
+        ✅ keys → {key: vector} (히트만 반환, last_used 갱신)
+        """
+        if not keys:
+            return {}
+        found = {}
+        with self._lock:
+            unique = list(dict.fromkeys(keys))
+            for i in range(0, len(unique), 500):
+                part = unique[i:i + 500]
+                marks = ",".join("?" * len(part))
+                for key, row in self._conn.execute(
+                    f"SELECT key, row FROM entries WHERE key IN ({marks})", part
+                ):
+                    if row < self._capacity:
+                        found[key] = np.array(self._mmap[row])
+            if found:
+                now = time.time()
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE entries SET last_used = ? WHERE key = ?",
+                        [(now, k) for k in found],
+                    )
+        return found
+
+    def put_many(self, keys, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        items = dict(zip(keys, vectors))
+        if not items:
+            return
+        with self._lock:
+            existing = set()
+            part_keys = list(items)
+            for i in range(0, len(part_keys), 500):
+                part = part_keys[i:i + 500]
+                marks = ",".join("?" * len(part))
+                existing.update(
+                    k for (k,) in self._conn.execute(
+                        f"SELECT key FROM entries WHERE key IN ({marks})", part
+                    )
+                )
+            new_keys = [k for k in part_keys if k not in existing][: self.max_rows]
+            if not new_keys:
+                return
+
+            now = time.time()
+            with self._conn:
+                rows = self._allocate_rows(len(new_keys))
+                for key, row in zip(new_keys, rows):
+                    self._mmap[row] = items[key]
+                self._mmap.flush()
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO entries (key, row, last_used) VALUES (?, ?, ?)",
+                    [(k, r, now) for k, r in zip(new_keys, rows)],
+                )
@@ -0,0 +1,160 @@
+# embedding_service.py
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache, cache_key
+
+# ✅ 환경변수로 조정 가능한 임베딩 설정
+EMBED_MODEL_NAME = os.environ.get("EMBED_MODEL_NAME", "all-MiniLM-L6-v2")
+EMBED_BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", "32"))
+EMBED_NUM_THREADS = int(os.environ.get("EMBED_NUM_THREADS", "0"))  # 0 → torch 기본값 사용
+EMBED_BACKEND = os.environ.get("EMBED_BACKEND", "torch")  # torch | onnx | int8
+EMBED_CACHE_ENABLED = os.environ.get("EMBED_CACHE", "1") != "0"
+
+_model = None
+_model_lock = threading.Lock()
+_cache = None
+
+# ✅ encode 지연시간 지표
+_stats_lock = threading.Lock()
+ENCODE_STATS = {
+    "load_seconds": 0.0,
+    "calls": 0,
+    "texts": 0,
+    "total_seconds": 0.0,
+    "last_seconds": 0.0,
+    "cache_hits": 0,
+    "cache_misses": 0,
+}
+RECENT_LATENCIES = deque(maxlen=100)  # (텍스트 수, 초)
+
+
+def _load_model():
+    """
+    ✅ 실제 모델 로드 (sentence_transformers/torch는 여기서만 import)
+    - EMBED_BACKEND=onnx → ONNX Runtime 백엔드
+    - EMBED_BACKEND=int8 → Linear 레이어 동적 int8 양자화 (CPU)
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if EMBED_NUM_THREADS > 0:
+        import torch
+
+        torch.set_num_threads(EMBED_NUM_THREADS)
+
+    if EMBED_BACKEND == "onnx":
+        return SentenceTransformer(EMBED_MODEL_NAME, backend="onnx")
+
+    model = SentenceTransformer(EMBED_MODEL_NAME, device="cpu" if EMBED_BACKEND == "int8" else None)
+    if EMBED_BACKEND == "int8":
+        import torch
+
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def get_model():
+    """
+    ✅ 프로세스 전체에서 공유하는 임베딩 모델 (첫 사용 시 1회 로드)
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                start = time.perf_counter()
+                model = _load_model()
+                ENCODE_STATS["load_seconds"] = time.perf_counter() - start
+                print(f"✅ 임베딩 모델 로드: {EMBED_MODEL_NAME} ({EMBED_BACKEND}, "
+                      f"{ENCODE_STATS['load_seconds']:.2f}s)")
+                _model = model
+    return _model
+
+
+def embedding_dim():
+    return get_model().get_sentence_embedding_dimension()
+
+
+def get_cache():
+    """
+    ✅ 디스크 임베딩 캐시 (모델 차원 확정 후 1회 생성)
+    """
+    global _cache
+    if _cache is None:
+        dim = embedding_dim()
+        with _model_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(dim)
+    return _cache
+
+
+def _encode_with_model(texts, batch_size):
+    model = get_model()
+    start = time.perf_counter()
+    embs = model.encode(
+        texts,
+        batch_size=batch_size or EMBED_BATCH_SIZE,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    elapsed = time.perf_counter() - start
+
+    embs = np.asarray(embs, dtype=np.float32)
+    if embs.ndim == 1:
+        embs = embs.reshape(1, -1)
+
+    with _stats_lock:
+        ENCODE_STATS["calls"] += 1
+        ENCODE_STATS["texts"] += len(texts)
+        ENCODE_STATS["total_seconds"] += elapsed
+        ENCODE_STATS["last_seconds"] = elapsed
+        RECENT_LATENCIES.append((len(texts), elapsed))
+    return embs
+
+
+def encode(texts, batch_size=None, use_cache=EMBED_CACHE_ENABLED):
+    """
+    ✅ 텍스트 리스트 → float32 (N, dim) 행렬
+    - 디스크 캐시에 없는 텍스트만 batch_size 단위로 모델에 전달
+    - 모델 호출마다 지연시간 기록 (ENCODE_STATS / RECENT_LATENCIES)
+    """
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, embedding_dim()), dtype=np.float32)
+    if not use_cache:
+        return _encode_with_model(texts, batch_size)
+
+    cache = get_cache()
+    model_key = f"{EMBED_MODEL_NAME}:{EMBED_BACKEND}"
+    keys = [cache_key(model_key, t) for t in texts]
+    found = cache.get_many(keys)
+
+    # 캐시 미스만 (중복 제거 후) 인코딩
+    miss = {}
+    for key, text in zip(keys, texts):
+        if key not in found and key not in miss:
+            miss[key] = text
+    if miss:
+        miss_embs = _encode_with_model(list(miss.values()), batch_size)
+        cache.put_many(list(miss), miss_embs)
+        found.update(zip(miss, miss_embs))
+
+    with _stats_lock:
+        ENCODE_STATS["cache_hits"] += len(texts) - len(miss)
+        ENCODE_STATS["cache_misses"] += len(miss)
+    return np.stack([found[k] for k in keys]).astype(np.float32, copy=False)
+
+
+def get_encode_stats():
+    """
+    ✅ 지표 스냅샷 (평균/최근 지연시간 포함)
+    """
+    with _stats_lock:
+        stats = dict(ENCODE_STATS)
+        recent = list(RECENT_LATENCIES)
+    stats["avg_seconds"] = stats["total_seconds"] / stats["calls"] if stats["calls"] else 0.0
+    stats["recent"] = recent
+    return stats
@@ -0,0 +1,237 @@
+# financial_tables.py
+import os
+import re
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+FINANCIALS_DIR = "data/financials"
+FINANCIALS_CACHE_VERSION = 2  # 파싱 규칙이 바뀌면 올림 → 예전 캐시는 다시 파싱
+
+# ✅ 단위 → 원 환산 배수
+UNIT_MULTIPLIERS = {"원": 1, "천원": 1e3, "백만원": 1e6, "억원": 1e8, "십억원": 1e9, "조원": 1e12}
+_UNIT = re.compile(r"단위\s*[:：]?\s*(십억원|백만원|천원|억원|조원|원)")
+
+# ✅ 표준 항목명 → DART 표에서 쓰이는 표기들 (공백 제거 후 비교)
+STATEMENT_ITEMS = {
+    "income": {
+        "매출액": ("매출액", "매출", "수익(매출액)", "영업수익", "매출액(수익)"),
+        "영업이익": ("영업이익", "영업이익(손실)", "영업손실"),
+        "당기순이익": ("당기순이익", "당기순이익(손실)", "분기순이익", "분기순이익(손실)",
+                  "반기순이익", "반기순이익(손실)", "순이익"),
+    },
+    "balance": {
+        "자산총계": ("자산총계",),
+        "부채총계": ("부채총계",),
+        "자본총계": ("자본총계",),
+    },
+}
+STATEMENT_LABELS = {"income": "손익계산서", "balance": "재무상태표"}
+
+_NUMBER = re.compile(r"^[(△▲\-−]?\s*[0-9][0-9,]*(\.[0-9]+)?\s*\)?$")
+_LABEL_NOISE = re.compile(r"[\s　]|^[IVX0-9]+\.|^[ⅠⅡⅢⅣⅤⅥⅦⅧⅨⅩ]+\.?")
+# 증감률/비율 열 (잠정실적 "전기대비증감율(%)" 등) → 금액 기간 열이 아님
+_RATIO_HEADER = re.compile(r"증감|율|률|%")
+
+
+@dataclass
+class FinancialTable:
+    kind: str            # income | balance
+    unit: str            # 원문 표기 단위 (표시용)
+    items: List[str]     # 표준 항목명 (행)
+    periods: List[str]   # 기간 헤더 (열, 첫 열 = 당기)
+    values: np.ndarray   # (항목, 기간) float64, 원 단위, 없으면 NaN
+
+
+def parse_korean_number(text, multiplier=1.0):
+    """
+    ✅ "1,234" / "(1,234)" / "△1,234" / "-1,234" → float (원 단위 환산)
+    - 숫자가 아니면 NaN
+    """
+    if text is None:
+        return np.nan
+    s = text.strip().replace(" ", "")
+    if not s or s in ("-", "−") or not _NUMBER.match(s):
+        return np.nan
+    negative = s.startswith(("(", "△", "-", "−")) or s.endswith(")")
+    digits = s.strip("()△▲-−").replace(",", "")
+    try:
+        value = float(digits)
+    except ValueError:
+        return np.nan
+    return (-value if negative else value) * multiplier
+
+
+def detect_unit(*texts):
+    for text in texts:
+        if text:
+            m = _UNIT.search(text)
+            if m:
+                return m.group(1)
+    return "원"
+
+
+def _normalize_label(label):
+    return _LABEL_NOISE.sub("", label or "")
+
+
+def _match_items(rows, kind):
+    """
+    ✅ 표준 항목명 → 행 인덱스 (처음 나온 행 기준)
+    """
+    found = {}
+    for i, row in enumerate(rows):
+        label = _normalize_label(row[0] if row else "")
+        for item, aliases in STATEMENT_ITEMS[kind].items():
+            if item not in found and label in aliases:
+                found[item] = i
+    return found
+
+
+def _extract_financial_table(table):
+    """
+    ✅ dart_parser.Table → (FinancialTable 또는 None, 확실한지)
+    - 숫자가 있는 열 중 헤더가 증감/율/률/% 인 열은 기간 열에서 제외
+    - 제외한 숫자 열이 있거나 기간 헤더가 없으면 "불확실" → 원본 표도 프롬프트에 남김
+    """
+    for kind in STATEMENT_ITEMS:
+        matched = _match_items(table.rows, kind)
+        if len(matched) < 2:
+            continue
+
+        unit = detect_unit(table.context, table.to_text()[:200])
+        multiplier = UNIT_MULTIPLIERS[unit]
+        items = list(STATEMENT_ITEMS[kind])
+        width = max(len(r) for r in table.rows)
+
+        # 행렬로 한 번에 변환 후, 숫자가 있는 열만 기간 열로 사용
+        grid = np.full((len(items), width - 1), np.nan)
+        for r, item in enumerate(items):
+            if item in matched:
+                cells = table.rows[matched[item]][1:]
+                grid[r, :len(cells)] = [parse_korean_number(c, multiplier) for c in cells]
+        header = (table.header or [])[1:]
+        numeric_cols = np.where(~np.isnan(grid).all(axis=0))[0]
+        period_cols = [c for c in numeric_cols if not (c < len(header) and _RATIO_HEADER.search(header[c]))]
+        if not period_cols:
+            continue
+
+        periods = [header[c] if c < len(header) and header[c] else f"기간{c + 1}" for c in period_cols]
+        certain = len(period_cols) == len(numeric_cols) and all(c < len(header) and header[c] for c in period_cols)
+        fin = FinancialTable(kind=kind, unit=unit, items=items, periods=periods, values=grid[:, period_cols])
+        return fin, certain
+    return None, False
+
+
+def extract_financial_table(table):
+    """
+    ✅ dart_parser.Table → FinancialTable (손익/재무상태 표가 아니면 None)
+    """
+    return _extract_financial_table(table)[0]
+
+
+def extract_financials(doc):
+    """
+    ✅ ParsedDocument → (FinancialTable 리스트, 원본 대신 압축표로 대체할 표 인덱스 집합)
+    - 종류별로 처음 나온 표(보통 요약재무정보/연결 재무제표) 하나씩만 사용
+    - 불확실하게 파싱된 표는 원본도 그대로 둠 (인덱스 집합에서 제외)
+    """
+    results, used, seen_kinds = [], set(), set()
+    for i, table in enumerate(doc.tables):
+        fin, certain = _extract_financial_table(table)
+        if fin is None or fin.kind in seen_kinds:
+            continue
+        seen_kinds.add(fin.kind)
+        if certain:
+            used.add(i)
+        results.append(fin)
+    return results, used
+
+
+# ================================
+# ✅ 변화율 계산 (벡터화)
+# ================================
+def period_changes(fin):
+    """
+    ✅ 첫 열(당기) 대비 나머지 열 변화율 (항목 × 비교기간), 분모 0/NaN → NaN
+    """
+    if fin.values.shape[1] < 2:
+        return np.empty((len(fin.items), 0))
+    current = fin.values[:, :1]
+    previous = fin.values[:, 1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        changes = (current - previous) / np.abs(previous)
+    changes[~np.isfinite(changes)] = np.nan
+    return changes
+
+
+def _format_amount(value, unit):
+    if np.isnan(value):
+        return "-"
+    return f"{value / UNIT_MULTIPLIERS[unit]:,.0f}"
+
+
+def render_financials(financials):
+    """
+    ✅ LLM 프롬프트용 압축 표 (숫자 + 미리 계산한 변화율)
+    """
+    blocks = []
+    for fin in financials:
+        changes = period_changes(fin)
+        header = ["항목"] + fin.periods + [f"증감률(vs {p})" for p in fin.periods[1:]]
+        lines = [f"[{STATEMENT_LABELS[fin.kind]}] (단위: {fin.unit})", "\t".join(header)]
+        for r, item in enumerate(fin.items):
+            if np.isnan(fin.values[r]).all():
+                continue
+            cells = [_format_amount(v, fin.unit) for v in fin.values[r]]
+            cells += ["-" if np.isnan(c) else f"{c * 100:+.1f}%" for c in changes[r]]
+            lines.append("\t".join([item] + cells))
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+# ================================
+# ✅ rcept_no 별 컬럼형 캐시 (.npz)
+# ================================
+def _cache_path(rcept_no):
+    return os.path.join(FINANCIALS_DIR, f"{rcept_no}.npz")
+
+
+def save_financials(rcept_no, financials, table_indices=()):
+    os.makedirs(FINANCIALS_DIR, exist_ok=True)
+    arrays = {
+        "version": np.array(FINANCIALS_CACHE_VERSION),
+        "kinds": np.array([f.kind for f in financials], dtype=str),
+        "table_indices": np.array(sorted(table_indices), dtype=np.int64),
+    }
+    for i, fin in enumerate(financials):
+        arrays[f"unit_{i}"] = np.array(fin.unit)
+        arrays[f"items_{i}"] = np.array(fin.items, dtype=str)
+        arrays[f"periods_{i}"] = np.array(fin.periods, dtype=str)
+        arrays[f"values_{i}"] = fin.values
+    np.savez_compressed(_cache_path(rcept_no), **arrays)
+
+
+def load_financials(rcept_no):
+    """
+    ✅ 캐시된 (재무표 리스트, 인식된 원본 표 인덱스)
+    - 캐시 없거나 예전 버전이면 None, 인식된 표가 없던 공시는 ([], set())
+    """
+    path = _cache_path(rcept_no)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        if "version" not in data or int(data["version"]) != FINANCIALS_CACHE_VERSION:
+            return None
+        financials = [
+            FinancialTable(
+                kind=str(kind),
+                unit=str(data[f"unit_{i}"]),
+                items=data[f"items_{i}"].tolist(),
+                periods=data[f"periods_{i}"].tolist(),
+                values=data[f"values_{i}"],
+            )
+            for i, kind in enumerate(data["kinds"])
+        ]
+        return financials, set(data["table_indices"].tolist())
@@ -0,0 +1,291 @@
+# http_client.py
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+import local_db
+from rate_limiter import backoff_delay, retry_after_seconds
+
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "15"))
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "3"))
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "10"))
+HTTP_CACHE_DB_PATH = "data/http_cache.db"
+HTTP_CACHE_MAX_BYTES = int(os.environ.get("HTTP_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# 녹화/재생 (오프라인 테스트용): 둘 다 비어 있으면 실제 네트워크
+HTTP_RECORD_DIR = os.environ.get("HTTP_RECORD_DIR", "")
+HTTP_REPLAY_DIR = os.environ.get("HTTP_REPLAY_DIR", "")
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+DEFAULT_HEADERS = {"Accept-Encoding": "gzip, deflate", "User-Agent": "Mozilla/5.0"}
+
+
+def request_key(method, url, params=None):
+    """
+    ✅ 캐시/녹화 키: hash(메서드 + URL + 정렬된 쿼리)  (API 키가 파일에 평문으로 남지 않음)
+    """
+    query = urlencode(sorted((params or {}).items()), doseq=True)
+    return hashlib.sha256(f"{method.upper()} {url}?{query}".encode("utf-8")).hexdigest()
+
+
+def make_response(url, status_code, headers, body):
+    """
+    ✅ 캐시/녹화 데이터 → requests.Response (호출하는 쪽은 실제 응답과 똑같이 사용)
+    """
+    res = requests.Response()
+    res.url = url
+    res.status_code = status_code
+    res.headers = CaseInsensitiveDict(headers)
+    res._content = body
+    res._content_consumed = True
+    res.encoding = requests.utils.get_encoding_from_headers(res.headers)
+    return res
+
+
+# ================================
+# ✅ Transport (실제 네트워크 / 녹화 / 재생)
+# ================================
+class SessionTransport:
+    """
+    ✅ 호스트별 requests.Session → keep-alive 커넥션 풀 재사용 (매번 TCP+TLS 새로 열지 않음)
+    """
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE):
+        self.pool_size = pool_size
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _session(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                # 재시도는 HttpClient 가 담당 (Retry-After/지터 백오프 공용 로직)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                self._sessions[host] = session
+            return session
+
+    def send(self, method, url, params=None, headers=None, timeout=None, stream=False):
+        return self._session(url).request(
+            method, url, params=params, headers=headers, timeout=timeout, stream=stream
+        )
+
+
+class RecordingTransport:
+    """
+    ✅ 실제 응답을 {key}.json 으로 저장 (ReplayTransport 로 그대로 재생)
+    - stream=True 도 그대로 전달하지만, 녹화하려면 본문 전체를 읽어야 하므로 돌려주는 응답은 항상 버퍼링됨
+    """
+
+    def __init__(self, record_dir, inner=None):
+        self.record_dir = record_dir
+        self.inner = inner or SessionTransport()
+        os.makedirs(record_dir, exist_ok=True)
+
+    def send(self, method, url, params=None, headers=None, timeout=None, stream=False):
+        res = self.inner.send(method, url, params=params, headers=headers, timeout=timeout, stream=stream)
+        record = {
+            "url": url,
+            "status_code": res.status_code,
+            "headers": dict(res.headers),
+            "body": base64.b64encode(res.content).decode("ascii"),
+        }
+        path = os.path.join(self.record_dir, request_key(method, url, params) + ".json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        return res
+
+
+class ReplayTransport:
+    """
+    ✅ 녹화된 응답만 돌려줌 (네트워크 없이 테스트), 녹화가 없으면 ConnectionError
+    """
+
+    def __init__(self, record_dir):
+        self.record_dir = record_dir
+
+    def send(self, method, url, params=None, headers=None, timeout=None, stream=False):
+        path = os.path.join(self.record_dir, request_key(method, url, params) + ".json")
+        if not os.path.exists(path):
+            raise requests.ConnectionError(f"녹화된 응답 없음: {method} {url}")
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+        return make_response(
+            record["url"], record["status_code"], record["headers"], base64.b64decode(record["body"])
+        )
+
+
+# ================================
+# ✅ 디스크 HTTP 캐시 (ETag / Last-Modified)
+# ================================
+class HttpCache:
+    """
+    ✅ 검증자(ETag/Last-Modified)가 있는 200 응답 저장 → 다음 요청은 조건부 GET, 304 면 저장본 사용
+    - 전체 크기가 max_bytes 를 넘으면 오래 저장된 응답부터 삭제
+      (전체 크기는 시작할 때 한 번 세고 이후엔 put 마다 더하고 뺌 → 매번 테이블 전체를 읽지 않음)
+    """
+
+    def __init__(self, db_path=HTTP_CACHE_DB_PATH, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = local_db.connect(db_path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, url TEXT NOT NULL, headers TEXT NOT NULL, "
+                "body BLOB NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_stored ON responses(stored_at)")
+        self._bytes = self._total_bytes()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0}
+
+    def _total_bytes(self):
+        return self._conn.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM responses").fetchone()[0]
+
+    def count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        url, headers, body, stored_at = row
+        return {"url": url, "headers": json.loads(headers), "body": body, "stored_at": stored_at}
+
+    def put(self, key, res):
+        headers = {k: v for k, v in res.headers.items() if k.lower() in ("etag", "last-modified", "content-type")}
+        with self._lock, self._conn:
+            old = self._conn.execute("SELECT LENGTH(body) FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, headers, body, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (key, res.url, json.dumps(headers), res.content, time.time()),
+            )
+            self._bytes += len(res.content) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # 다른 프로세스도 같은 파일에 쓰므로 넘었을 때만 실제 합계로 다시 맞춤
+        self._bytes = self._total_bytes()
+        victims = []
+        for key, size in self._conn.execute("SELECT key, LENGTH(body) FROM responses ORDER BY stored_at"):
+            if self._bytes <= self.max_bytes:
+                break
+            victims.append((key,))
+            self._bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def touch(self, key):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+
+
+class HttpClient:
+    """
+    ✅ 공용 HTTP 클라이언트
+    - 호스트별 커넥션 풀 (keep-alive), 기본 타임아웃
+    - 429/5xx/연결 오류 → Retry-After 우선 지터 백오프 재시도
+    - cache=True → ETag/If-Modified-Since 조건부 요청 + 디스크 캐시
+      (fresh_for 초 안에 저장된 응답은 네트워크 없이 바로 반환)
+    - 검증자가 없는 응답도 fresh_for 가 있으면 저장, cache_if(res) 가 False 인 응답(오류 본문 등)은 저장 안 함
+    """
+
+    def __init__(self, transport=None, cache=None, timeout=HTTP_TIMEOUT, max_retries=HTTP_MAX_RETRIES):
+        self.transport = transport or SessionTransport()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._cache = cache
+        self._cache_lock = threading.Lock()
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            with self._cache_lock:
+                if self._cache is None:
+                    self._cache = HttpCache()
+        return self._cache
+
+    def _send(self, method, url, params, headers, timeout, stream):
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                res = self.transport.send(
+                    method, url, params=params, headers=headers, timeout=timeout, stream=stream
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last_attempt:
+                    raise
+                delay = backoff_delay(attempt)
+                print(f"🔁 HTTP 연결 오류 → {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries}): {e}")
+                time.sleep(delay)
+                continue
+
+            if res.status_code not in RETRY_STATUS or last_attempt:
+                return res
+            delay = backoff_delay(attempt, retry_after_seconds(res))
+            print(f"🔁 HTTP {res.status_code} → {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+            res.close()
+            time.sleep(delay)
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False, cache=False, fresh_for=0,
+            cache_if=None):
+        timeout = timeout or self.timeout
+        if not cache:
+            return self._send("GET", url, params, headers, timeout, stream)
+
+        key = request_key("GET", url, params)
+        stored = self.cache.get(key)
+        headers = dict(headers or {})
+        if stored is not None:
+            if fresh_for and time.time() - stored["stored_at"] < fresh_for:
+                self.cache.count("hits")
+                return make_response(stored["url"], 200, stored["headers"], stored["body"])
+            if stored["headers"].get("ETag"):
+                headers["If-None-Match"] = stored["headers"]["ETag"]
+            if stored["headers"].get("Last-Modified"):
+                headers["If-Modified-Since"] = stored["headers"]["Last-Modified"]
+
+        res = self._send("GET", url, params, headers, timeout, stream=False)
+        if res.status_code == 304 and stored is not None:
+            self.cache.count("revalidated")
+            self.cache.touch(key)
+            return make_response(stored["url"], 200, stored["headers"], stored["body"])
+        self.cache.count("misses")
+        validated = res.headers.get("ETag") or res.headers.get("Last-Modified")
+        if res.status_code == 200 and (validated or fresh_for) and (cache_if is None or cache_if(res)):
+            self.cache.put(key, res)
+        return res
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if HTTP_REPLAY_DIR:
+                    transport = ReplayTransport(HTTP_REPLAY_DIR)
+                elif HTTP_RECORD_DIR:
+                    transport = RecordingTransport(HTTP_RECORD_DIR)
+                else:
+                    transport = SessionTransport()
+                _client = HttpClient(transport=transport)
+    return _client
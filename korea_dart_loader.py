@@ -1,180 +1,267 @@
-import requests, zipfile, io, xml.etree.ElementTree as ET, os, datetime
-from bs4 import BeautifulSoup
+import os, datetime, io, threading, zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dart_parser import parse_dart_document
+from disclosure_store import get_disclosure_store
+from financial_tables import extract_financials, load_financials, render_financials, save_financials
 from crawler import crawl_naver_view_titles
-from rag_index import create_faiss_index_from_docs
+from rag_index import add_news_item, create_faiss_index_from_docs
 from rag_search import rag_query_from_docs
-from openai import OpenAI
-import streamlit as st
+from corp_registry import CorpRegistry
+from dart_sync import get_disclosure_sync, start_background_sync
+from http_client import get_http_client
+from llm_client import CLOVA_MODEL, chat_completion
+from prompt_builder import chunk_summary_messages, final_summary_messages, reduce_messages
+from text_chunker import CHUNK_MAX_TOKENS, chunk_text, get_token_counter
+from app_secrets import get_secret
 
-clova_client = OpenAI(
-    api_key=os.environ.get("OPENAI_API_KEY", ""),
-    base_url=os.environ.get("OPENAI_BASE_URL", "")
-)
+def dart_api_key():
+    return get_secret("DART_API_KEY")
 
-DART_API_KEY = st.secrets.get("DART_API_KEY", "")
+SUMMARY_MAX_WORKERS = int(os.environ.get("SUMMARY_MAX_WORKERS", "4"))  # chunk 요약 동시 호출 수
+REDUCE_MAX_CHARS = 6000  # 부분 요약 합이 이보다 길면 계층적으로 reduce
 
 # ================================
 # ✅ 1. document.xml API 호출
 # ================================
+def _decode_document(content: bytes) -> str:
+    """
+    ✅ document.xml 응답 → XML 문자열
+    - 응답이 ZIP 이면 가장 큰 문서(본문)를 꺼냄
+    """
+    if content[:2] == b"PK":
+        with zipfile.ZipFile(io.BytesIO(content)) as z:
+            main = max(z.infolist(), key=lambda info: info.file_size)
+            content = z.read(main)
+    for encoding in ("utf-8", "cp949"):
+        try:
+            return content.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return content.decode("utf-8", errors="replace")
+
 def fetch_disclosure_xml(rcept_no: str) -> str:
     """
     ✅ DART document.xml API → 공시 XML 원문 반환
+    - 받은 원문은 disclosure_store 의 raw 단계로 저장 (HTTP 캐시에는 따로 두지 않음)
     """
     url = "https://opendart.fss.or.kr/api/document.xml"
     params = {
-        "crtfc_key": DART_API_KEY,
+        "crtfc_key": dart_api_key(),
         "rcept_no": rcept_no
     }
     try:
-        res = requests.get(url, params=params, timeout=15)
+        res = get_http_client().get(url, params=params, timeout=30)
         if res.status_code != 200:
             print(f"⚠️ 공시 XML 요청 실패: {res.status_code}")
             return ""
-        return res.text
+        return _decode_document(res.content)
     except Exception as e:
         print(f"⚠️ 공시 XML 요청 오류: {e}")
         return ""
 
-def fetch_disclosure_with_tables(rcept_no: str) -> str:
+def render_disclosure_text(doc, max_paragraphs=200, financials=None, exclude_tables=()) -> str:
     """
-    ✅ XML 기반 공시 본문 + 표 데이터 추출
+    ✅ ParsedDocument → LLM 입력용 텍스트 (본문 + 탭 구분 표)
+    - financials 가 있으면 미리 계산한 재무 요약표를 맨 앞에 두고,
+      원본 재무제표 표(exclude_tables)는 빼서 프롬프트 크기를 줄임
     """
-    xml_content = fetch_disclosure_xml(rcept_no)
-    if not xml_content:
-        return ""
-
-    soup = BeautifulSoup(xml_content, "lxml")
-
-    # 본문 텍스트
-    paragraphs = [
-        tag.get_text(strip=True)
-        for tag in soup.find_all(["p", "div", "span", "tt"])
-        if tag.get_text(strip=True)
-    ]
-
-    # 표 데이터 추출
-    table_texts = []
-    for table in soup.find_all("table"):
-        rows = []
-        for tr in table.find_all("tr"):
-            cols = [td.get_text(strip=True) for td in tr.find_all(["td", "th"])]
-            if any(cols):
-                rows.append("\t".join(cols))
-        if rows:
-            table_texts.append("\n".join(rows))
-
-    merged_tables = "\n\n".join(table_texts)
-
-    return f"""
+    body = "\n".join(doc.paragraphs[:max_paragraphs])
+    merged_tables = "\n\n".join(
+        t.to_text() for i, t in enumerate(doc.tables) if i not in exclude_tables
+    )
+    financial_block = ""
+    if financials:
+        financial_block = f"""
+    ### 재무 요약 (전기 대비 증감률 계산 완료) ###
+    {render_financials(financials)}
+    """
+    return f"""{financial_block}
     ### 본문 ###
-    {'\n'.join(paragraphs[:200])}  
+    {body}
 
     ### 표 데이터 ###
     {merged_tables}
     """
 
+def get_disclosure_financials(rcept_no: str, doc):
+    """
+    ✅ 손익/재무상태 표 → 숫자 배열 (rcept_no 별 .npz 캐시)
+    - 반환: (FinancialTable 리스트, 원본에서 인식된 표 인덱스)
+    """
+    cached = load_financials(rcept_no)
+    if cached is not None:
+        return cached
+    financials, used = extract_financials(doc)
+    save_financials(rcept_no, financials, used)
+    return financials, used
+
 # ================================
 # ✅ 2. 긴 텍스트 chunk 요약
 # ================================
-def chunk_text(text: str, max_chars=3500):
-    """
-    긴 텍스트를 max_chars 단위로 분리
-    """
-    chunks = []
-    while len(text) > max_chars:
-        split_idx = text[:max_chars].rfind(".")  # 문장 단위로 자르기
-        if split_idx == -1:
-            split_idx = max_chars
-        chunks.append(text[:split_idx])
-        text = text[split_idx:]
-    if text:
-        chunks.append(text)
-    return chunks
-
-def summarize_chunk_with_clova(chunk: str) -> str:
-   
-    prompt = f"""
-    아래 공시 일부를 **핵심 요약**으로 정리해줘.
-    - 표 안 숫자는 유지
-    - 보고서 재무 관련 핵심 데이터를 요약하면서 비교 강조
-
-    내용:
-    {chunk}
+def _summarize_chunk_checked(chunk: str):
     """
+    ✅ chunk 요약 → (요약, 성공 여부)  (실패 시 원문 일부로 대체)
+    """
+    # 고정 지시문은 system 메시지, chunk 는 user 메시지
     try:
-        res = clova_client.chat.completions.create(
-            model="HCX-005",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return res.choices[0].message.content.strip()
+        return chat_completion(chunk_summary_messages(chunk), model=CLOVA_MODEL, label="chunk_summary").strip(), True
     except Exception as e:
         print(f"⚠️ OpenAI chunk 요약 실패: {e}")
-        return chunk[:1000]  # 실패하면 일부만 반환
+        return chunk[:1000], False  # 실패하면 일부만 반환
 
-def safe_summarize_large_text(full_text: str) -> str:
+def _map_parallel(func, items, on_progress=None, stage=""):
     """
-    ✅ 너무 긴 공시는 chunk 요약 후 최종 압축
+    ✅ 제한된 스레드 풀로 LLM 호출 병렬 실행 (호출 한도는 llm_client 공유 limiter)
+    - 결과 순서는 입력 순서 유지
+    - 진행률 콜백은 호출한 스레드에서 실행 → Streamlit 위젯 갱신 가능
     """
-    if len(full_text) < 4000:
-        return full_text  # 짧으면 그대로 사용
-
-    chunks = chunk_text(full_text, max_chars=3500)
-    partial_summaries = []
-    for i, chunk in enumerate(chunks, 1):
-        print(f"📝 Chunk {i}/{len(chunks)} 요약 중...")
-        summary = summarize_chunk_with_clova(chunk)
-        partial_summaries.append(summary)
+    results = [None] * len(items)
+    workers = max(1, min(SUMMARY_MAX_WORKERS, len(items)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(func, item): i for i, item in enumerate(items)}
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]] = future.result()
+            print(f"📝 {stage} {done}/{len(items)} 완료")
+            if on_progress:
+                on_progress(done / len(items), f"{stage} {done}/{len(items)}")
+    return results
+
+def _group_by_size(texts, max_chars):
+    groups, current, size = [], [], 0
+    for t in texts:
+        if current and size + len(t) > max_chars:
+            groups.append(current)
+            current, size = [], 0
+        current.append(t)
+        size += len(t)
+    if current:
+        groups.append(current)
+    return groups
+
+def _reduce_summaries_checked(summaries):
+    """
+    ✅ 중간 단계: 부분 요약 여러 개 → 하나로 합침 (숫자 유지)
+    """
+    try:
+        return chat_completion(reduce_messages(summaries), model=CLOVA_MODEL, label="reduce_summary").strip(), True
+    except Exception as e:
+        print(f"⚠️ 중간 통합 요약 실패: {e}")
+        return "\n\n".join(summaries), False
 
-    # ✅ partial 요약을 다시 압축
-    final_prompt = f"""
-    아래 여러 개의 요약을 **한 문서로 통합 요약**해줘.
-    - 재무 숫자는 유지 매출, 영업이익, 순이익 변화율 강조
-    - 초보 투자자가 이해할 수 있는 3~4줄 요약
-    - 핵심 요약만 남기고 불필요한 문장은 제거
+def summarize_chunks(full_text: str, on_progress=None):
+    """
+    ✅ map 단계: 문장/표 경계 + 토큰 기준 chunk → 병렬 요약
+    - 반환: (부분 요약 리스트, 모두 성공했는지)
+    """
+    chunks = chunk_text(full_text, count_tokens=get_token_counter())
+    results = _map_parallel(_summarize_chunk_checked, chunks, on_progress, stage="공시 chunk 요약")
+    return [r[0] for r in results], all(r[1] for r in results)
 
-    {'\n\n'.join(partial_summaries)}
+def reduce_summaries(partial_summaries, on_progress=None):
     """
-    try:
-        res = clova_client.chat.completions.create(
-            model="HCX-005",
-            messages=[{"role": "user", "content": final_prompt}]
+    ✅ reduce 단계: 부분 요약이 길면 계층적으로 묶어 요약 → 최종 통합 요약
+    - 반환: (최종 요약, 모두 성공했는지)
+    """
+    ok = True
+    level = 1
+    while len(partial_summaries) > 1 and sum(map(len, partial_summaries)) > REDUCE_MAX_CHARS:
+        groups = _group_by_size(partial_summaries, REDUCE_MAX_CHARS)
+        if len(groups) == len(partial_summaries):
+            break  # 더 묶을 수 없음 (요약 하나하나가 이미 큼)
+        results = _map_parallel(
+            _reduce_summaries_checked, groups, on_progress, stage=f"중간 통합 {level}단계"
         )
-        return res.choices[0].message.content.strip()
+        partial_summaries = [r[0] for r in results]
+        ok = ok and all(r[1] for r in results)
+        level += 1
+
+    # ✅ partial 요약을 다시 압축
+    if on_progress:
+        on_progress(1.0, "최종 통합 요약 중...")
+    try:
+        return chat_completion(
+            final_summary_messages(partial_summaries), model=CLOVA_MODEL, label="final_summary"
+        ).strip(), ok
     except Exception as e:
         print(f"⚠️ 최종 통합 요약 실패: {e}")
-        return "\n\n".join(partial_summaries)
+        return "\n\n".join(partial_summaries), False
+
+def needs_summary(full_text: str) -> bool:
+    return get_token_counter()(full_text) > CHUNK_MAX_TOKENS
+
+def load_disclosure_summary(rcept_no: str, on_progress=None, corp_name="", report_nm="") -> str:
+    """
+    ✅ 공시 요약 파이프라인 (rcept_no 별 저장소에서 가장 깊은 단계부터 재개)
+    - raw XML → parsed(문단/표) → chunk 요약 → 최종 요약
+    - 공시는 게시 후 바뀌지 않으므로 한 번 끝난 단계는 다시 하지 않음
+    - LLM 실패로 대체된 결과는 저장하지 않음 (다음 클릭 때 다시 시도)
+    """
+    store = get_disclosure_store()
+    summary = store.get(rcept_no, "summary")
+    if summary is not None:
+        print(f"✅ 저장된 공시 요약 반환: {rcept_no}")
+        return summary
+    store.register(rcept_no, corp_name, report_nm)
+
+    doc = store.get(rcept_no, "parsed")
+    if doc is None:
+        xml_content = store.get(rcept_no, "raw")
+        if xml_content is None:
+            xml_content = fetch_disclosure_xml(rcept_no)
+            if not xml_content:
+                return ""
+            store.put(rcept_no, "raw", xml_content)
+        doc = parse_dart_document(xml_content)
+        store.put(rcept_no, "parsed", doc)
+
+    financials, used = get_disclosure_financials(rcept_no, doc)
+    full_text = render_disclosure_text(doc, financials=financials, exclude_tables=used)
+    if not needs_summary(full_text):
+        store.put(rcept_no, "summary", full_text)
+        return full_text
+
+    partial_summaries = store.get(rcept_no, "chunk_summaries")
+    if partial_summaries is None:
+        partial_summaries, ok = summarize_chunks(full_text, on_progress)
+        if ok:
+            store.put(rcept_no, "chunk_summaries", partial_summaries)
+
+    summary, ok = reduce_summaries(partial_summaries, on_progress)
+    if ok:
+        store.put(rcept_no, "summary", summary)
+    return summary
 
 # ================================
 # ✅ 3. 공시 + 뉴스 → RAG docs
 # ================================
-def analyze_disclosure_with_rag(corp_name, report_nm, rcept_no):
+def analyze_disclosure_with_rag(corp_name, report_nm, rcept_no, on_progress=None, stream=False):
     """
     ✅ 공시 본문 + 표 → chunk 요약 → 뉴스 결합 → RAG 시나리오
+    - on_progress(진행률, 메시지): chunk 요약 진행 상황 전달
+    - stream=True → 최종 시나리오만 토큰 조각 iterable 로 (chunk/통합 요약은 중간 산출물이라 그대로)
     """
-    # 1) 공시 본문 + 표 데이터
-    disclosure_raw = fetch_disclosure_with_tables(rcept_no)
-    if not disclosure_raw:
-        return "⚠️ 공시 원문을 불러오지 못했습니다."
-
-    # ✅ 길면 chunk 요약 적용
-    disclosure_text = safe_summarize_large_text(disclosure_raw)
-
-    # 2) 관련 뉴스 크롤링
+    # 1) 공시 본문 + 표 데이터 → (길면) chunk 요약  (저장된 단계부터 재개)
+    disclosure_text = load_disclosure_summary(
+        rcept_no, on_progress=on_progress, corp_name=corp_name, report_nm=report_nm
+    )
+    if not disclosure_text:
+        message = "⚠️ 공시 원문을 불러오지 못했습니다."
+        return iter([message]) if stream else message
+
+    # ✅ 전역 벡터DB에 공시/뉴스 추가 (corp + 공시명 태그)
+    disclosure_doc = f"[공시 요약] {corp_name} - {report_nm}\n{disclosure_text}"
+    create_faiss_index_from_docs(
+        [disclosure_doc],
+        corp=corp_name, keyword=report_nm, source="disclosure", date=rcept_no[:8],
+        urls=[f"https://dart.fss.or.kr/dsaf001/main.do?rcpNo={rcept_no}"],
+    )
+
+    # 2) 관련 뉴스 크롤링 (기사 본문이 도착하는 대로 벡터DB에 추가)
     keyword = f"{corp_name} {report_nm}"
-    news_results = crawl_naver_view_titles(keyword, limit=5) or []
-    news_docs = [n.get("preview") for n in news_results if n.get("preview")]
-
-    # 3) docs 결합
-    docs = []
-    docs.append(f"[공시 요약] {corp_name} - {report_nm}\n{disclosure_text}")
-    docs.extend([f"[뉴스] {nd}" for nd in news_docs])
-
-    if not docs:
-        return "⚠️ 공시/뉴스 데이터가 없습니다."
-
-    # ✅ 벡터 인덱스 생성
-    save_path = f"embeddings/{corp_name}_mix.faiss"
-    create_faiss_index_from_docs(docs, save_path=save_path)
+    crawl_naver_view_titles(
+        keyword, limit=5,
+        on_item=lambda item: add_news_item(item, keyword=report_nm, corp=corp_name, prefix="[뉴스] "),
+    )
 
     # ✅ 프롬프트
     query = f"""
@@ -185,66 +272,44 @@ def analyze_disclosure_with_rag(corp_name, report_nm, rcept_no):
     - 관련 섹터 대체 전략
     요약해줘.
     """
-    return rag_query_from_docs(query, docs, save_path)
+    # 이 공시 요약은 항상 맨 앞에, 나머지는 같은 기업 + 같은 공시명(이 공시 관련 뉴스) 안에서 검색
+    return rag_query_from_docs(
+        query, corp_name, stream=stream, keyword=report_nm, pinned_docs=[disclosure_doc]
+    )
 
 # ================================
-# ✅ 4. 상장사 리스트 & 최근 공시 필터
+# ✅ 4. 상장사 레지스트리 & 캘린더 공시
 # ================================
-def get_corp_list(save_path="data/corp_list.csv"):
-    """
-    ✅ DART 전체 상장사 리스트 (corp_code 매핑)
-    """
-    url = f"https://opendart.fss.or.kr/api/corpCode.xml?crtfc_key={DART_API_KEY}"
-    res = requests.get(url)
-    if res.status_code != 200:
-        raise Exception("DART API 연결 실패")
-
-    with zipfile.ZipFile(io.BytesIO(res.content)) as z:
-        xml_file = z.open(z.namelist()[0]).read()
-
-    root = ET.fromstring(xml_file)
-    rows = []
-    for row in root.findall("list"):
-        rows.append([
-            row.find("corp_code").text,
-            row.find("corp_name").text,
-            row.find("stock_code").text
-        ])
-
-    import pandas as pd
-    df = pd.DataFrame(rows, columns=["corp_code", "corp_name", "stock_code"])
-    os.makedirs("data", exist_ok=True)
-    df.to_csv(save_path, index=False, encoding="utf-8-sig")
-    return df
-
-def get_recent_disclosures(corp_code=None, start_date=None, end_date=None, page_count=50):
-    """
-    ✅ 최근 ‘실적 관련’ 공시만 필터
-    """
-    if not start_date:
-        start_date = (datetime.date.today() - datetime.timedelta(days=90)).strftime("%Y%m%d")
-    if not end_date:
-        end_date = datetime.date.today().strftime("%Y%m%d")
-
-    url = f"https://opendart.fss.or.kr/api/list.json?crtfc_key={DART_API_KEY}&bgn_de={start_date}&end_de={end_date}&page_count={page_count}"
-    if corp_code:
-        url += f"&corp_code={corp_code}"
-
-    res = requests.get(url).json()
-    if res.get("status") != "000":
-        print(f"⚠️ DART API 오류: {res.get('message')}")
-        return []
-
-    keywords = ["분기보고서", "반기보고서", "사업보고서", "잠정실적"]
-    filtered = []
-    for d in res.get("list", []):
-        if any(k in d["report_nm"] for k in keywords):
-            dt = d["rcept_dt"]
-            filtered.append({
-                "corp_name": d["corp_name"],
-                "report_nm": d["report_nm"],
-                "rcept_dt": dt,
-                "rcept_no": d["rcept_no"],
-                "url": f"https://dart.fss.or.kr/dsaf001/main.do?rcpNo={d['rcept_no']}"
-            })
-    return filtered
\ No newline at end of file
+_corp_registry = None
+_corp_registry_lock = threading.Lock()
+
+def get_corp_registry():
+    """
+    ✅ DART 고유번호 레지스트리 (SQLite + 메모리 인덱스, TTL/ETag 갱신)
+    - 프로세스당 1개 (메모리 인덱스를 호출마다 다시 만들지 않음), TTL 이 지났을 때만 재다운로드
+    """
+    global _corp_registry
+    if _corp_registry is None:
+        with _corp_registry_lock:
+            if _corp_registry is None:
+                _corp_registry = CorpRegistry(api_key=dart_api_key())
+    _corp_registry.refresh()
+    return _corp_registry
+
+def start_market_disclosure_sync():
+    """
+    ✅ 시장 전체 실적 공시 백그라운드 동기화 시작 (프로세스당 1회)
+    """
+    return start_background_sync(dart_api_key())
+
+def get_calendar_disclosures(start_date, end_date, corp_code=None):
+    """
+    ✅ 캘린더에 보이는 구간의 실적 공시 (로컬 DB만 조회 → DART 호출 없음)
+    - 아직 동기화 안 된 구간이면 백그라운드 동기화에 요청만 넣고 바로 반환
+    """
+    worker = start_market_disclosure_sync()
+    disclosure_sync = get_disclosure_sync(dart_api_key())
+    end_date = min(end_date, datetime.date.today().strftime("%Y%m%d"))
+    if start_date <= end_date and not disclosure_sync.covers(start_date, end_date):
+        worker.request(start_date, end_date)
+    return disclosure_sync.query(start_date, end_date, corp_code=corp_code)
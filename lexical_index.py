@@ -0,0 +1,205 @@
+# lexical_index.py
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+
+# scipy 는 인덱스를 처음 만들 때 함수 안에서 import (앱 시작 시간 단축)
+from vector_store import get_store
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_SEGMENTS = 8  # 추가 배치(세그먼트)가 이보다 많아지면 하나로 합침
+
+_WORD = re.compile(r"[0-9A-Za-z가-힣]+")
+_HANGUL_WORD = re.compile(r"[가-힣]")
+
+
+def tokenize(text):
+    """
+    ✅ 한국어용 가벼운 토크나이저 (형태소 분석기 없이)
+    - 한글이 섞인 단어 → 글자 2-gram ("삼성전자" → 삼성/성전/전자), 한 글자 단어는 그대로
+    - 영문/숫자 단어 → 소문자 단어 그대로
+    """
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if _HANGUL_WORD.search(word) and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+class BM25Index:
+    """
+    ✅ 벡터DB 문서 전체에 대한 메모리 BM25 인덱스 (추가만 하는 증분 구조)
+    - 문서 × 용어 빈도(tf)를 scipy 희소행렬(CSC) 세그먼트로 보관 → add 는 새 문서만 토큰화
+    - idf / 평균 문서 길이는 검색 때 계산 → 문서가 늘어도 기존 세그먼트는 그대로
+    - 검색: 질의 용어 열만 꺼내 BM25 가중치 계산 후 희소 곱 (세그먼트당 한 번)
+    """
+
+    def __init__(self, docs=()):
+        self.vocab = {}
+        self.ids = np.empty(0, dtype=np.int64)
+        self.doc_len = np.empty(0, dtype=np.float32)
+        self.df = np.empty(0, dtype=np.int64)
+        self.segments = []  # [(CSC tf 행렬, 시작 행)]
+        self.last_id = -1
+        self._lock = threading.Lock()
+        self.add(docs)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, docs):
+        """
+        ✅ (id, text) 문서들 추가 → 추가한 수
+        """
+        from scipy import sparse
+
+        indptr, indices, counts, ids = [0], [], [], []
+        with self._lock:
+            for doc_id, text in docs:
+                tf = Counter(tokenize(text))
+                for term, count in tf.items():
+                    indices.append(self.vocab.setdefault(term, len(self.vocab)))
+                    counts.append(count)
+                indptr.append(len(indices))
+                ids.append(doc_id)
+            if not ids:
+                return 0
+
+            n_terms = len(self.vocab)
+            tf = sparse.csr_matrix(
+                (np.asarray(counts, dtype=np.float32), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+                shape=(len(ids), n_terms),
+            )
+            segments = self.segments + [(tf.tocsc(), len(self.ids))]
+            if len(segments) > MAX_SEGMENTS:
+                segments = [(self._merged(segments, n_terms), 0)]
+            df = np.zeros(n_terms, dtype=np.int64)
+            df[:len(self.df)] = self.df
+            df += np.bincount(tf.indices, minlength=n_terms)
+
+            # 검색 중인 스레드가 보는 배열은 바꾸지 않고 새 배열로 교체
+            self.segments = segments
+            self.df = df
+            self.doc_len = np.concatenate([self.doc_len, np.asarray(tf.sum(axis=1), dtype=np.float32).ravel()])
+            self.ids = np.concatenate([self.ids, np.asarray(ids, dtype=np.int64)])
+            self.last_id = max(self.last_id, int(max(ids)))
+            return len(ids)
+
+    @staticmethod
+    def _merged(segments, n_terms):
+        from scipy import sparse
+
+        resized = [
+            sparse.csc_matrix((seg.data, seg.indices, np.concatenate(
+                [seg.indptr, np.full(n_terms - seg.shape[1], seg.indptr[-1])]
+            )), shape=(seg.shape[0], n_terms))
+            for seg, _ in segments
+        ]
+        return sparse.vstack(resized, format="csc")
+
+    def _snapshot(self):
+        with self._lock:
+            return self.vocab, self.ids, self.doc_len, self.df, self.segments
+
+    def search(self, queries, k=10, allowed_ids=None):
+        """
+        ✅ 질의 배치 → (scores, ids)  FAISS 와 같은 모양, 못 채운 자리는 id = -1
+        - allowed_ids: 필터(keyword/corp/source)에 맞는 문서 id 만 후보로
+        """
+        from scipy import sparse
+
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        vocab, doc_ids, doc_len, df, segments = self._snapshot()
+        n_docs = len(doc_ids)
+        if not n_docs or not vocab:
+            return scores, ids
+
+        # 질의 → 등장 용어 열 (질의 × 용어) 지시 행렬
+        query_terms = [{vocab[t] for t in tokenize(q) if t in vocab} for q in queries]
+        cols = np.asarray(sorted(set().union(*query_terms)), dtype=np.int64)
+        if not len(cols):
+            return scores, ids
+        position = {c: i for i, c in enumerate(cols)}
+        rows = [r for r, terms in enumerate(query_terms) for _ in terms]
+        qcols = [position[c] for terms in query_terms for c in terms]
+        query_matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, qcols)), shape=(len(queries), len(cols))
+        )
+
+        # BM25: idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))  → 질의 용어 열만 계산
+        idf = np.log(1 + (n_docs - df[cols] + 0.5) / (df[cols] + 0.5)).astype(np.float32)
+        norm = (BM25_K1 * (1 - BM25_B + BM25_B * doc_len / (doc_len.mean() or 1.0))).astype(np.float32)
+        dense = np.zeros((n_docs, len(queries)), dtype=np.float32)
+        for seg, offset in segments:
+            in_seg = np.flatnonzero(cols < seg.shape[1])
+            if not len(in_seg):
+                continue
+            sub = seg[:, cols[in_seg]]
+            term = np.repeat(np.arange(len(in_seg)), np.diff(sub.indptr))
+            data = sub.data * (BM25_K1 + 1) / (sub.data + norm[offset + sub.indices]) * idf[in_seg][term]
+            weights = sparse.csc_matrix((data, sub.indices, sub.indptr), shape=sub.shape)
+            dense[offset:offset + seg.shape[0]] = (weights @ query_matrix[:, in_seg].T).toarray()
+        dense = dense.T  # (질의, 문서)
+
+        if allowed_ids is not None:
+            mask = np.isin(doc_ids, np.asarray(list(allowed_ids), dtype=np.int64))
+            if not mask.any():
+                return scores, ids
+            dense[:, ~mask] = 0.0
+
+        top = min(k, n_docs)
+        part = np.argpartition(-dense, top - 1, axis=1)[:, :top]
+        for r in range(len(queries)):
+            order = part[r][np.argsort(-dense[r, part[r]])]
+            order = order[dense[r, order] > 0]  # 겹치는 용어가 없는 문서는 제외
+            scores[r, :len(order)] = dense[r, order]
+            ids[r, :len(order)] = doc_ids[order]
+        return scores, ids
+
+
+_index = None
+_index_lock = threading.Lock()
+_rebuild_thread = None
+
+
+def _rebuild_in_background():
+    """
+    ✅ 문서가 삭제됐을 때 전체 재구성 (데몬 스레드, 그동안 기존 인덱스로 검색)
+    - 삭제된 id 가 검색돼도 retrieval 이 get_docs 에서 걸러냄
+    """
+    global _index
+    try:
+        store = get_store()
+        index = BM25Index(store.iter_texts())
+        with _index_lock:
+            index.add(store.iter_texts(after_id=index.last_id))
+            _index = index
+        print(f"✅ BM25 인덱스 재구성 ({len(index)}건)")
+    except Exception as e:
+        print(f"⚠️ BM25 인덱스 재구성 실패: {e}")
+
+
+def get_lexical_index():
+    """
+    ✅ 프로세스 공용 BM25 인덱스
+    - 처음 한 번 전체 구성, 이후 새 문서(id > 마지막 id)만 추가
+    - 삭제로 문서 수가 어긋나면 백그라운드에서 다시 구성
+    """
+    global _index, _rebuild_thread
+    store = get_store()
+    count, max_id = store.version()
+    with _index_lock:
+        if _index is None:
+            _index = BM25Index(store.iter_texts())
+        elif max_id > _index.last_id:
+            _index.add(store.iter_texts(after_id=_index.last_id))
+        if len(_index) != count and (_rebuild_thread is None or not _rebuild_thread.is_alive()):
+            _rebuild_thread = threading.Thread(target=_rebuild_in_background, name="bm25-rebuild", daemon=True)
+            _rebuild_thread.start()
+        return _index
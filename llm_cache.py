@@ -0,0 +1,106 @@
+# llm_cache.py
+import hashlib
+import json
+import os
+import threading
+import time
+
+import local_db
+
+LLM_CACHE_DB_PATH = "data/llm_cache.db"
+LLM_CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def prompt_key(model, prompt):
+    """
+    ✅ 캐시 키: hash(모델 + 프롬프트)  (프롬프트는 문자열 또는 messages 리스트)
+    """
+    if not isinstance(prompt, str):
+        prompt = json.dumps(prompt, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    ✅ LLM 응답 캐시 (SQLite 파일 → 재시작/워커 프로세스 간 공유)
+    - TTL 지난 응답은 무시 후 삭제
+    - 전체 크기가 max_bytes 를 넘으면 오래 안 쓴 응답부터 삭제 (LRU)
+    - hit/miss 카운터
+    """
+
+    def __init__(self, db_path=LLM_CACHE_DB_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS,
+                 max_bytes=LLM_CACHE_MAX_BYTES):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = local_db.connect(db_path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL, "
+                "size INTEGER NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_used ON responses(last_used)")
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+
+    def get(self, model, prompt):
+        key = prompt_key(model, prompt)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            response, created_at = row
+            with self._conn:
+                if now - created_at > self.ttl_seconds:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.stats["expired"] += 1
+                    self.stats["misses"] += 1
+                    return None
+                self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.stats["hits"] += 1
+            return response
+
+    def put(self, model, prompt, response):
+        key = prompt_key(model, prompt)
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 오래 안 쓴 순으로 넘친 만큼 삭제
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.stats["evicted"] += len(victims)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache()
+    return _cache
@@ -0,0 +1,263 @@
+# llm_client.py
+import os
+import threading
+import time
+from collections import deque
+
+from app_secrets import get_secret
+from llm_cache import get_llm_cache
+from llm_usage import get_llm_usage_log
+from rate_limiter import RateLimiter, backoff_delay, is_retryable, retry_after_seconds
+from text_chunker import estimate_tokens
+
+CLOVA_MODEL = "HCX-005"
+GPT_MODEL = "gpt-4o-mini"
+
+# ✅ 공급자별 호출 한도 (환경변수로 실제 쿼터에 맞춰 조정)
+RATE_LIMITS = {
+    "clova": {
+        "requests_per_minute": int(os.environ.get("CLOVA_RPM", "60")),
+        "tokens_per_minute": int(os.environ.get("CLOVA_TPM", "0")),
+        "max_concurrency": int(os.environ.get("CLOVA_MAX_CONCURRENCY", "4")),
+    },
+    "openai": {
+        "requests_per_minute": int(os.environ.get("GPT_RPM", "500")),
+        "tokens_per_minute": int(os.environ.get("GPT_TPM", "200000")),
+        "max_concurrency": int(os.environ.get("GPT_MAX_CONCURRENCY", "8")),
+    },
+}
+MAX_RETRIES = 3
+
+_clients = {}
+_clients_lock = threading.Lock()
+_limiters = {provider: RateLimiter(**cfg) for provider, cfg in RATE_LIMITS.items()}
+
+# ✅ 스트리밍 지연시간 지표 (TTFT = 요청 → 첫 토큰)
+_stats_lock = threading.Lock()
+STREAM_STATS = {
+    "streams": 0,
+    "cache_hits": 0,
+    "total_ttft_seconds": 0.0,
+    "last_ttft_seconds": 0.0,
+    "total_seconds": 0.0,
+    "last_seconds": 0.0,
+}
+RECENT_TTFT = deque(maxlen=100)  # (모델, TTFT 초, 전체 초)
+
+
+def provider_of(model):
+    return "clova" if model.startswith("HCX") else "openai"
+
+
+def get_limiter(model):
+    """
+    ✅ 공급자별 공유 호출 제한기 (rag_search / korea_dart_loader 공용)
+    """
+    return _limiters[provider_of(model)]
+
+
+def get_client(model):
+    """
+    ✅ 모델별 OpenAI 호환 클라이언트 (첫 호출 시 1회 생성)
+    - HCX-* → Clova (OPENAI_API_KEY / OPENAI_BASE_URL)
+    - 그 외 → OpenAI (GPT_API_KEY)
+    """
+    provider = provider_of(model)
+    if provider not in _clients:
+        with _clients_lock:
+            if provider not in _clients:
+                from openai import OpenAI
+
+                if provider == "clova":
+                    _clients[provider] = OpenAI(
+                        api_key=get_secret("OPENAI_API_KEY"),
+                        base_url=get_secret("OPENAI_BASE_URL"),
+                    )
+                else:
+                    _clients[provider] = OpenAI(api_key=get_secret("GPT_API_KEY"))
+    return _clients[provider]
+
+
+def as_messages(prompt):
+    """
+    ✅ 프롬프트 문자열 → user 메시지 하나 (이미 messages 리스트면 그대로)
+    """
+    if isinstance(prompt, str):
+        return [{"role": "user", "content": prompt}]
+    return prompt
+
+
+def estimate_prompt_tokens(messages):
+    return sum(estimate_tokens(m["content"]) for m in messages)
+
+
+def record_usage(model, messages, answer, usage=None, label=""):
+    """
+    ✅ 호출 1건의 입력/출력 토큰 기록 (usage 없으면 추정치)
+    """
+    try:
+        if usage is not None:
+            details = getattr(usage, "prompt_tokens_details", None)
+            get_llm_usage_log().record(
+                model, usage.prompt_tokens, usage.completion_tokens,
+                cached_tokens=getattr(details, "cached_tokens", 0) or 0, label=label,
+            )
+        else:
+            get_llm_usage_log().record(
+                model, estimate_prompt_tokens(messages), estimate_tokens(answer or ""),
+                estimated=True, label=label,
+            )
+    except Exception as e:
+        print(f"⚠️ 토큰 사용량 기록 실패: {e}")
+
+
+def chat_completion(prompt, model=CLOVA_MODEL, use_cache=True, retry=MAX_RETRIES, label=""):
+    """
+    ✅ LLM 호출 공통 경로 (캐시 → 호출 제한 → API → 재시도)
+    - prompt: 문자열 또는 messages 리스트 (고정 지시문은 system 으로 → prompt_builder)
+    - 같은 모델 + 같은 프롬프트는 SQLite 캐시에서 바로 반환
+    - 429/5xx 는 Retry-After 또는 지터 지수 백오프 후 재시도
+    - 최종 실패 시 예외를 그대로 올림 (대체 문구는 호출부 책임)
+    """
+    cache = get_llm_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(model, prompt)
+        if cached is not None:
+            print(f"✅ 캐싱된 LLM 응답 반환 ({model})")
+            return cached
+
+    messages = as_messages(prompt)
+    limiter = get_limiter(model)
+    for attempt in range(retry + 1):
+        try:
+            with limiter.acquire(tokens=estimate_prompt_tokens(messages)):
+                res = get_client(model).chat.completions.create(
+                    model=model,
+                    messages=messages,
+                )
+            break
+        except Exception as e:
+            if attempt >= retry or not is_retryable(e):
+                raise
+            retry_after = retry_after_seconds(e)
+            wait = backoff_delay(attempt, retry_after)
+            if retry_after is not None:
+                # 공급자가 알려준 대기시간은 다른 호출에도 적용
+                limiter.penalize(retry_after)
+            print(f"⚠️ {model} 호출 제한/오류 → {wait:.1f}초 후 재시도 ({attempt + 1}/{retry})")
+            time.sleep(wait)
+
+    answer = res.choices[0].message.content
+    record_usage(model, messages, answer, getattr(res, "usage", None), label)
+    if cache is not None and answer:
+        cache.put(model, prompt, answer)
+    return answer
+
+
+def _record_stream(model, ttft, elapsed):
+    with _stats_lock:
+        STREAM_STATS["streams"] += 1
+        STREAM_STATS["total_ttft_seconds"] += ttft
+        STREAM_STATS["last_ttft_seconds"] = ttft
+        STREAM_STATS["total_seconds"] += elapsed
+        STREAM_STATS["last_seconds"] = elapsed
+        RECENT_TTFT.append((model, ttft, elapsed))
+
+
+def get_stream_stats():
+    """
+    ✅ 스트리밍 지표 스냅샷 (평균 TTFT 포함, 캐시 적중은 평균에서 제외)
+    """
+    with _stats_lock:
+        stats = dict(STREAM_STATS)
+        recent = list(RECENT_TTFT)
+    calls = stats["streams"]
+    stats["avg_ttft_seconds"] = stats["total_ttft_seconds"] / calls if calls else 0.0
+    stats["avg_seconds"] = stats["total_seconds"] / calls if calls else 0.0
+    stats["recent"] = recent
+    return stats
+
+
+class ChatStream:
+    """
+    ✅ chat_completion 의 스트리밍 버전 (stream=True) - for 문 / st.write_stream 으로 조각 단위 수신
+    - 캐시 적중 → 저장된 전체 텍스트를 한 조각으로
+    - 재시도는 첫 토큰 전까지만 (이미 화면에 나간 뒤에는 예외/대체 문구)
+    - 다 받으면 .text 에 전체 응답 → 캐시 저장, .ttft 에 첫 토큰까지 걸린 초
+    - on_error(e) → 대체 문구: 주면 예외 대신 그 문구를 마지막 조각으로 내보냄
+    """
+
+    def __init__(self, prompt, model=CLOVA_MODEL, use_cache=True, retry=MAX_RETRIES, on_error=None, label=""):
+        self.prompt = prompt
+        self.model = model
+        self.label = label
+        self.use_cache = use_cache
+        self.retry = retry
+        self.on_error = on_error
+        self.text = None
+        self.ttft = None
+        self.cached = False
+
+    def __iter__(self):
+        try:
+            yield from self._stream()
+        except Exception as e:
+            if self.on_error is None:
+                raise
+            message = self.on_error(e)
+            self.text = (self.text or "") + message
+            yield message
+
+    def _stream(self):
+        start = time.perf_counter()
+        cache = get_llm_cache() if self.use_cache else None
+        if cache is not None:
+            cached = cache.get(self.model, self.prompt)
+            if cached is not None:
+                self.ttft, self.cached, self.text = time.perf_counter() - start, True, cached
+                with _stats_lock:
+                    STREAM_STATS["cache_hits"] += 1
+                yield cached
+                return
+
+        messages = as_messages(self.prompt)
+        limiter = get_limiter(self.model)
+        # OpenAI 는 마지막 조각에 usage 를 실어 줌 (호환 API 는 옵션을 모를 수 있어 OpenAI 만)
+        options = {"stream_options": {"include_usage": True}} if provider_of(self.model) == "openai" else {}
+        pieces, usage = [], None
+        for attempt in range(self.retry + 1):
+            try:
+                # 스트림을 읽는 동안 동시 호출 슬롯 유지
+                with limiter.acquire(tokens=estimate_prompt_tokens(messages)):
+                    res = get_client(self.model).chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        stream=True,
+                        **options,
+                    )
+                    for chunk in res:
+                        usage = getattr(chunk, "usage", None) or usage
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if not delta:
+                            continue
+                        if self.ttft is None:
+                            self.ttft = time.perf_counter() - start
+                        pieces.append(delta)
+                        self.text = "".join(pieces)
+                        yield delta
+                break
+            except Exception as e:
+                if pieces or attempt >= self.retry or not is_retryable(e):
+                    raise
+                retry_after = retry_after_seconds(e)
+                wait = backoff_delay(attempt, retry_after)
+                if retry_after is not None:
+                    limiter.penalize(retry_after)
+                print(f"⚠️ {self.model} 스트리밍 호출 제한/오류 → {wait:.1f}초 후 재시도 ({attempt + 1}/{self.retry})")
+                time.sleep(wait)
+
+        self.text = "".join(pieces)
+        _record_stream(self.model, self.ttft if self.ttft is not None else 0.0, time.perf_counter() - start)
+        record_usage(self.model, messages, self.text, usage, self.label)
+        if cache is not None and self.text:
+            cache.put(self.model, self.prompt, self.text)
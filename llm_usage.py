@@ -0,0 +1,79 @@
+# llm_usage.py
+import threading
+import time
+
+import local_db
+
+LLM_USAGE_DB_PATH = "data/llm_usage.db"
+
+
+class LLMUsageLog:
+    """
+    ✅ LLM 호출별 입력/출력 토큰 기록 (SQLite)
+    - 공급자가 usage 를 주면 그 값, 안 주면 추정치 (estimated = 1)
+    - cached_tokens: 공급자 측 프롬프트 캐시로 처리된 입력 토큰 (OpenAI prompt_tokens_details)
+    """
+
+    def __init__(self, db_path=LLM_USAGE_DB_PATH):
+        self._lock = threading.Lock()
+        self._conn = local_db.connect(db_path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, model TEXT NOT NULL, label TEXT NOT NULL, "
+                "input_tokens INTEGER NOT NULL, output_tokens INTEGER NOT NULL, "
+                "cached_tokens INTEGER NOT NULL, estimated INTEGER NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_created ON usage(created_at)")
+
+    def record(self, model, input_tokens, output_tokens, cached_tokens=0, estimated=False, label=""):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO usage (model, label, input_tokens, output_tokens, cached_tokens, estimated, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (model, label, int(input_tokens), int(output_tokens), int(cached_tokens or 0),
+                 int(bool(estimated)), time.time()),
+            )
+
+    def summary(self, since=None):
+        """
+        ✅ (모델, 용도)별 합계 [{"model", "label", "calls", "input_tokens", "output_tokens", "cached_tokens"}]
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT model, label, COUNT(*), SUM(input_tokens), SUM(output_tokens), SUM(cached_tokens) "
+                "FROM usage WHERE created_at >= ? GROUP BY model, label ORDER BY SUM(input_tokens) DESC",
+                (since or 0,),
+            ).fetchall()
+        keys = ("model", "label", "calls", "input_tokens", "output_tokens", "cached_tokens")
+        return [dict(zip(keys, row)) for row in rows]
+
+
+_log = None
+_log_lock = threading.Lock()
+
+
+def get_llm_usage_log():
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = LLMUsageLog()
+    return _log
+
+
+# 토큰 사용량 요약: python llm_usage.py [--days 7]
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=float, default=7)
+    args = parser.parse_args()
+    # cached: 공급자 prefix 캐시로 처리된 입력 토큰 비율 (system 지시문이 캐시 최소 길이를 넘어야 0 이 아님)
+    for row in get_llm_usage_log().summary(since=time.time() - args.days * 24 * 60 * 60):
+        cached_share = row["cached_tokens"] / row["input_tokens"] if row["input_tokens"] else 0.0
+        print(
+            f"{row['model']:<14}{row['label'] or '-':<16}{row['calls']:>6} calls"
+            f"{row['input_tokens']:>10} in{row['output_tokens']:>10} out{row['cached_tokens']:>10} cached"
+            f"{cached_share:>8.1%}"
+        )
@@ -0,0 +1,19 @@
+# local_db.py
+import os
+import sqlite3
+
+
+def connect(db_path):
+    """
+    ✅ 로컬 SQLite 저장소 연결
+    - 상위 폴더 자동 생성
+    - WAL 모드 → Streamlit 여러 세션/스레드에서 동시 읽기
+    - check_same_thread=False → 호출하는 쪽에서 Lock으로 직렬화
+    """
+    folder = os.path.dirname(db_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
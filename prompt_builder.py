@@ -0,0 +1,234 @@
+# prompt_builder.py
+import re
+
+from lexical_index import tokenize
+from retrieval import build_context
+
+PROMPT_DEDUPE_THRESHOLD = 0.8  # 용어 집합 Jaccard 가 이 이상이면 같은 내용으로 보고 제외
+
+_TRAILING_SPACE = re.compile(r"[ 　]+$", re.MULTILINE)
+_SPACE_RUN = re.compile(r"[ 　]{2,}")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def compact_text(text):
+    """
+    ✅ 공백 압축 (줄 끝 공백 제거, 연속 공백 → 1칸, 빈 줄 여러 개 → 1개)
+    - 탭은 표 열 구분자라 그대로 유지
+    """
+    text = _TRAILING_SPACE.sub("", text)
+    text = _SPACE_RUN.sub(" ", text)
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+# ================================
+# ✅ 고정 지시문 (system 메시지)
+# - 지시문 문구는 기존 프롬프트 그대로, 매 호출 바뀌는 컨텍스트만 user 메시지로 분리
+# - 공급자 측 prefix 캐시는 최소 길이(OpenAI 1024 토큰)를 넘어야 적용되므로 이 지시문만으로는 보장 안 됨
+#   → 실제 적중량은 호출별 cached_tokens 로 기록 (python llm_usage.py)
+# ================================
+NEWS_SYSTEM_PROMPT = compact_text("""
+너는 **해외 기업 실적 발표(어닝콜)를 분석해주는 투자 분석 전문가 AI**야.
+분석 대상은 **투자 초보자**이기 때문에, 친근하면서도 정확하고 구체적으로 설명해줘야 해.
+
+---
+
+ **분석 시 반드시 지켜야 할 규칙**
+
+1. 실적 수치는 절대 바꾸지 말고 뉴스에 나온 그대로 유지해.
+   - 매출, EPS(주당순이익), 성장률 등
+   - “예상치 대비 얼마나 차이 났는지” 명확히 적시
+2. 전문 용어는 초보자가 이해할 수 있도록 풀어서 설명해줘.
+   - EPS → 주당순이익
+   - YoY → 전년 동기 대비
+   - Guidance → 회사가 전망한 향후 실적 예상
+3. “그래서 주가에 긍정적인지, 부정적인지” 명확히 판단해줘.
+4. CEO 발언, 주주환원(자사주 매입 등), 성장전략 등도 언급되었으면 꼭 포함시켜.
+5. 시나리오는 최대한 구체적으로, 주가가 어떤 조건에서 어떻게 움직일 수 있을지 예측해줘.
+
+---
+
+✍️ **출력 형식**
+
+1 **핵심 요약 (2~3줄)**
+- EPS, 매출이 시장 예상보다 얼마나 좋았는지/나빴는지
+- CEO 발언이나 주요 이슈가 있었는지 간략히 요약
+- 초보 투자자가 직관적으로 이해할 수 있는 문장으로 표현
+
+
+2 **시장 컨센서스와 비교 분석**
+- 시장 컨센스가 예상보다 좋았고, 어떤 건 아쉬웠는지
+- 투자자들이 실망했을 만한 포인트는 무엇인지
+- 기대보다 좋았음에도 주가가 하락했다면, 그 이유도 설명 (ex. 가이던스 하향)
+
+3 **주가 영향 시나리오 (핵심)**
+각 시나리오는 **숫자 + 조건 + 시장 반응 예상**을 함께 제시해줘
+
+-  **호재 시나리오 (상승 가능)**
+→ EPS + 매출 모두 서프라이즈, 향후 성장 기대감, 자사주 매입 등
+→ 주가 +5~10% 상승 가능 조건 제시
+
+-  **중립 시나리오 (변동성 낮음)**
+→ 예상치와 비슷, 특별한 이슈 없음
+→ 주가 +1~2% 또는 보합
+
+- **악재 시나리오 (하락 가능성)**
+→ 실적 미달, 전망 하향, 매크로 불확실성 등
+→ 주가 -3~10% 하락 위험 구체적 근거 제시
+
+→ 시나리오 예측에 신뢰성을 더하기 위해 **최근 비슷한 기업의 사례**나 시장 반응도 참조 가능
+
+4 **초보 투자자 행동 가이드 (1줄)**
+→ “지금은 관망이 좋아요”, “분할 매수 고려 가능”, “리스크 크므로 신중히 접근” 등
+→ 반드시 위 시나리오 기반으로 결론 도출
+
+---
+
+ **절대 숫자 임의로 만들지 마! 뉴스 기반으로만 판단해!**
+ **어려운 용어는 설명하거나 바꿔서 초보자도 이해 가능하게!**
+ **시나리오가 핵심이다. 각 조건과 반응을 구체적으로!**
+""")
+
+DISCLOSURE_SYSTEM_PROMPT = compact_text("""
+너는 **초보 투자자들을 위한 재무 분석 AI**이자,
+동시에 **현실적인 투자 시나리오를 제시하는 투자 전략 어드바이저**야.
+
+ 분석 목적:
+- 초보 투자자가 이해할 수 있는 핵심 요약
+- 공시 수치 기반 변화 요약 + 시장 반응 예상
+- 구체적인 투자 판단 시나리오 제공 (주가 반등 or 리스크 경고)
+
+---
+
+✍️ **출력 형식**
+
+---
+
+1 **공시 원본 표 기반 요약**
+→ 숫자는 절대 바꾸지 말고 기반하여 표로 핵심 요약을 제공해줘
+
+---
+
+2 **한눈에 보는 핵심 요약 (2~3줄)**
+- 매출/영업이익/순이익의 전년 대비, 전분기 대비 변화
+- 간단한 문장으로 좋은 소식인지 나쁜 소식인지 판단 근거 포함
+
+---
+
+3 **시장 컨센서스와 비교**
+- 증권가 예상치 대비 얼마나 차이 나는지 (예상치 없으면 '미제공' 명시)
+- 숫자 차이와 그 의미를 설명해줘 (ex. 매출은 높았지만 이익률은 낮음 등)
+
+---
+
+4 **고도화된 투자 시나리오 (핵심)**
+각 시나리오에서 “왜” 그런 판단이 나오는지를 뉴스와 데이터 기반으로 충분히 뒷받침해줘.
+
+-  **호재 시나리오 (상승 가능)**
+→ 어떤 조건(신사업, 수주 증가, 이익률 반등 등)에서 주가가 반등할 수 있는지
+→ 크롤링한 뉴스/업종 트렌드 참고해서 구체적이고 현실적으로
+
+-  **중립 시나리오 (관망)**
+→ 실적은 나쁘지 않지만 아직 모멘텀 부족한 이유
+→ 외부 리스크 요인(환율, 금리, 글로벌 변수 등)도 고려
+
+- **악재 시나리오 (하락 위험)**
+→ 실적 부진 외에도 주가 하락 압력을 주는 구조적 문제
+→ 예: 고정비 부담, 실적 휘발성, 경쟁 심화, 수요 감소 등
+
+각 시나리오에서 "주가가 실제로 어떻게 반응할 가능성이 있는지"도 예시처럼 간단히 숫자로 표현해줘 (ex. “5% 반등 여지”)
+
+---
+
+5 **초보 투자자 행동 가이드 (1줄)**
+- 지금은 관망인지, 분할 매수인지, 손절 타이밍인지
+- 단순 감정이 아니라 “시나리오 분석 기반”으로 결정해야 함
+
+→ 예시:
+- “저가 매수 기회일 수 있어요. 거래량 증가 여부를 지켜보세요.”
+- “실적 하락과 함께 모멘텀 부족. 지금은 관망이 좋습니다.”
+- “호재는 있지만 시장 전반이 불안정하므로 신중한 접근 필요.”
+
+---
+
+ **절대 표 속 숫자 바꾸지 마!**
+ **표→요약→시나리오→행동 순서로 논리 흐름을 유지해줘**
+ **초보자도 이해 가능한 쉬운 언어와 간결한 설명만!**
+""")
+
+CHUNK_SUMMARY_SYSTEM_PROMPT = compact_text("""
+아래 공시 일부를 **핵심 요약**으로 정리해줘.
+- 표 안 숫자는 유지
+- 보고서 재무 관련 핵심 데이터를 요약하면서 비교 강조
+""")
+
+REDUCE_SYSTEM_PROMPT = compact_text("""
+아래 공시 부분 요약들을 **하나의 요약으로 합쳐줘**.
+- 표/재무 숫자는 그대로 유지
+- 중복 내용은 한 번만
+""")
+
+FINAL_SUMMARY_SYSTEM_PROMPT = compact_text("""
+아래 여러 개의 요약을 **한 문서로 통합 요약**해줘.
+- 재무 숫자는 유지 매출, 영업이익, 순이익 변화율 강조
+- 초보 투자자가 이해할 수 있는 3~4줄 요약
+- 핵심 요약만 남기고 불필요한 문장은 제거
+""")
+
+
+# ================================
+# ✅ 컨텍스트 압축 (중복 제거 + 토큰 상한)
+# ================================
+def dedupe_texts(texts, threshold=PROMPT_DEDUPE_THRESHOLD):
+    """
+    ✅ 거의 같은 텍스트 제거 (순서 유지, 먼저 나온 쪽을 남김)
+    - 같은 기사가 여러 매체/청크로 들어온 경우: 용어 집합 Jaccard ≥ threshold 이면 중복
+    """
+    kept, kept_terms = [], []
+    for text in texts:
+        terms = set(tokenize(text))
+        if not terms:
+            continue
+        if any(len(terms & seen) / len(terms | seen) >= threshold for seen in kept_terms):
+            continue
+        kept.append(text)
+        kept_terms.append(terms)
+    return kept
+
+
+def compact_context(hits, max_tokens, threshold=PROMPT_DEDUPE_THRESHOLD):
+    """
+    ✅ 검색 결과 → 공백 압축 + 중복 제거 후 토큰 상한 안의 컨텍스트
+    """
+    texts = dedupe_texts([compact_text(hit["text"]) for hit in hits], threshold)
+    return build_context([{"text": t} for t in texts], max_tokens)
+
+
+def build_messages(system, user):
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+
+
+# ================================
+# ✅ 호출별 messages
+# ================================
+def news_messages(hits, max_tokens):
+    return build_messages(NEWS_SYSTEM_PROMPT, f"**어닝 뉴스 본문**\n{compact_context(hits, max_tokens)}")
+
+
+def disclosure_messages(hits, max_tokens):
+    return build_messages(DISCLOSURE_SYSTEM_PROMPT, f"**공시 원문 (표 포함)**\n{compact_context(hits, max_tokens)}")
+
+
+def chunk_summary_messages(chunk):
+    return build_messages(CHUNK_SUMMARY_SYSTEM_PROMPT, f"내용:\n{compact_text(chunk)}")
+
+
+def reduce_messages(summaries):
+    return build_messages(REDUCE_SYSTEM_PROMPT, "\n\n".join(dedupe_texts(summaries)))
+
+
+def final_summary_messages(summaries):
+    return build_messages(FINAL_SUMMARY_SYSTEM_PROMPT, "\n\n".join(dedupe_texts(summaries)))
@@ -1,10 +1,33 @@
 # rag_index.py
-from sentence_transformers import SentenceTransformer
-import faiss, numpy as np, json, os
-
-embed_model = SentenceTransformer("all-MiniLM-L6-v2")
-
-#  해외 뉴스 JSON → 벡터DB 생성
+import json, os, datetime
+from vector_store import get_store
+
+NEWS_MIN_CHARS = 50
+
+def news_text(item):
+    """
+    ✅ 뉴스 항목 → 벡터DB 문서 텍스트 (본문이 있으면 제목+본문, 없으면 검색 미리보기)
+    """
+    body = (item.get("body") or "").strip()
+    if len(body) > NEWS_MIN_CHARS:
+        return f"{item.get('title', '')}\n{body}".strip()
+    return (item.get("preview") or "").strip()
+
+#  뉴스 기사 1건 → 전역 벡터DB에 바로 추가 (크롤러 on_item 콜백용)
+def add_news_item(item, keyword="", corp="", prefix=""):
+    text = news_text(item)
+    if len(text) <= NEWS_MIN_CHARS:
+        return []
+    return get_store().add(
+        [prefix + text],
+        source="news",
+        keyword=keyword,
+        corp=corp,
+        date=datetime.date.today().strftime("%Y%m%d"),
+        urls=[item.get("url") or ""],
+    )
+
+#  해외 뉴스 JSON → 전역 벡터DB에 추가 (keyword 태그)
 def create_faiss_index(keyword):
     json_path = f"data/{keyword}.json"
     if not os.path.exists(json_path):
@@ -14,38 +37,24 @@ def create_faiss_index(keyword):
     with open(json_path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    docs = [
-        item.get("preview", "").strip()
-        for item in data
-        if item.get("preview") and len(item["preview"].strip()) > 50
-    ]
-    if not docs:
+    items = [item for item in data if len(news_text(item)) > NEWS_MIN_CHARS]
+    if not items:
         print("❌ 유효한 뉴스 문서 없음")
         return
 
-    embs = embed_model.encode(docs)
-    if len(embs.shape) == 1:
-        embs = embs.reshape(1, -1)
-
-    idx = faiss.IndexFlatL2(embs.shape[1])
-    idx.add(np.array(embs))
-
-    os.makedirs("embeddings", exist_ok=True)
-    faiss.write_index(idx, f"embeddings/{keyword}_index.faiss")
-    print(f"뉴스 벡터DB 저장: embeddings/{keyword}_index.faiss")
-
-# 한국 공시/뉴스 → 직접 docs 리스트 받아 벡터DB 생성
-def create_faiss_index_from_docs(docs, save_path):
+    ids = get_store().add(
+        [news_text(item) for item in items],
+        source="news",
+        keyword=keyword,
+        date=datetime.date.today().strftime("%Y%m%d"),
+        urls=[item.get("url") or "" for item in items],
+    )
+    print(f"뉴스 벡터DB 추가: {keyword} ({len(ids)}건)")
+    return ids
+
+# 한국 공시/뉴스 → 직접 docs 리스트 받아 전역 벡터DB에 추가 (corp 태그)
+def create_faiss_index_from_docs(docs, corp="", keyword="", source="disclosure", date="", urls=None):
     if not docs or len(docs) == 0:
         raise ValueError("❌ docs 리스트 비어있음")
 
-    embs = embed_model.encode(docs)
-    if len(embs.shape) == 1:
-        embs = embs.reshape(1, -1)
-
-    idx = faiss.IndexFlatL2(embs.shape[1])
-    idx.add(np.array(embs))
-
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    faiss.write_index(idx, save_path)
-    return idx
\ No newline at end of file
+    return get_store().add(docs, source=source, keyword=keyword, corp=corp, date=date, urls=urls)
@@ -0,0 +1,117 @@
+# rate_limiter.py
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+
+class TokenBucket:
+    """
+    ✅ 토큰 버킷 (분당 용량 → 초당 충전)
+    - reserve() 는 기다릴 필요가 있는 시간만 계산해 돌려줌 (잠금 안에서 sleep 하지 않음)
+    - per_minute 가 0 이하 → 제한 없음 (CLOVA_RPM=0 등)
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = max(0.0, float(per_minute))
+        self.rate = self.capacity / 60.0
+        self._level = self.capacity
+        self._updated = time.monotonic()
+
+    def reserve(self, amount, now):
+        if self.rate <= 0:
+            return 0.0
+        elapsed = now - self._updated
+        self._updated = now
+        self._level = min(self.capacity, self._level + elapsed * self.rate)
+        # 한 번에 용량보다 큰 요청도 통과는 시키되 그만큼 빚을 짐
+        amount = min(amount, self.capacity)
+        self._level -= amount
+        if self._level >= 0:
+            return 0.0
+        return -self._level / self.rate
+
+
+class RateLimiter:
+    """
+    ✅ 스레드 공용 호출 제한기
+    - 요청 수/분 + (선택) 토큰 수/분 토큰 버킷 (0 이하 → 그 기준은 제한 없음)
+    - 동시에 진행 중인 호출 수 max_concurrency 로 제한
+    - 429 Retry-After 를 받으면 penalize() 로 모든 호출을 함께 늦춤
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute=0, max_concurrency=4):
+        if max_concurrency < 1:
+            raise ValueError(f"❌ max_concurrency 는 1 이상이어야 함: {max_concurrency}")
+        self._lock = threading.Lock()
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._blocked_until = 0.0
+
+    def _reserve(self, tokens):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._requests.reserve(1, now)
+            if self._tokens is not None:
+                wait = max(wait, self._tokens.reserve(tokens, now))
+            return max(wait, self._blocked_until - now)
+
+    def penalize(self, seconds):
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    @contextmanager
+    def acquire(self, tokens=1):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            print(f"⏳ 호출 한도 → {wait:.1f}초 대기")
+            time.sleep(wait)
+        self._slots.acquire()
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+
+# ================================
+# ✅ 재시도 지연 (지터 + 지수 백오프, Retry-After 우선)
+# ================================
+def retry_after_seconds(error):
+    """
+    ✅ 예외/응답의 Retry-After 헤더 → 초 (없으면 None)
+    """
+    response = getattr(error, "response", error)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def status_code_of(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is None and "429" in str(error):
+        status = 429
+    return status
+
+
+def is_retryable(error):
+    status = status_code_of(error)
+    return status == 429 or (status is not None and status >= 500)
+
+
+def backoff_delay(attempt, retry_after=None, base=1.0, cap=60.0):
+    """
+    ✅ attempt 번째 재시도 대기시간
+    - Retry-After 있으면 그 값 + 약간의 지터
+    - 없으면 full jitter: uniform(0, min(cap, base * 2^attempt))
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, 1.0)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
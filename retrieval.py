@@ -0,0 +1,159 @@
+# retrieval.py
+import os
+
+import numpy as np
+
+import embedding_service
+from lexical_index import get_lexical_index
+from text_chunker import get_token_counter
+from vector_store import get_store
+
+RETRIEVAL_MIN_SCORE = float(os.environ.get("RETRIEVAL_MIN_SCORE", "0.1"))  # 코사인 유사도 하한
+RETRIEVAL_MMR_LAMBDA = float(os.environ.get("RETRIEVAL_MMR_LAMBDA", "0.7"))  # 1 → 관련도만, 0 → 다양성만
+RETRIEVAL_FETCH_FACTOR = 4  # MMR/RRF 후보 = k × 이 값
+RETRIEVAL_HYBRID = os.environ.get("RETRIEVAL_HYBRID", "1") != "0"  # BM25 + 벡터 RRF 결합
+RRF_K = 60
+
+
+def rrf_fuse(ranked_lists, k=RRF_K):
+    """
+    ✅ Reciprocal Rank Fusion: 순위 목록들 → [(id, Σ 1/(k + 순위))] 점수 내림차순
+    - 점수 척도가 다른 BM25 / 코사인 유사도를 순위만으로 합침
+    """
+    fused = {}
+    for ranked in ranked_lists:
+        for rank, doc_id in enumerate(ranked, 1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda x: -x[1])
+
+
+def mmr_select(candidates, vectors, k, lambda_=RETRIEVAL_MMR_LAMBDA):
+    """
+    ✅ MMR (Maximal Marginal Relevance): 관련도는 높고 이미 고른 문서와는 덜 비슷한 순서로 k개
+    - candidates: [(id, 관련도 점수)] 내림차순, vectors: {id: 정규화 벡터}
+    - 관련도는 최고점 대비 비율로 맞춰 코사인 유사도(중복도)와 같은 척도로 비교
+    """
+    candidates = [(i, s) for i, s in candidates if i in vectors]
+    if len(candidates) <= 1 or lambda_ >= 1.0:
+        return [i for i, _ in candidates[:k]]
+    ids = [i for i, _ in candidates]
+    relevance = np.asarray([s for _, s in candidates], dtype=np.float32)
+    relevance = relevance / (relevance.max() or 1.0)
+    mat = np.vstack([vectors[i] for i in ids])
+    similarity = mat @ mat.T
+
+    selected = []
+    remaining = list(range(len(ids)))
+    while remaining and len(selected) < k:
+        if selected:
+            redundancy = similarity[np.ix_(remaining, selected)].max(axis=1)
+        else:
+            redundancy = np.zeros(len(remaining))
+        scores = lambda_ * relevance[remaining] - (1 - lambda_) * redundancy
+        best = remaining[int(np.argmax(scores))]
+        selected.append(best)
+        remaining.remove(best)
+    return [ids[i] for i in selected]
+
+
+def _ranked(scores, ids, min_score=None):
+    """
+    ✅ 검색 결과 한 행 → [(id, score)]  (-1 패딩 / 하한 미만 제거)
+    """
+    return [
+        (int(i), float(s)) for s, i in zip(scores, ids)
+        if i >= 0 and (min_score is None or s >= min_score)
+    ]
+
+
+def retrieve_many(requests, k=4, min_score=RETRIEVAL_MIN_SCORE, mmr_lambda=RETRIEVAL_MMR_LAMBDA,
+                  hybrid=RETRIEVAL_HYBRID):
+    """
+    ✅ 여러 질의 한 번에 검색
+    - requests: [{"query": str, "keyword"/"corp"/"source": 필터(선택)}]
+    - 모든 질의를 한 번에 임베딩, 같은 필터끼리 묶어 index.search 한 번 (+ BM25 희소 곱 한 번)
+    - hybrid → 벡터 순위와 BM25 순위를 RRF 로 합침 (영어 임베딩 모델의 한국어 재현율 보완)
+    - 반환: 요청 순서대로 [{"id", "text", ..., "score", "vector_score", "bm25_score"}]
+    - FAISS 가 못 채운 자리(-1)와 min_score 미만 벡터 결과는 버림
+    """
+    if not requests:
+        return []
+    store = get_store()
+    queries = [r["query"] for r in requests]
+    query_embs = embedding_service.encode(queries)
+    fetch_k = k * RETRIEVAL_FETCH_FACTOR if (mmr_lambda < 1.0 or hybrid) else k
+    lexical = get_lexical_index() if hybrid else None
+
+    groups = {}
+    for i, r in enumerate(requests):
+        groups.setdefault((r.get("keyword"), r.get("corp"), r.get("source")), []).append(i)
+
+    results = [[] for _ in requests]
+    for (keyword, corp, source), idx in groups.items():
+        scores, ids = store.search(query_embs[idx], k=fetch_k, keyword=keyword, corp=corp, source=source)
+        vector_hits = [_ranked(s, i, min_score) for s, i in zip(scores, ids)]
+        if lexical is not None:
+            filtered = keyword is not None or corp is not None or source is not None
+            allowed = store.filter_ids(keyword=keyword, corp=corp, source=source) if filtered else None
+            lex_scores, lex_ids = lexical.search([queries[q] for q in idx], k=fetch_k, allowed_ids=allowed)
+            lexical_hits = [_ranked(s, i) for s, i in zip(lex_scores, lex_ids)]
+        else:
+            lexical_hits = [[] for _ in idx]
+
+        all_ids = {i for hits in vector_hits + lexical_hits for i, _ in hits}
+        if not all_ids:
+            continue
+        docs = store.get_docs(all_ids)
+        vectors = store.get_vectors(all_ids) if mmr_lambda < 1.0 else {}
+
+        for q, vec, lex in zip(idx, vector_hits, lexical_hits):
+            if lexical is not None:
+                candidates = rrf_fuse([[i for i, _ in vec], [i for i, _ in lex]])
+            else:
+                candidates = vec
+            if vectors:
+                chosen = mmr_select(candidates, vectors, k, mmr_lambda)
+            else:
+                chosen = [i for i, _ in candidates[:k]]
+            score_of, vector_score, bm25_score = dict(candidates), dict(vec), dict(lex)
+            results[q] = [
+                {**docs[i], "score": score_of[i], "vector_score": vector_score.get(i),
+                 "bm25_score": bm25_score.get(i)}
+                for i in chosen if i in docs
+            ]
+    return results
+
+
+def retrieve(queries, k=4, keyword=None, corp=None, source=None, **options):
+    """
+    ✅ 같은 필터의 질의 배치 → 질의별 top-k 문서 (점수 포함)
+    """
+    return retrieve_many(
+        [{"query": q, "keyword": keyword, "corp": corp, "source": source} for q in queries], k=k, **options
+    )
+
+
+def build_context(hits, max_tokens, count_tokens=None, separator="\n\n"):
+    """
+    ✅ 검색 결과 → 토큰 상한 안의 컨텍스트 문자열 (순서 유지, 마지막 문서는 남은 토큰만큼 자름)
+    """
+    count_tokens = count_tokens or get_token_counter()
+    parts, used = [], 0
+    sep_tokens = count_tokens(separator)
+    for hit in hits:
+        text = hit["text"].strip()
+        budget = max_tokens - used - (sep_tokens if parts else 0)
+        if budget <= 0:
+            break
+        tokens = count_tokens(text)
+        if tokens > budget:
+            # 비율로 자른 뒤 넘치면 조금씩 더 줄임
+            text = text[: int(len(text) * budget / tokens)]
+            while text and count_tokens(text) > budget:
+                text = text[: int(len(text) * 0.9)]
+            if not text:
+                break
+            tokens = count_tokens(text)
+        parts.append(text)
+        used += tokens + (sep_tokens if len(parts) > 1 else 0)
+    return separator.join(parts)
@@ -0,0 +1,146 @@
+# startup.py
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# 앱이 직접 import 하는 모듈 (streamlit_ui 본문은 실행하지 않고 의존성만 측정)
+APP_MODULES = [
+    "streamlit",
+    "streamlit_calendar",
+    "pandas",
+    "crawler",
+    "earnings_calendar",
+    "symbol_names",
+    "rag_index",
+    "rag_search",
+    "korea_dart_loader",
+]
+APP_WARMUP_ENABLED = os.environ.get("APP_WARMUP", "1") != "0"
+
+_process_start = time.perf_counter()
+CHECKPOINTS = []  # (이름, 시작 후 ms)
+
+
+def checkpoint(label):
+    """
+    ✅ 시작 단계 타임스탬프 기록 (startup 모듈 import 시점 기준 ms)
+    """
+    CHECKPOINTS.append((label, (time.perf_counter() - _process_start) * 1000))
+
+
+# ================================
+# ✅ import 시간 프로파일 (python -X importtime)
+# ================================
+def profile_imports(modules=APP_MODULES):
+    """
+    ✅ 새 인터프리터에서 -X importtime 으로 modules import → [(cumulative_us, self_us, 모듈)] 큰 순
+    - 이미 import 된 현재 프로세스와 무관하게 콜드 스타트 기준으로 측정
+    """
+    code = "import " + ", ".join(modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    if proc.returncode != 0:
+        print(f"⚠️ import 프로파일 중 오류:\n{proc.stderr.splitlines()[-1] if proc.stderr else ''}")
+    return sorted(rows, reverse=True)
+
+
+def format_report(rows, top=20):
+    lines = [f"{'cumulative(ms)':>15}{'self(ms)':>10}  module"]
+    for cumulative_us, self_us, name in rows[:top]:
+        lines.append(f"{cumulative_us / 1000:>15.1f}{self_us / 1000:>10.1f}  {name}")
+    if CHECKPOINTS:
+        lines.append("")
+        lines.append("시작 단계 (프로세스 기준 ms)")
+        lines.extend(f"{ms:>15.1f}  {label}" for label, ms in CHECKPOINTS)
+    return "\n".join(lines)
+
+
+# ================================
+# ✅ 백그라운드 워밍업 (첫 클릭 지연 제거)
+# ================================
+def _warm_vector_store():
+    from vector_store import get_store
+
+    get_store()
+
+
+def _warm_lexical_index():
+    from lexical_index import get_lexical_index
+
+    get_lexical_index()
+
+
+def _warm_embedding_model():
+    import embedding_service
+
+    embedding_service.get_model()
+
+
+def _warm_llm_clients():
+    from llm_client import CLOVA_MODEL, GPT_MODEL, get_client
+
+    get_client(CLOVA_MODEL)
+    get_client(GPT_MODEL)
+
+
+def _warm_article_extractor():
+    import trafilatura  # noqa: F401
+
+
+WARMUP_STEPS = [
+    ("faiss + 벡터DB", _warm_vector_store),
+    ("BM25 인덱스", _warm_lexical_index),
+    ("임베딩 모델", _warm_embedding_model),
+    ("LLM 클라이언트", _warm_llm_clients),
+    ("trafilatura", _warm_article_extractor),
+]
+
+
+def _warmup():
+    start = time.perf_counter()
+    for label, step in WARMUP_STEPS:
+        try:
+            step()
+            checkpoint(f"warmup: {label}")
+        except Exception as e:
+            print(f"⚠️ 워밍업 실패 ({label}): {e}")
+    print(f"✅ 워밍업 완료 ({time.perf_counter() - start:.1f}s)")
+
+
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+
+
+def start_warmup():
+    """
+    ✅ 무거운 모듈/모델/클라이언트를 데몬 스레드에서 미리 로드 (APP_WARMUP=0 이면 끔)
+    """
+    global _warmup_thread
+    if not APP_WARMUP_ENABLED:
+        return None
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_warmup, name="app-warmup", daemon=True)
+            _warmup_thread.start()
+    return _warmup_thread
+
+
+# 콜드 스타트 import 시간 보고서: python startup.py [--top 30]
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("modules", nargs="*", default=APP_MODULES)
+    args = parser.parse_args()
+    print(format_report(profile_imports(args.modules), top=args.top))
@@ -1,14 +1,21 @@
+import startup
 import pandas as pd
 import streamlit as st
-import yfinance as yf
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from streamlit_calendar import calendar
 import os
 
 from crawler import crawl_naver_view_titles
-from rag_index import create_faiss_index
-from rag_search import rag_query
-from korea_dart_loader import get_corp_list, get_recent_disclosures , analyze_disclosure_with_rag
+from earnings_calendar import get_earnings_calendar
+from symbol_names import get_company_names, get_symbol_name_store, load_directory_names, normalize_symbol
+from rag_index import add_news_item
+from rag_search import rag_query_stream
+from korea_dart_loader import (
+    get_corp_registry, get_calendar_disclosures, start_market_disclosure_sync, analyze_disclosure_with_rag
+)
+
+startup.checkpoint("app modules imported")
+STARTUP_PROFILE = os.environ.get("STARTUP_PROFILE", "0") != "0"
 
 #########################################
 # 1) 미국 상장주 리스트 로드 & 클린 필터링
@@ -22,7 +29,8 @@ def load_clean_us_symbols():
     ✅ 캐싱 후 재실행 시 빠르게 로드
     """
     cache_path = "data/clean_us_symbols.csv"
-    if os.path.exists(cache_path):
+    # 회사명 테이블이 비어 있으면 디렉터리 파일을 다시 받아 함께 채움
+    if os.path.exists(cache_path) and len(get_symbol_name_store()):
         df = pd.read_csv(cache_path)
         return df["Symbol"].tolist()
 
@@ -30,6 +38,7 @@ def load_clean_us_symbols():
     sp500_url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
     sp500_table = pd.read_html(sp500_url)[0]
     sp500_symbols = sp500_table["Symbol"].tolist()
+    load_directory_names(sp500_table, "Symbol", name_column="Security", source="wikipedia")
 
     # --- 2) NASDAQ/NYSE/AMEX ---
     nasdaq_url = "ftp://ftp.nasdaqtrader.com/SymbolDirectory/nasdaqlisted.txt"
@@ -43,6 +52,10 @@ def load_clean_us_symbols():
         df1_clean = df1[(df1["ETF"] == "N") & (df1["Test Issue"] == "N")]
         df2_clean = df2[(df2["Test Issue"] == "N")]
 
+        # ✅ 회사명(Security Name) 일괄 저장 → 종목마다 .info 호출하지 않음
+        load_directory_names(df1_clean, "Symbol")
+        load_directory_names(df2_clean, "ACT Symbol")
+
         # ✅ Symbol 컬럼 합치기
         all_symbols_raw = pd.concat([
             df1_clean["Symbol"],
@@ -53,9 +66,6 @@ def load_clean_us_symbols():
         all_symbols_raw = []
 
     # --- 3) yfinance 호환 심볼 변환 (. → -)
-    def normalize_symbol(sym):
-        return sym.replace(".", "-").strip()
-
     sp500_symbols = [normalize_symbol(s) for s in sp500_symbols]
     all_symbols_raw = [normalize_symbol(s) for s in all_symbols_raw]
 
@@ -77,65 +87,118 @@ def load_clean_us_symbols():
 #########################################
 # 2) yfinance 회사명 가져오기
 #########################################
-@st.cache_data
 def fetch_company_names(symbols):
     """
     ✅ 선택된 심볼의 회사명(Long Name) 가져오기
+    ✅ 심볼 단위 영구 캐시 (디렉터리 파일 일괄 적재, 없는 심볼만 .info 병렬 조회)
     """
-    result = {}
-    for sym in symbols:
-        try:
-            info = yf.Ticker(sym).info
-            long_name = info.get("longName") or info.get("shortName") or "Unknown Company"
-            result[sym] = long_name
-        except Exception:
-            result[sym] = "Unknown Company"
-    return result
+    return get_company_names(symbols)
 
 #########################################
 # 3) yfinance 어닝 일정 가져오기
 #########################################
-def get_earnings_calendar(symbols):
-    events = []
-    for symbol in symbols:
-        stock = yf.Ticker(symbol)
-        info = stock.calendar
-
-        if hasattr(info, "index") and "Earnings Date" in info.index:
-            earnings_date_raw = info.loc["Earnings Date"][0]
-            eps_estimate = (
-                info.loc["Earnings Average"][0]
-                if "Earnings Average" in info.index else "N/A"
-            )
-        elif isinstance(info, dict) and "Earnings Date" in info:
-            earnings_date_raw = info["Earnings Date"]
-            eps_estimate = info.get("Earnings Average", "N/A")
-        else:
-            continue
-
-        if isinstance(earnings_date_raw, list) and len(earnings_date_raw) > 0:
-            earnings_date = earnings_date_raw[0]
-        else:
-            earnings_date = earnings_date_raw
-
-        if hasattr(earnings_date, "strftime"):
-            earnings_date = earnings_date.strftime("%Y-%m-%d")
-        elif not isinstance(earnings_date, str):
-            earnings_date = str(earnings_date)
-
-        events.append({
-            "title": f"{symbol} 어닝콜 (EPS {eps_estimate})",
-            "start": earnings_date,
-            "symbol": symbol,
-            "eps_estimate": eps_estimate
-        })
+# ✅ 스레드 풀 병렬 조회 + 심볼별 SQLite TTL 캐시 → earnings_calendar.get_earnings_calendar
+
+#########################################
+# 4) 한국 상장사 레지스트리
+#########################################
+@st.cache_resource
+def load_corp_registry():
+    """
+    ✅ DART corp_code 레지스트리 (SQLite + 메모리 인덱스)
+    ✅ 재실행마다 corpCode.xml을 다시 받지 않음
+    """
+    return get_corp_registry()
+
+def default_visible_range(today=None):
+    """
+    ✅ 월간 캘린더 첫 화면 구간 (이번 달 + 앞뒤 주 격자, YYYYMMDD)
+    """
+    today = today or date.today()
+    first = today.replace(day=1)
+    next_month = (first + timedelta(days=32)).replace(day=1)
+    return (first - timedelta(days=7)).strftime("%Y%m%d"), (next_month + timedelta(days=6)).strftime("%Y%m%d")
+
+def visible_range_from_callback(dates_set):
+    """
+    ✅ streamlit_calendar datesSet 콜백 → (시작, 끝) YYYYMMDD (FullCalendar 의 end 는 미포함)
+    """
+    start = date.fromisoformat(dates_set["start"][:10])
+    end = date.fromisoformat(dates_set["end"][:10]) - timedelta(days=1)
+    return start.strftime("%Y%m%d"), end.strftime("%Y%m%d")
+
+def visible_month_date(start_date, end_date):
+    """
+    ✅ 보이는 구간의 가운데 날짜 (월 격자 앞뒤 주가 다른 달이어도 같은 달을 다시 그림)
+    """
+    start = datetime.strptime(start_date, "%Y%m%d").date()
+    end = datetime.strptime(end_date, "%Y%m%d").date()
+    return (start + (end - start) / 2).isoformat()
+
+#########################################
+# 5) 시작 최적화 (워밍업 + import 시간 보고서)
+#########################################
+@st.cache_resource
+def start_app_warmup():
+    """
+    ✅ 임베딩 모델/faiss/LLM 클라이언트를 백그라운드에서 미리 로드 (프로세스당 1회)
+    """
+    return startup.start_warmup()
+
+@st.cache_resource
+def load_startup_report():
+    """
+    ✅ 콜드 스타트 import 시간 보고서 (STARTUP_PROFILE=1 일 때만, 프로세스당 1회)
+    """
+    return startup.format_report(startup.profile_imports())
+
+#########################################
+# 6) LLM 응답 스트리밍
+#########################################
+def write_llm_stream(chunks):
+    """
+    ✅ LLM 응답을 토큰 조각이 오는 대로 표시하고 전체 텍스트 반환
+    ✅ 첫 토큰까지 걸린 시간(TTFT) 함께 표시
+    """
+    text = st.write_stream(chunks)
+    ttft = getattr(chunks, "ttft", None)
+    if ttft is not None:
+        st.caption(f"⏱ 첫 토큰 {ttft:.2f}s" + (" (캐시)" if chunks.cached else ""))
+    return getattr(chunks, "text", None) or text
 
-    return events
+def render_latency_metrics():
+    """
+    ✅ 사이드바: 임베딩 encode / LLM 스트리밍 지연시간 지표 (프로세스 누적)
+    """
+    import embedding_service
+    from llm_client import get_stream_stats
+
+    encode = embedding_service.get_encode_stats()
+    stream = get_stream_stats()
+    with st.sidebar.expander("📈 지연시간 지표"):
+        st.caption("임베딩")
+        st.write(
+            f"모델 로드 {encode['load_seconds']:.2f}s · encode {encode['calls']}회 "
+            f"(평균 {encode['avg_seconds'] * 1000:.0f}ms, 최근 {encode['last_seconds'] * 1000:.0f}ms) · "
+            f"캐시 적중 {encode['cache_hits']} / 미스 {encode['cache_misses']}"
+        )
+        st.caption("LLM 스트리밍")
+        st.write(
+            f"응답 {stream['streams']}회 · 첫 토큰 평균 {stream['avg_ttft_seconds']:.2f}s "
+            f"(최근 {stream['last_ttft_seconds']:.2f}s) · 전체 평균 {stream['avg_seconds']:.2f}s · "
+            f"캐시 응답 {stream['cache_hits']}회"
+        )
 
 #########################################################
-# ✅ 5) Streamlit UI
+# ✅ 7) Streamlit UI
 #########################################################
 st.title("📊 글로벌 & 한국 주식 캘린더/공시 + 뉴스 RAG")
+startup.checkpoint("title rendered")
+start_app_warmup()
+
+if STARTUP_PROFILE:
+    with st.sidebar.expander("⏱ 시작 시간 보고서"):
+        st.code(load_startup_report())
 
 tab1, tab2 = st.tabs(["🌎 해외 주식", "🇰🇷 한국 주식"])
 
@@ -192,13 +255,16 @@ with tab1:
                 or st.session_state["last_selected_symbol"] != symbol
             ):
                 with st.spinner(f"📰 {symbol} 뉴스 크롤링 및 RAG 분석 중..."):
-                    crawl_naver_view_titles(keyword, limit=10)
-                    create_faiss_index(keyword)
-                    summary = rag_query(keyword, query)
+                    # 기사 본문이 도착하는 대로 벡터DB에 추가
+                    crawl_naver_view_titles(
+                        keyword, limit=10, on_item=lambda item: add_news_item(item, keyword=keyword)
+                    )
+                    chunks = rag_query_stream(keyword, query)
+                st.markdown("🤖 분석 결과:")
+                summary = write_llm_stream(chunks)
                 st.session_state["last_selected_symbol"] = symbol
                 st.session_state["last_summary"] = summary
-
-            if "last_summary" in st.session_state:
+            elif "last_summary" in st.session_state:
                 st.success(f"🤖 분석 결과:\n\n{st.session_state['last_summary']}")
 
 #########################
@@ -207,50 +273,75 @@ with tab1:
 with tab2:
     st.subheader("🇰🇷 한국 실적공시 캘린더 + 뉴스/공시 결합 RAG")
 
-    # ✅ 한국 상장사 리스트 불러오기
-    corp_df = get_corp_list()
-    if corp_df.empty:
+    # ✅ 한국 상장사 리스트 불러오기 (프로세스당 1회 로드, TTL 지나면 조건부 갱신)
+    corp_registry = load_corp_registry()
+    corp_registry.refresh()
+    corp_names = corp_registry.names()
+
+    # ✅ 시장 전체 실적 공시는 백그라운드 스레드가 로컬 DB로 동기화 → 캘린더는 DB만 조회
+    start_market_disclosure_sync()
+
+    corp_code = None
+    if not corp_names:
         st.warning("⚠️ 한국 상장사 데이터를 불러오지 못했습니다.")
-    else:
-        corp_names = corp_df["corp_name"].tolist()
+    elif st.checkbox("🏢 한 기업만 보기"):
         selected_corp = st.selectbox("🔍 검색할 한국 기업", corp_names)
-
         if selected_corp:
-            corp_code = corp_df[corp_df["corp_name"] == selected_corp]["corp_code"].values[0]
-
-            # ✅ ‘실적 관련 공시’ 캘린더 표시
-            if st.button("📆 한국 실적공시 캘린더 표시"):
-                disclosures = get_recent_disclosures(corp_code)
-
-                if disclosures:
-                    events = []
-                    for d in disclosures:
-                        # YYYYMMDD → YYYY-MM-DD 변환
-                        dt_fmt = f"{d['rcept_dt'][:4]}-{d['rcept_dt'][4:6]}-{d['rcept_dt'][6:]}"
-                        events.append({
-                            "title": f"{selected_corp} | {d['report_nm']}",
-                            "start": dt_fmt,
-                            "corp_name": selected_corp,
-                            "report_nm": d["report_nm"],
-                            "rcept_no": d["rcept_no"]
-                        })
-                    st.session_state["kr_events"] = events
-                else:
-                    st.warning("⚠️ 최근 90일간 실적 관련 공시가 없습니다.")
-
-    kr_events = st.session_state.get("kr_events", [])
-    if kr_events:
-        st.subheader("🗓 한국 실적공시 캘린더")
-        cal_ret = calendar(events=kr_events, options={"initialView": "dayGridMonth"})
-
-        # ✅ 캘린더 클릭 → 공시+뉴스 결합 RAG
-        if cal_ret and "eventClick" in cal_ret and "event" in cal_ret["eventClick"]:
-            evt = cal_ret["eventClick"]["event"]
-            cname = evt["extendedProps"]["corp_name"]
-            rname = evt["extendedProps"]["report_nm"]
-            rno = evt["extendedProps"]["rcept_no"]
-
-            st.info(f"✅ {cname} | {rname} 뉴스+공시 분석 실행중...")
-            with st.spinner("공시+뉴스 결합 RAG 분석 중..."):
-                summary = analyze_disclosure_with_rag(cname, rname, rno)
-            st.success(summary)
\ No newline at end of file
+            corp_code = corp_registry.lookup(selected_corp)["corp_code"]
+
+    # ✅ 캘린더에 보이는 구간 (datesSet 콜백으로 갱신, 처음엔 이번 달 격자)
+    start_date, end_date = st.session_state.get("kr_visible_range") or default_visible_range()
+    disclosures = get_calendar_disclosures(start_date, end_date, corp_code=corp_code)
+
+    kr_events = []
+    for d in disclosures:
+        # YYYYMMDD → YYYY-MM-DD 변환
+        dt_fmt = f"{d['rcept_dt'][:4]}-{d['rcept_dt'][4:6]}-{d['rcept_dt'][6:]}"
+        kr_events.append({
+            "title": f"{d['corp_name']} | {d['report_nm']}",
+            "start": dt_fmt,
+            "corp_name": d["corp_name"],
+            "report_nm": d["report_nm"],
+            "rcept_no": d["rcept_no"]
+        })
+
+    st.subheader("🗓 한국 실적공시 캘린더")
+    if not kr_events:
+        st.caption("⏳ 이 구간의 실적 공시가 없거나 아직 동기화 중입니다.")
+    cal_ret = calendar(
+        events=kr_events,
+        options={
+            "initialView": "dayGridMonth",
+            "initialDate": visible_month_date(start_date, end_date),
+            "dayMaxEvents": True,
+        },
+        callbacks=["datesSet", "eventClick"],
+        key="kr_calendar",
+    )
+
+    if cal_ret and cal_ret.get("callback") == "datesSet":
+        visible = visible_range_from_callback(cal_ret["datesSet"])
+        if visible != (start_date, end_date):
+            st.session_state["kr_visible_range"] = visible
+            st.rerun()
+
+    # ✅ 캘린더 클릭 → 공시+뉴스 결합 RAG
+    if cal_ret and "eventClick" in cal_ret and "event" in cal_ret["eventClick"]:
+        evt = cal_ret["eventClick"]["event"]
+        cname = evt["extendedProps"]["corp_name"]
+        rname = evt["extendedProps"]["report_nm"]
+        rno = evt["extendedProps"]["rcept_no"]
+
+        st.info(f"✅ {cname} | {rname} 뉴스+공시 분석 실행중...")
+        with st.spinner("공시+뉴스 결합 RAG 분석 중..."):
+            progress = st.progress(0.0, text="공시 원문 불러오는 중...")
+            chunks = analyze_disclosure_with_rag(
+                cname, rname, rno,
+                on_progress=lambda value, text: progress.progress(value, text=text),
+                stream=True,
+            )
+            progress.empty()
+        write_llm_stream(chunks)
+
+# ✅ 이번 실행에서 호출된 것까지 반영되도록 마지막에 표시
+render_latency_metrics()
@@ -0,0 +1,126 @@
+# symbol_names.py
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import local_db
+
+SYMBOL_NAMES_DB_PATH = "data/symbol_names.db"
+NAME_FETCH_MAX_WORKERS = int(os.environ.get("NAME_FETCH_MAX_WORKERS", "8"))
+UNKNOWN_COMPANY = "Unknown Company"
+
+# "Apple Inc. - Common Stock" / "Alphabet Inc. - Class A Common Stock" → "Apple Inc." / "Alphabet Inc. Class A"
+_SECURITY_SUFFIX = re.compile(
+    r"\s+(Common Stock|Common Shares|Ordinary Shares|American Depositary Shares|Units|Warrants?)\b.*$"
+)
+
+
+def normalize_symbol(sym):
+    """
+    ✅ yfinance 호환 심볼 (. → -)
+    """
+    return sym.replace(".", "-").strip()
+
+
+def clean_security_name(name):
+    return _SECURITY_SUFFIX.sub("", str(name).replace(" - ", " ")).strip(" ,")
+
+
+class SymbolNameStore:
+    """
+    ✅ 심볼 → 회사명 SQLite 테이블
+    - NASDAQ/otherlisted 디렉터리 파일(Security Name)로 한 번에 채움
+    - 디렉터리에 없는 심볼만 yfinance .info 로 보충 (심볼 단위 저장)
+    """
+
+    def __init__(self, db_path=SYMBOL_NAMES_DB_PATH):
+        self._lock = threading.Lock()
+        self._conn = local_db.connect(db_path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS names ("
+                "symbol TEXT PRIMARY KEY, name TEXT NOT NULL, source TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM names").fetchone()[0]
+
+    def put_many(self, pairs, source):
+        now = time.time()
+        rows = [(normalize_symbol(sym), name, source, now) for sym, name in pairs if sym and name]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO names (symbol, name, source, updated_at) VALUES (?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def get_many(self, symbols):
+        if not symbols:
+            return {}
+        placeholders = ",".join("?" * len(symbols))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT symbol, name FROM names WHERE symbol IN ({placeholders})", list(symbols)
+            ).fetchall()
+        return dict(rows)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_symbol_name_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SymbolNameStore()
+    return _store
+
+
+def load_directory_names(df, symbol_column, name_column="Security Name", source="nasdaqtrader"):
+    """
+    ✅ 심볼 디렉터리 DataFrame → 이름 테이블 일괄 저장
+    """
+    pairs = [
+        (str(sym), clean_security_name(name))
+        for sym, name in zip(df[symbol_column], df[name_column])
+        if isinstance(sym, str) and isinstance(name, str)
+    ]
+    return get_symbol_name_store().put_many(pairs, source)
+
+
+def fetch_info_name(symbol):
+    import yfinance as yf
+
+    info = yf.Ticker(symbol).info
+    return info.get("longName") or info.get("shortName")
+
+
+def get_company_names(symbols, max_workers=NAME_FETCH_MAX_WORKERS):
+    """
+    ✅ 심볼들의 회사명 {symbol: name}
+    - 이름 테이블에서 먼저 찾고, 없는 심볼만 .info 를 동시에 조회해 저장
+    - 조회 실패/이름 없음 → "Unknown Company" (저장하지 않음 → 다음에 다시 시도)
+    """
+    symbols = list(dict.fromkeys(symbols))
+    store = get_symbol_name_store()
+    names = store.get_many([normalize_symbol(s) for s in symbols])
+    result = {s: names.get(normalize_symbol(s)) for s in symbols}
+    missing = [s for s, name in result.items() if not name]
+
+    if missing:
+        fetched = {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+            for symbol, future in [(s, pool.submit(fetch_info_name, s)) for s in missing]:
+                try:
+                    fetched[symbol] = future.result()
+                except Exception as e:
+                    print(f"⚠️ {symbol} 회사명 조회 실패: {e}")
+        store.put_many([(s, n) for s, n in fetched.items() if n], source="yfinance")
+        result.update({s: n for s, n in fetched.items() if n})
+
+    return {s: name or UNKNOWN_COMPANY for s, name in result.items()}
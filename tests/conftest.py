@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 루트의 평면 모듈들 (crawler, http_client, ...) import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,46 @@
+import threading
+
+from corp_registry import CorpRegistry
+
+
+def _registry(tmp_path):
+    registry = CorpRegistry("test-key", db_path=str(tmp_path / "corps.db"))
+    with registry._conn:
+        registry._conn.executemany(
+            "INSERT INTO corps (corp_code, corp_name, stock_code) VALUES (?, ?, ?)",
+            [("00000001", "동명기업", ""), ("00000002", "동명기업", "000002"), ("00000003", "비상장", "")],
+        )
+    return registry
+
+
+def test_lookup_prefers_listed_company(tmp_path):
+    registry = _registry(tmp_path)
+
+    assert registry.lookup("동명기업")["corp_code"] == "00000002"
+    assert registry.names(listed_only=True) == ["동명기업"]
+    assert registry.lookup("없는회사") is None
+
+
+def test_lookup_survives_concurrent_invalidation(tmp_path):
+    registry = _registry(tmp_path)
+    errors = []
+
+    def invalidate():
+        for _ in range(2000):
+            registry._index = None  # refresh() 가 갱신 후 하는 일
+
+    def read():
+        try:
+            for _ in range(2000):
+                assert registry.lookup("비상장")["corp_code"] == "00000003"
+                assert "비상장" in registry.names()
+        except Exception as e:  # pragma: no cover - 실패 시 원인 보고
+            errors.append(e)
+
+    threads = [threading.Thread(target=invalidate)] + [threading.Thread(target=read) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
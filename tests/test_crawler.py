@@ -0,0 +1,103 @@
+import base64
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import crawler
+from http_client import HttpClient, ReplayTransport, request_key
+
+KEYWORD = "삼성전자 실적"
+SEARCH_URL = (
+    "https://search.naver.com/search.naver?where=view&sm=tab_jum&query="
+    + KEYWORD + "&sm=tab_smr&sort=0&ssc=tab.news.all"
+)
+ITEM_CLASS = "sds-comps-vertical-layout sds-comps-full-layout _sghYQmdqcpm83O1jqen"
+
+
+def _record(record_dir, url, html):
+    record = {
+        "url": url,
+        "status_code": 200,
+        "headers": {"Content-Type": "text/html; charset=utf-8"},
+        "body": base64.b64encode(html.encode("utf-8")).decode("ascii"),
+    }
+    with open(os.path.join(record_dir, request_key("GET", url) + ".json"), "w", encoding="utf-8") as f:
+        json.dump(record, f)
+
+
+def _search_page(urls):
+    items = "".join(
+        f'<div class="{ITEM_CLASS}"><a class="api_txt_lines total_tit" href="{url}">기사 {i}</a>'
+        f"<p>미리보기 {i}</p></div>"
+        for i, url in enumerate(urls, 1)
+    )
+    return f"<html><body>{items}</body></html>"
+
+
+def _article(body, canonical=None):
+    link = f'<link rel="canonical" href="{canonical}">' if canonical else ""
+    return f"<html><head>{link}</head><body><p>{body}</p></body></html>"
+
+
+def _extract(html, url):
+    # trafilatura 대신 <p> 본문만 (canonical 처리는 crawler 와 같은 정규식)
+    m = crawler._CANONICAL_LINK.search(html)
+    canonical = (m.group(1) or m.group(2)) if m else url
+    return " ".join(re.findall(r"<p>(.*?)</p>", html)), canonical
+
+
+@pytest.fixture
+def replay(tmp_path, monkeypatch):
+    record_dir = tmp_path / "records"
+    record_dir.mkdir()
+    client = HttpClient(transport=ReplayTransport(str(record_dir)), max_retries=0)
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(crawler, "get_http_client", lambda: client)
+    monkeypatch.setattr(crawler, "get_extract_pool", lambda: pool)
+    monkeypatch.setattr(crawler, "extract_article", _extract)
+    monkeypatch.chdir(tmp_path)
+    yield str(record_dir)
+    pool.shutdown()
+
+
+def test_articles_come_back_with_bodies(replay):
+    a = "https://news.example.com/a/1"
+    b = "https://other.example.com/b/2"
+    _record(replay, SEARCH_URL, _search_page([a, b]))
+    _record(replay, a, _article("본문 A"))
+    _record(replay, b, _article("본문 B", canonical=b))
+
+    results = crawler.crawl_naver_view_titles(KEYWORD, limit=10)
+
+    assert [r["url"] for r in results] == [a, b]
+    assert [r["body"] for r in results] == ["본문 A", "본문 B"]
+    assert os.path.exists(f"data/{KEYWORD}.json")
+
+
+def test_duplicate_articles_are_dropped(replay):
+    a = "https://news.example.com/a/1"
+    mobile = "https://m.news.example.com/a/1"
+    _record(replay, SEARCH_URL, _search_page([a, a + "?utm_source=naver", mobile]))
+    _record(replay, a, _article("본문 A", canonical=a))
+    _record(replay, mobile, _article("본문 A", canonical=a))
+
+    results = crawler.crawl_naver_view_titles(KEYWORD, limit=10)
+
+    # 검색 URL 중복(추적 파라미터) 1건 + canonical 중복(모바일 주소) 1건 제거
+    assert len(results) == 1
+    assert results[0]["body"] == "본문 A"
+    assert results[0]["canonical_url"] == crawler.canonical_url(a)
+
+
+def test_failed_fetch_keeps_search_preview(replay):
+    a = "https://news.example.com/a/1"
+    _record(replay, SEARCH_URL, _search_page([a]))  # 기사 녹화 없음 → 연결 오류
+
+    results = crawler.crawl_naver_view_titles(KEYWORD, limit=10)
+
+    assert len(results) == 1
+    assert "body" not in results[0]
+    assert "미리보기 1" in results[0]["preview"]
@@ -0,0 +1,52 @@
+from dart_parser import parse_dart_document, replace_html_entities
+
+SAMPLE = """<?xml version="1.0" encoding="utf-8"?>
+<DOCUMENT>
+<BODY>
+<P>당사는 반도체를 만듭니다.&nbsp;끝</P>
+<P>R&D 비용 &middot; 설비투자 <SPAN>증가</SPAN></P>
+<P>R&D 비용 &middot; 설비투자 <SPAN>증가</SPAN></P>
+<P>(단위 : 백만원)</P>
+<TABLE>
+<TR><TH>과 목</TH><TH>제 56 기</TH><TH>제 55 기</TH></TR>
+<TR><TD>매출액</TD><TD>258,935,494</TD><TD>302,231,360</TD></TR>
+<TR><TD>영업이익&nbsp;(손실)</TD><TD>6,566,976</TD><TD>43,376,630</TD></TR>
+</TABLE>
+<TABLE>
+<TR><TD>구분</TD><TD>비고</TD></TR>
+<TR><TD>A&amp;B</TD><TD>1,000</TD></TR>
+</TABLE>
+</BODY>
+</DOCUMENT>"""
+
+
+def test_entities_become_characters():
+    assert replace_html_entities("a&nbsp;b &amp; &lt; &#183; R&D &AMP; &unknown;") == (
+        "a\xa0b &amp; &lt; &#183; R&amp;D &amp; &amp;unknown;"
+    )
+
+
+def test_paragraphs_keep_words_apart_and_are_deduped():
+    doc = parse_dart_document(SAMPLE)
+
+    assert "당사는 반도체를 만듭니다. 끝" in doc.paragraphs
+    assert doc.paragraphs.count("R&D 비용 · 설비투자 증가") == 1
+    assert not any("증가" == p for p in doc.paragraphs)  # 인라인 SPAN 은 따로 안 나옴
+
+
+def test_tables_with_header_and_context():
+    doc = parse_dart_document(SAMPLE)
+    income, other = doc.tables
+
+    assert income.header == ["과 목", "제 56 기", "제 55 기"]
+    assert income.rows == [
+        ["매출액", "258,935,494", "302,231,360"],
+        ["영업이익 (손실)", "6,566,976", "43,376,630"],
+    ]
+    assert income.context == "(단위 : 백만원)"
+    assert other.header == ["구분", "비고"]  # TH 가 없어도 숫자 없는 첫 행은 헤더
+    assert other.rows == [["A&B", "1,000"]]
+
+
+def test_bytes_input_is_parsed_the_same():
+    assert parse_dart_document(SAMPLE.encode("utf-8")) == parse_dart_document(SAMPLE)
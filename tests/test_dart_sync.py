@@ -0,0 +1,84 @@
+import datetime
+import time
+
+import pytest
+
+from dart_sync import ALL_CORPS, BackgroundSync, DisclosureSync, merge_intervals, uncovered
+
+
+@pytest.fixture
+def sync(tmp_path, monkeypatch):
+    s = DisclosureSync("test-key", db_path=str(tmp_path / "disclosures.db"))
+    s.fetched = []
+
+    def fetch(start_date, end_date, corp_code=None):
+        s.fetched.append((start_date, end_date, corp_code))
+        return []
+
+    monkeypatch.setattr(s, "fetch", fetch)
+    return s
+
+
+def test_uncovered_and_merge():
+    intervals = [("20240101", "20240331"), ("20240503", "20240801")]
+    assert uncovered(intervals, "20240101", "20240801") == [("20240401", "20240502")]
+    assert uncovered(intervals, "20240201", "20240301") == []
+    assert merge_intervals(intervals + [("20240401", "20240502")]) == [("20240101", "20240801")]
+
+
+def test_gap_between_syncs_is_not_covered(sync):
+    sync.sync("20240101", "20240331")
+    sync.sync("20240503", "20240801")
+
+    assert sync.fetched == [("20240101", "20240331", None), ("20240503", "20240801", None)]
+    assert not sync.covers("20240401", "20240430")
+    assert sync._missing_ranges(ALL_CORPS, "20240401", "20240430") == [("20240401", "20240430")]
+
+    sync.sync("20240401", "20240430")
+    assert not sync.covers("20240101", "20240801")  # 5/1~5/2 는 아직
+    sync.sync("20240501", "20240502")
+    assert sync.covers("20240101", "20240801")
+
+
+def test_resync_of_past_range_is_a_no_op(sync):
+    sync.sync("20240101", "20240331")
+    sync.fetched.clear()
+
+    assert sync.sync("20240201", "20240331") == 0
+    sync.sync("20240301", "20240415")
+
+    assert sync.fetched == [("20240401", "20240415", None)]
+
+
+def test_days_from_sync_date_are_rechecked(sync):
+    today = datetime.date.today()
+    start = (today - datetime.timedelta(days=10)).strftime("%Y%m%d")
+    yesterday = (today - datetime.timedelta(days=1)).strftime("%Y%m%d")
+    sync.sync(start, today.strftime("%Y%m%d"))
+    sync.fetched.clear()
+
+    # 어제 동기화한 것처럼 → 어제와 오늘만 다시
+    with sync._conn:
+        sync._conn.execute("UPDATE synced_ranges SET synced_at = ?", (time.time() - 24 * 60 * 60,))
+    sync.sync(start, today.strftime("%Y%m%d"))
+
+    assert sync.fetched == [(yesterday, today.strftime("%Y%m%d"), None)]
+
+
+def test_market_sync_covers_company_scope(sync):
+    sync.sync("20240101", "20240331")
+    sync.fetched.clear()
+
+    sync.sync("20240101", "20240330", corp_code="00126380")
+
+    assert sync.fetched == []
+    assert sync.covers("20240101", "20240331", corp_code="00126380")
+
+
+def test_background_requests_are_deduped_while_pending(sync):
+    worker = BackgroundSync(sync)
+
+    assert worker.request("20240401", "20240430")
+    assert not worker.request("20240401", "20240430")
+    assert worker.request("20240501", "20240531")
+    assert worker._requests.qsize() == 2
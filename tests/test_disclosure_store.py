@@ -0,0 +1,43 @@
+import pytest
+
+from dart_parser import ParsedDocument, Table
+from disclosure_store import DisclosureStore
+
+
+def test_stage_roundtrip(tmp_path):
+    store = DisclosureStore(str(tmp_path))
+
+    assert store.get("20240101000001", "raw") is None
+    store.put("20240101000001", "raw", "<DOCUMENT>본문</DOCUMENT>")
+    store.put("20240101000001", "chunk_summaries", ["요약1", "요약2"])
+
+    assert store.get("20240101000001", "raw") == "<DOCUMENT>본문</DOCUMENT>"
+    assert store.get("20240101000001", "chunk_summaries") == ["요약1", "요약2"]
+    assert store.get("20240101000002", "raw") is None
+
+
+def test_parsed_document_roundtrip(tmp_path):
+    store = DisclosureStore(str(tmp_path))
+    doc = ParsedDocument(
+        paragraphs=["1. 매출 현황"],
+        tables=[Table(header=["구분", "금액"], rows=[["매출", "1,000"]], context="(단위 : 백만원)")],
+    )
+    store.put("20240101000001", "parsed", doc)
+
+    assert store.get("20240101000001", "parsed") == doc
+
+
+def test_deepest_stage_survives_reopen(tmp_path):
+    store = DisclosureStore(str(tmp_path))
+    assert store.deepest_stage("20240101000001") is None
+
+    store.put("20240101000001", "summary", "요약")
+    store.put("20240101000001", "raw", "원문")
+
+    assert DisclosureStore(str(tmp_path)).deepest_stage("20240101000001") == "summary"
+
+
+def test_unknown_stage_is_rejected(tmp_path):
+    store = DisclosureStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.put("20240101000001", "embedding", [])
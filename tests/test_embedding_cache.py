@@ -0,0 +1,40 @@
+import numpy as np
+
+from embedding_cache import EmbeddingCache, cache_key
+
+DIM = 4
+
+
+def _vectors(n, offset=0):
+    return np.arange(offset, offset + n * DIM, dtype=np.float32).reshape(n, DIM)
+
+
+def test_roundtrip_survives_reopen(tmp_path):
+    cache = EmbeddingCache(DIM, cache_dir=str(tmp_path))
+    keys = [cache_key("model", f"문장 {i}") for i in range(3)]
+    cache.put_many(keys, _vectors(3))
+
+    reopened = EmbeddingCache(DIM, cache_dir=str(tmp_path))
+    found = reopened.get_many(keys + [cache_key("model", "없는 문장")])
+
+    assert set(found) == set(keys)
+    np.testing.assert_array_equal(found[keys[1]], _vectors(3)[1])
+
+
+def test_key_depends_on_model():
+    assert cache_key("a", "문장") != cache_key("b", "문장")
+
+
+def test_full_cache_reuses_least_recently_used_rows(tmp_path):
+    cache = EmbeddingCache(DIM, cache_dir=str(tmp_path), max_bytes=10 * DIM * 4)  # 10행
+    keys = [f"k{i}" for i in range(10)]
+    cache.put_many(keys, _vectors(10))
+    with cache._conn:
+        cache._conn.execute("UPDATE entries SET last_used = last_used - 100 WHERE key = 'k3'")
+
+    cache.put_many(["new"], _vectors(1, offset=1000))
+    found = cache.get_many(keys + ["new"])
+
+    assert "k3" not in found and len(found) == 10
+    np.testing.assert_array_equal(found["new"], _vectors(1, offset=1000)[0])
+    np.testing.assert_array_equal(found["k4"], _vectors(10)[4])
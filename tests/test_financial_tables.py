@@ -0,0 +1,73 @@
+import numpy as np
+
+from dart_parser import ParsedDocument, Table
+from financial_tables import (
+    extract_financial_table,
+    extract_financials,
+    load_financials,
+    render_financials,
+    save_financials,
+)
+import financial_tables
+
+# 영업(잠정)실적(공정공시) 표 모양
+PRELIMINARY_HEADER = [
+    "구분", "당해실적", "전기실적", "전기대비증감율(%)", "전년동기실적", "전년동기대비증감율(%)",
+]
+PRELIMINARY_ROWS = [
+    ["매출액", "1,200", "1,000", "20.0", "800", "50.0"],
+    ["영업이익", "300", "250", "20.0", "200", "50.0"],
+    ["당기순이익", "90", "100", "-10.0", "60", "50.0"],
+]
+
+
+def _preliminary_table():
+    return Table(header=PRELIMINARY_HEADER, rows=PRELIMINARY_ROWS, context="(단위 : 억원)")
+
+
+def test_ratio_columns_are_not_periods():
+    fin = extract_financial_table(_preliminary_table())
+
+    assert fin.kind == "income"
+    assert fin.periods == ["당해실적", "전기실적", "전년동기실적"]
+    np.testing.assert_allclose(fin.values[0], [1200e8, 1000e8, 800e8])
+
+
+def test_render_has_no_percent_columns_as_amounts():
+    fin = extract_financial_table(_preliminary_table())
+    text = render_financials([fin])
+
+    assert "증감률(vs 전기대비증감율(%))" not in text
+    assert "매출액\t1,200\t1,000\t800\t+20.0%\t+50.0%" in text
+
+
+def test_uncertain_parse_keeps_raw_table():
+    doc = ParsedDocument(tables=[_preliminary_table()])
+
+    financials, used = extract_financials(doc)
+
+    assert len(financials) == 1
+    assert used == set()
+
+
+def test_plain_statement_replaces_raw_table():
+    table = Table(
+        header=["과목", "제10기", "제9기"],
+        rows=[["매출액", "1,000", "900"], ["영업이익", "100", "(50)"]],
+        context="(단위 : 백만원)",
+    )
+
+    financials, used = extract_financials(ParsedDocument(tables=[table]))
+
+    assert used == {0}
+    assert financials[0].periods == ["제10기", "제9기"]
+
+
+def test_old_cache_version_is_ignored(tmp_path, monkeypatch):
+    monkeypatch.setattr(financial_tables, "FINANCIALS_DIR", str(tmp_path))
+    fin = extract_financial_table(_preliminary_table())
+    save_financials("20240101000001", [fin])
+    assert load_financials("20240101000001")[0][0].periods == fin.periods
+
+    monkeypatch.setattr(financial_tables, "FINANCIALS_CACHE_VERSION", 99)
+    assert load_financials("20240101000001") is None
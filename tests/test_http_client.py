@@ -0,0 +1,77 @@
+from http_client import HttpCache, HttpClient, RecordingTransport, ReplayTransport, make_response
+
+
+class FakeTransport:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def send(self, method, url, params=None, headers=None, timeout=None, stream=False):
+        self.calls.append({"url": url, "headers": dict(headers or {}), "stream": stream})
+        status, headers, body = self.responses.pop(0)
+        return make_response(url, status, headers, body)
+
+
+def _client(tmp_path, responses):
+    transport = FakeTransport(responses)
+    return HttpClient(transport=transport, cache=HttpCache(str(tmp_path / "http.db")), max_retries=0), transport
+
+
+def test_fresh_for_caches_without_validators(tmp_path):
+    client, transport = _client(tmp_path, [(200, {}, b"PK-zip")])
+
+    first = client.get("https://example.com/doc", cache=True, fresh_for=60)
+    second = client.get("https://example.com/doc", cache=True, fresh_for=60)
+
+    assert first.content == second.content == b"PK-zip"
+    assert len(transport.calls) == 1
+
+
+def test_cache_if_rejects_error_bodies(tmp_path):
+    client, transport = _client(tmp_path, [(200, {}, b"<result>013</result>"), (200, {}, b"PKok")])
+    is_zip = lambda r: r.content[:2] == b"PK"
+
+    client.get("https://example.com/doc", cache=True, fresh_for=60, cache_if=is_zip)
+    res = client.get("https://example.com/doc", cache=True, fresh_for=60, cache_if=is_zip)
+
+    assert res.content == b"PKok"
+    assert len(transport.calls) == 2
+
+
+def test_etag_revalidation(tmp_path):
+    client, transport = _client(tmp_path, [(200, {"ETag": '"v1"'}, b"body"), (304, {}, b"")])
+
+    client.get("https://example.com/list", cache=True)
+    res = client.get("https://example.com/list", cache=True)
+
+    assert res.status_code == 200 and res.content == b"body"
+    assert transport.calls[1]["headers"]["If-None-Match"] == '"v1"'
+
+
+def test_eviction_keeps_cache_under_max_bytes(tmp_path):
+    cache = HttpCache(str(tmp_path / "http.db"), max_bytes=10)
+    for i in range(3):
+        cache.put(f"k{i}", make_response(f"https://example.com/{i}", 200, {}, b"123456"))
+
+    assert cache.get("k0") is None and cache.get("k1") is None
+    assert cache.get("k2")["body"] == b"123456"
+
+
+def test_recording_passes_stream_and_replays(tmp_path):
+    inner = FakeTransport([(200, {"Content-Type": "text/plain"}, b"hello")])
+    recorder = RecordingTransport(str(tmp_path / "rec"), inner=inner)
+
+    recorder.send("GET", "https://example.com/a", stream=True)
+    replayed = ReplayTransport(str(tmp_path / "rec")).send("GET", "https://example.com/a")
+
+    assert inner.calls[0]["stream"] is True
+    assert replayed.content == b"hello"
+
+
+def test_running_size_tracks_replacements(tmp_path):
+    cache = HttpCache(str(tmp_path / "http.db"), max_bytes=100)
+    cache.put("k", make_response("https://example.com/k", 200, {}, b"123456"))
+    cache.put("k", make_response("https://example.com/k", 200, {}, b"12"))
+
+    assert cache._bytes == 2
+    assert HttpCache(str(tmp_path / "http.db"))._bytes == 2
@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+
+import lexical_index
+from lexical_index import BM25Index
+
+WORDS = ["삼성전자", "영업이익", "매출", "반도체", "apple", "earnings", "순이익", "증가", "감소", "가이던스"]
+QUERIES = ["삼성전자 영업이익", "apple earnings 가이던스", "없는단어"]
+
+
+def _docs(n, seed=0):
+    rng = random.Random(seed)
+    return [(i + 1, " ".join(rng.choices(WORDS, k=rng.randint(3, 30)))) for i in range(n)]
+
+
+def test_incremental_adds_match_full_build():
+    docs = _docs(200)
+    full = BM25Index(docs)
+    incremental = BM25Index(docs[:20])
+    for start in range(20, 200, 15):
+        incremental.add(docs[start:start + 15])
+
+    assert len(incremental.segments) <= lexical_index.MAX_SEGMENTS
+    for allowed in (None, {doc_id for doc_id, _ in docs[::3]}):
+        s1, i1 = full.search(QUERIES, k=10, allowed_ids=allowed)
+        s2, i2 = incremental.search(QUERIES, k=10, allowed_ids=allowed)
+        np.testing.assert_allclose(s1, s2, rtol=1e-5)
+        np.testing.assert_array_equal(i1, i2)
+    assert (i2[2] == -1).all()
+
+
+class FakeStore:
+    def __init__(self, docs):
+        self.docs = dict(docs)
+        self.reads = 0
+
+    def version(self):
+        return len(self.docs), max(self.docs, default=0)
+
+    def iter_texts(self, after_id=-1):
+        for doc_id in sorted(self.docs):
+            if doc_id > after_id:
+                self.reads += 1
+                yield doc_id, self.docs[doc_id]
+
+
+def test_get_lexical_index_only_reads_new_docs(monkeypatch):
+    store = FakeStore(_docs(100))
+    monkeypatch.setattr(lexical_index, "get_store", lambda: store)
+    monkeypatch.setattr(lexical_index, "_index", None)
+
+    index = lexical_index.get_lexical_index()
+    assert len(index) == 100 and store.reads == 100
+
+    store.docs[101] = "삼성전자 신규 공시"
+    assert lexical_index.get_lexical_index() is index
+    assert len(index) == 101 and store.reads == 101
+    _, ids = index.search(["신규 공시"], k=1)
+    assert ids[0][0] == 101
@@ -0,0 +1,46 @@
+import time
+
+from llm_cache import LLMCache, prompt_key
+
+
+def test_roundtrip_and_stats(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.db"))
+    messages = [{"role": "system", "content": "규칙"}, {"role": "user", "content": "질문"}]
+
+    assert cache.get("gpt-4o-mini", messages) is None
+    cache.put("gpt-4o-mini", messages, "답변")
+
+    assert cache.get("gpt-4o-mini", messages) == "답변"
+    assert cache.get("HCX-005", messages) is None  # 모델이 다르면 다른 키
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 2
+
+
+def test_key_ignores_dict_order():
+    a = [{"role": "user", "content": "질문"}]
+    b = [{"content": "질문", "role": "user"}]
+
+    assert prompt_key("m", a) == prompt_key("m", b)
+    assert prompt_key("m", "질문") != prompt_key("m", a)
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.db"), ttl_seconds=60)
+    cache.put("m", "p", "old")
+    with cache._conn:
+        cache._conn.execute("UPDATE responses SET created_at = ?", (time.time() - 120,))
+
+    assert cache.get("m", "p") is None
+    assert cache.stats["expired"] == 1
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.db"), max_bytes=20)
+    cache.put("m", "a", "x" * 8)
+    cache.put("m", "b", "y" * 8)
+    with cache._conn:
+        cache._conn.execute("UPDATE responses SET last_used = last_used - 10 WHERE response = ?", ("y" * 8,))
+    cache.put("m", "c", "z" * 8)
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == "x" * 8 and cache.get("m", "c") == "z" * 8
+    assert cache.stats["evicted"] == 1
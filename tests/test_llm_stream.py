@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+import pytest
+
+import llm_client
+from llm_cache import LLMCache
+from llm_client import ChatStream
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+
+
+class FakeClient:
+    """
+    ✅ chat.completions.create(stream=True) 흉내: 준비된 응답/예외를 차례로 돌려줌
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        assert kwargs["stream"] is True
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return iter(response)
+
+
+class ApiError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    cache = LLMCache(str(tmp_path / "llm.db"))
+    usage = []
+    monkeypatch.setattr(llm_client, "get_llm_cache", lambda: cache)
+    monkeypatch.setattr(llm_client, "record_usage", lambda model, messages, answer, *a: usage.append(answer))
+    monkeypatch.setattr(llm_client.time, "sleep", lambda s: None)
+
+    def use(client):
+        monkeypatch.setattr(llm_client, "get_client", lambda model: client)
+        return client
+
+    return SimpleNamespace(cache=cache, usage=usage, use=use)
+
+
+def test_streams_pieces_then_caches_full_text(env):
+    client = env.use(FakeClient([_chunk("안녕"), _chunk(None), _chunk("하세요")]))
+
+    stream = ChatStream("질문", model="HCX-005")
+    assert list(stream) == ["안녕", "하세요"]
+    assert stream.text == "안녕하세요" and stream.ttft is not None and not stream.cached
+    assert env.usage == ["안녕하세요"]
+
+    again = ChatStream("질문", model="HCX-005")
+    assert list(again) == ["안녕하세요"]
+    assert again.cached and client.calls == 1
+
+
+def test_retries_only_before_first_token(env):
+    client = env.use(FakeClient(ApiError(429), [_chunk("답")]))
+
+    stream = ChatStream("질문", model="HCX-005", use_cache=False)
+    assert list(stream) == ["답"]
+    assert client.calls == 2
+
+
+def test_error_after_first_token_uses_fallback(env):
+    def broken():
+        yield _chunk("앞부분")
+        raise ApiError(503)
+
+    client = env.use(FakeClient(broken(), [_chunk("다시")]))
+    stream = ChatStream("질문", model="HCX-005", use_cache=False, on_error=lambda e: " (중단됨)")
+
+    assert list(stream) == ["앞부분", " (중단됨)"]
+    assert stream.text == "앞부분 (중단됨)"
+    assert client.calls == 1  # 이미 나간 조각이 있으면 재시도하지 않음
+    assert env.cache.get("HCX-005", "질문") is None
+
+
+def test_error_without_fallback_is_raised(env):
+    env.use(FakeClient(ApiError(400)))
+
+    with pytest.raises(ApiError):
+        list(ChatStream("질문", model="HCX-005", use_cache=False))
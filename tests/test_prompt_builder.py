@@ -0,0 +1,39 @@
+import prompt_builder
+from prompt_builder import compact_context, compact_text, dedupe_texts, disclosure_messages, news_messages
+from text_chunker import estimate_tokens
+
+
+def test_compact_text_keeps_table_tabs():
+    text = "매출   증가  \n\n\n\n항목\t2024\t2023\n"
+
+    assert compact_text(text) == "매출 증가\n\n항목\t2024\t2023"
+
+
+def test_dedupe_keeps_first_of_near_duplicates():
+    a = "삼성전자 3분기 영업이익 9조 원 잠정 집계 시장 예상 상회"
+    b = "삼성전자 3분기 영업이익 9조 원 잠정 집계 시장 예상 상회!"
+    c = "SK하이닉스 HBM 매출 비중 확대"
+
+    assert dedupe_texts([a, b, c]) == [a, c]
+
+
+def test_compact_context_respects_token_budget():
+    hits = [{"text": f"뉴스 {i} " + "실적 발표 내용 " * 50} for i in range(20)]
+
+    context = compact_context(hits, max_tokens=300)
+
+    assert 0 < estimate_tokens(context) <= 300
+
+
+def test_fixed_instructions_are_a_stable_system_prefix():
+    first = news_messages([{"text": "애플 실적 발표"}], max_tokens=500)
+    second = news_messages([{"text": "엔비디아 실적 발표"}], max_tokens=500)
+
+    assert first[0] == second[0] == {"role": "system", "content": prompt_builder.NEWS_SYSTEM_PROMPT}
+    assert "애플" in first[1]["content"] and "애플" not in first[0]["content"]
+
+
+def test_baseline_rule_wording_is_kept():
+    assert "실적 수치는 절대 바꾸지 말고 뉴스에 나온 그대로 유지해." in prompt_builder.NEWS_SYSTEM_PROMPT
+    assert "**절대 표 속 숫자 바꾸지 마!**" in prompt_builder.DISCLOSURE_SYSTEM_PROMPT
+    assert disclosure_messages([{"text": "공시"}], 100)[1]["content"].startswith("**공시 원문 (표 포함)**")
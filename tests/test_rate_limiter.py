@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from rate_limiter import RateLimiter, TokenBucket, backoff_delay, is_retryable, retry_after_seconds
+
+
+def test_bucket_waits_once_capacity_is_spent():
+    bucket = TokenBucket(60)  # 초당 1개
+    now = bucket._updated
+
+    assert all(bucket.reserve(1, now) == 0.0 for _ in range(60))
+    assert bucket.reserve(1, now) == pytest.approx(1.0)
+    assert bucket.reserve(1, now + 10.0) == 0.0
+
+
+@pytest.mark.parametrize("rpm", [0, -5])
+def test_zero_or_negative_rate_is_unlimited(rpm):
+    limiter = RateLimiter(requests_per_minute=rpm, tokens_per_minute=rpm)
+
+    start = time.monotonic()
+    for _ in range(100):
+        with limiter.acquire(tokens=1000):
+            pass
+
+    assert time.monotonic() - start < 1.0
+
+
+def test_concurrency_is_capped():
+    limiter = RateLimiter(requests_per_minute=0, max_concurrency=2)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def call():
+        with limiter.acquire():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert peak[0] == 2
+
+
+def test_penalize_delays_every_caller():
+    limiter = RateLimiter(requests_per_minute=0)
+    limiter.penalize(30)
+
+    assert limiter._reserve(1) > 29
+
+
+def test_invalid_concurrency_is_rejected():
+    with pytest.raises(ValueError):
+        RateLimiter(requests_per_minute=60, max_concurrency=0)
+
+
+class _Error(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_retry_after_drives_backoff():
+    error = _Error(429, {"Retry-After": "7"})
+
+    assert is_retryable(error)
+    assert not is_retryable(_Error(400))
+    assert retry_after_seconds(error) == 7.0
+    assert 7.0 <= backoff_delay(0, retry_after_seconds(error)) <= 8.0
+    assert 0.0 <= backoff_delay(3) <= 8.0
@@ -0,0 +1,74 @@
+import numpy as np
+
+import embedding_service
+import retrieval
+from retrieval import build_context, mmr_select, retrieve_many, rrf_fuse
+
+
+def _unit(*xs):
+    v = np.asarray(xs, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+def test_rrf_rewards_ids_ranked_in_both_lists():
+    fused = rrf_fuse([[1, 2, 3], [3, 4]])
+
+    assert fused[0][0] == 3
+    assert {i for i, _ in fused} == {1, 2, 3, 4}
+
+
+def test_mmr_skips_near_duplicates():
+    vectors = {1: _unit(1, 0), 2: _unit(1, 0.01), 3: _unit(0, 1)}
+    candidates = [(1, 0.9), (2, 0.89), (3, 0.5)]
+
+    assert mmr_select(candidates, vectors, k=2, lambda_=0.5) == [1, 3]
+    assert mmr_select(candidates, vectors, k=2, lambda_=1.0) == [1, 2]
+
+
+def test_build_context_respects_token_budget():
+    count = len  # 1글자 = 1토큰
+    hits = [{"text": "a" * 6}, {"text": "b" * 6}, {"text": "c" * 6}]
+
+    context = build_context(hits, max_tokens=10, count_tokens=count, separator="|")
+
+    assert context == "aaaaaa|bbb"
+    assert build_context(hits, max_tokens=100, count_tokens=count, separator="|") == "aaaaaa|bbbbbb|cccccc"
+
+
+class FakeStore:
+    def __init__(self, results, docs):
+        self.results = results  # 필터 → (scores, ids) 한 행
+        self.docs = docs
+        self.calls = []
+
+    def search(self, query_embs, k, keyword=None, corp=None, source=None):
+        self.calls.append((len(query_embs), keyword))
+        scores, ids = self.results[keyword]
+        return np.tile(scores, (len(query_embs), 1)), np.tile(ids, (len(query_embs), 1))
+
+    def get_docs(self, ids):
+        return {i: self.docs[i] for i in ids if i in self.docs}
+
+
+def test_retrieve_many_groups_by_filter_and_drops_low_scores(monkeypatch):
+    store = FakeStore(
+        results={
+            "삼성": (np.array([0.9, 0.05, 0.0]), np.array([1, 2, -1])),
+            "LG": (np.array([0.8, 0.7, 0.6]), np.array([3, 4, 5])),
+        },
+        docs={i: {"id": i, "text": f"문서 {i}"} for i in range(1, 6)},
+    )
+    monkeypatch.setattr(retrieval, "get_store", lambda: store)
+    monkeypatch.setattr(embedding_service, "encode", lambda texts: np.zeros((len(texts), 4), np.float32))
+
+    results = retrieve_many(
+        [{"query": "실적", "keyword": "삼성"}, {"query": "실적", "keyword": "LG"},
+         {"query": "배당", "keyword": "삼성"}],
+        k=2, min_score=0.1, mmr_lambda=1.0, hybrid=False,
+    )
+
+    assert sorted(store.calls) == [(1, "LG"), (2, "삼성")]  # 같은 필터는 한 번에 검색
+    assert [h["id"] for h in results[0]] == [1]  # 하한 미만 / -1 패딩 제거
+    assert [h["id"] for h in results[1]] == [3, 4]
+    assert results[1][0]["score"] == results[1][0]["vector_score"] and results[1][0]["bm25_score"] is None
+    assert retrieve_many([]) == []
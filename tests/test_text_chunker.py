@@ -0,0 +1,53 @@
+import pytest
+
+from text_chunker import chunk_text, estimate_tokens
+
+
+def test_empty_input_has_no_chunks():
+    assert chunk_text("") == []
+    assert chunk_text(" \n\n ") == []
+
+
+def test_leading_period_does_not_make_empty_chunks():
+    # 예전 chunk_text: '.' 이 0번 위치면 빈 chunk 를 내고 제자리에 머묾
+    text = "." + "매출이 늘었다. " * 200
+
+    chunks = chunk_text(text, max_tokens=100, overlap_tokens=0)
+
+    assert all(c.strip() for c in chunks)
+    assert "".join(c.replace(" ", "") for c in chunks) == text.replace(" ", "")
+
+
+def test_single_oversized_sentence_is_split_under_budget():
+    text = " ".join(["영업이익"] * 500)
+
+    chunks = chunk_text(text, max_tokens=50, overlap_tokens=0)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(c) <= 50 for c in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_table_stays_in_one_chunk():
+    table = "".join(f"항목{i}\t{i * 100}\t{i * 110}\n" for i in range(10))
+    text = "앞 문단입니다.\n" + table + "뒤 문단입니다."
+
+    chunks = chunk_text(text, max_tokens=estimate_tokens(table) + 5, overlap_tokens=0)
+
+    assert any(table.strip() in c for c in chunks)
+
+
+def test_overlap_is_bounded_by_half_the_budget():
+    text = " ".join(f"문장 {i} 입니다." for i in range(300))
+
+    with_default = chunk_text(text, max_tokens=60)  # 기본 overlap 150 > max_tokens
+    no_overlap = chunk_text(text, max_tokens=60, overlap_tokens=0)
+
+    assert len(with_default) <= 2 * len(no_overlap) + 1
+
+
+def test_invalid_budgets_are_rejected():
+    with pytest.raises(ValueError):
+        chunk_text("문장.", max_tokens=0)
+    with pytest.raises(ValueError):
+        chunk_text("문장.", overlap_tokens=-1)
@@ -0,0 +1,133 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+
+import embedding_service
+import vector_store
+
+DIM = 32
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    vectors = {}
+
+    def encode(texts):
+        # 같은 텍스트 → 같은 무작위 벡터
+        return np.vstack([vectors.setdefault(t, rng.standard_normal(DIM).astype(np.float32)) for t in texts])
+
+    monkeypatch.setattr(embedding_service, "encode", encode)
+    monkeypatch.setattr(vector_store, "VECTOR_AUTO_SWITCH", False)
+    s = vector_store.VectorStore(
+        index_path=str(tmp_path / "global.faiss"),
+        db_path=str(tmp_path / "meta.db"),
+        params_path=str(tmp_path / "params.json"),
+    )
+    s.params["flat_max"] = 500
+    s.encode = encode
+    return s
+
+
+def test_add_does_not_switch_on_request_path(store):
+    store.add([f"뉴스 {i}" for i in range(600)], source="news", keyword="bulk")
+
+    assert store.params["kind"] == "flat"
+    assert store.needs_switch()
+
+
+def test_small_filter_is_exact_after_switch(store):
+    store.add([f"뉴스 {i}" for i in range(2000)], source="news", keyword="bulk")
+    wanted = store.add([f"공시 {i}" for i in range(10)], source="disclosure", corp="테스트전자")
+    assert store.switch_index("hnsw")
+    assert store.params["kind"] == "hnsw"
+
+    query = store.encode(["공시 3"])
+    scores, ids = store.search(query, k=12, corp="테스트전자")
+
+    assert set(ids[0][:10]) == set(wanted)
+    assert ids[0][0] == wanted[3]
+    assert list(ids[0][10:]) == [-1, -1]
+
+
+def test_docs_added_after_switch_are_searchable(store):
+    store.add([f"뉴스 {i}" for i in range(600)], source="news")
+    store.switch_index("hnsw")
+    new_id = store.add(["새 공시"], source="disclosure", corp="새기업")[0]
+
+    _, ids = store.search(store.encode(["새 공시"]), k=1)
+
+    assert ids[0][0] == new_id
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return {
+        "index_path": str(tmp_path / "global.faiss"),
+        "db_path": str(tmp_path / "meta.db"),
+        "params_path": str(tmp_path / "params.json"),
+    }
+
+
+def test_adds_are_saved_together_on_flush(store, monkeypatch):
+    monkeypatch.setattr(vector_store, "VECTOR_FLUSH_SECONDS", 3600)
+    for i in range(5):
+        store.add([f"기사 {i}"], source="news")
+
+    assert not os.path.exists(store.index_path)
+    store.flush()
+    assert vector_store.VectorStore(store.index_path, store.db_path, store.params_path).index.ntotal == 5
+
+
+def test_encode_runs_outside_the_lock(store, monkeypatch):
+    acquired = []
+
+    def try_lock():
+        acquired.append(store._lock.acquire(blocking=False))
+        if acquired[-1]:
+            store._lock.release()
+
+    def encode(texts):
+        t = threading.Thread(target=try_lock)
+        t.start()
+        t.join()
+        return store.encode(texts)
+
+    monkeypatch.setattr(embedding_service, "encode", encode)
+    store.add(["잠금 밖 임베딩"])
+
+    assert acquired == [True]
+
+
+def test_vectors_from_other_process_are_not_lost(store, paths, monkeypatch):
+    monkeypatch.setattr(vector_store, "VECTOR_FLUSH_SECONDS", 3600)
+    other = vector_store.VectorStore(**paths)
+    store.add(["A 의 문서"])
+    store.flush()
+    other.add(["B 의 문서"])
+    store.add(["A 의 두 번째 문서"])  # flush 전에 종료된 것처럼 저장 안 함
+    other.flush()
+
+    reopened = vector_store.VectorStore(**paths)
+
+    assert reopened.index.ntotal == 3
+
+
+def test_filter_cache_is_bounded_by_bytes(store, monkeypatch):
+    store.add([f"뉴스 {i}" for i in range(600)], source="news")
+    for c in range(3):
+        store.add([f"공시 {c}-{i}" for i in range(100)], source="disclosure", corp=f"기업{c}")
+    store.switch_index("hnsw")
+    one = 100 * DIM * 4 + 100 * 8
+    store._filter_cache.maxbytes = 2 * one
+
+    for c in range(3):
+        store.search(store.encode([f"공시 {c}-0"]), k=1, corp=f"기업{c}")
+
+    assert store._filter_cache._bytes <= 2 * one
+    assert store._filter_cache.get((None, "기업0", None)) is None
+    assert store._filter_cache.get((None, "기업2", None)) is not None
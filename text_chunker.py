@@ -0,0 +1,160 @@
+# text_chunker.py
+import math
+import re
+
+CHUNK_MAX_TOKENS = 3000
+CHUNK_OVERLAP_TOKENS = 150
+
+# ✅ 문장 경계: 다./요. 등 마침표·물음표 뒤 공백, 또는 줄바꿈 (1.5 같은 소수점은 제외)
+_SENTENCE_END = re.compile(r"[.?!。](?=\s|$)|\n")
+_LINE = re.compile(r"[^\n]*\n?")
+_HANGUL = re.compile(r"[가-힣]")
+
+
+def estimate_tokens(text):
+    """
+    ✅ 토큰 수 추정 (토크나이저 없이)
+    - 한글 음절 ≈ 1.5자당 1토큰, 그 외 ≈ 4자당 1토큰
+    """
+    if not text:
+        return 0
+    hangul = len(_HANGUL.findall(text))
+    return max(1, math.ceil(hangul / 1.5 + (len(text) - hangul) / 4))
+
+
+def get_token_counter():
+    """
+    ✅ tiktoken 이 설치돼 있으면 실제 토크나이저, 없으면 추정치 사용
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return estimate_tokens
+    encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+# ================================
+# ✅ 단위(문장/표) 오프셋 스캔
+# ================================
+def _iter_units(text):
+    """
+    ✅ 텍스트 → (start, end, is_table) 단위 (문자열 복사 없이 오프셋만)
+    - 탭이 들어간 연속된 줄 = 표 → 하나의 단위로 유지
+    - 나머지는 문장 경계로 분리
+    """
+    n = len(text)
+    pos = 0
+    table_start = None
+    prose_start = 0
+    for m in _LINE.finditer(text):
+        if m.start() == m.end():
+            break
+        is_table_line = "\t" in text[m.start():m.end()]
+        if is_table_line and table_start is None:
+            yield from _iter_sentences(text, prose_start, m.start())
+            table_start = m.start()
+        elif not is_table_line and table_start is not None:
+            yield table_start, m.start(), True
+            table_start = None
+            prose_start = m.start()
+        pos = m.end()
+    if table_start is not None:
+        yield table_start, pos, True
+    else:
+        yield from _iter_sentences(text, prose_start, n)
+
+
+def _iter_sentences(text, start, end):
+    last = start
+    for m in _SENTENCE_END.finditer(text, start, end):
+        if m.end() - last > 0 and text[last:m.end()].strip():
+            yield last, m.end(), False
+        last = m.end()
+    if last < end and text[last:end].strip():
+        yield last, end, False
+
+
+def _split_oversized(text, start, end, is_table, max_tokens, count):
+    """
+    ✅ max_tokens 보다 큰 단위 쪼개기
+    - 표: 행(줄) 경계에서만 자름
+    - 문장: 토큰 비율로 창 크기를 잡고 공백 위치에서 자름
+    """
+    if is_table:
+        piece_start, piece_tokens = start, 0
+        for m in _LINE.finditer(text, start, end):
+            if m.start() == m.end():
+                break
+            line_tokens = count(text[m.start():m.end()])
+            if piece_tokens and piece_tokens + line_tokens > max_tokens:
+                yield piece_start, m.start(), True
+                piece_start, piece_tokens = m.start(), 0
+            piece_tokens += line_tokens
+        if piece_start < end:
+            yield piece_start, end, True
+        return
+
+    total = count(text[start:end])
+    window = max(1, int((end - start) * max_tokens / total))
+    pos = start
+    while pos < end:
+        cut = min(end, pos + window)
+        if cut < end:
+            space = text.rfind(" ", pos + window // 2, cut)
+            if space != -1:
+                cut = space + 1
+        yield pos, cut, False
+        pos = cut
+
+
+def iter_chunks(text, max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS,
+                count_tokens=None):
+    """
+    ✅ 선형 시간 chunker (토큰 기준)
+    - 문장/표 단위를 토큰 예산 안에서 채워 넣음 → LLM 호출 수 최소화
+    - 표는 가능한 한 한 chunk 안에 유지
+    - 직전 chunk 끝 문장들을 overlap_tokens 만큼 다음 chunk 앞에 반복
+      (max_tokens 의 절반까지로 제한 → chunk 마다 최소 절반은 새 내용)
+    """
+    if max_tokens <= 0:
+        raise ValueError(f"❌ max_tokens 는 양수여야 함: {max_tokens}")
+    if overlap_tokens < 0:
+        raise ValueError(f"❌ overlap_tokens 는 0 이상이어야 함: {overlap_tokens}")
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+    count = count_tokens or estimate_tokens
+    units = []
+    for start, end, is_table in _iter_units(text):
+        tokens = count(text[start:end])
+        if tokens > max_tokens:
+            for s, e, t in _split_oversized(text, start, end, is_table, max_tokens, count):
+                units.append((s, e, t, count(text[s:e])))
+        else:
+            units.append((start, end, is_table, tokens))
+
+    i = 0
+    while i < len(units):
+        j, used = i, 0
+        while j < len(units) and (j == i or used + units[j][3] <= max_tokens):
+            used += units[j][3]
+            j += 1
+        chunk = text[units[i][0]:units[j - 1][1]].strip()
+        if chunk:
+            yield chunk
+        if j >= len(units):
+            break
+
+        # ✅ overlap: 끝부분 문장(표 제외)을 다음 chunk 시작으로 (항상 앞으로 진행)
+        k, back = j, 0
+        while k - 1 > i and not units[k - 1][2] and back + units[k - 1][3] <= overlap_tokens:
+            back += units[k - 1][3]
+            k -= 1
+        i = k
+
+
+def chunk_text(text, max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS,
+               count_tokens=None):
+    """
+    ✅ 긴 텍스트 → chunk 리스트
+    """
+    return list(iter_chunks(text, max_tokens, overlap_tokens, count_tokens))
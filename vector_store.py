@@ -0,0 +1,733 @@
+# vector_store.py
+import atexit
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# faiss 는 인덱스를 처음 만들거나 읽을 때 함수 안에서 import (앱 시작 시간 단축)
+import embedding_service
+import local_db
+
+STORE_INDEX_PATH = "embeddings/global.faiss"
+STORE_DB_PATH = "embeddings/global_meta.db"
+STORE_PARAMS_PATH = "embeddings/index_params.json"
+
+# ✅ 인덱스 종류 / 전환 기준 (index_params.json 에 저장된 값이 우선)
+DEFAULT_INDEX_PARAMS = {
+    "kind": "flat",             # flat | hnsw | ivfpq
+    "metric": "ip",             # 정규화 벡터 내적 = 코사인 유사도
+    "ann_kind": os.environ.get("VECTOR_ANN_KIND", "hnsw"),
+    "flat_max": int(os.environ.get("VECTOR_FLAT_MAX", "50000")),  # 이 크기 넘으면 ANN 전환
+    "hnsw_m": 32,
+    "ef_construction": 80,
+    "ef_search": 64,
+    "ivf_nlist": 0,             # 0 → 학습 시 4*sqrt(N) 로 자동 결정
+    "pq_m": 0,                  # 0 → dim 을 나누는 값 중 자동 선택
+    "nprobe": 16,
+}
+TRAIN_SAMPLE_MAX = 100_000
+REBUILD_BATCH = 10_000
+# ANN 인덱스에서 허용 문서가 이 수 이하인 필터 검색 → 저장된 벡터로 정확 검색
+# (HNSW/IVF 는 허용 집합이 작으면 그래프/리스트 탐색 중에 거의 못 찾음)
+FILTER_EXACT_MAX = int(os.environ.get("VECTOR_FILTER_EXACT_MAX", "20000"))
+# 1 → flat_max 를 넘으면 백그라운드 스레드에서 ANN 전환, 0 → python vector_store.py --switch 로만
+VECTOR_AUTO_SWITCH = os.environ.get("VECTOR_AUTO_SWITCH", "1") != "0"
+# 추가/삭제 후 인덱스 파일 저장을 이 시간(초)만큼 모아서 한 번에 (0 → 매번 바로 저장)
+VECTOR_FLUSH_SECONDS = float(os.environ.get("VECTOR_FLUSH_SECONDS", "5"))
+FILTER_CACHE_SIZE = 64      # (keyword, corp, source) → 허용 id selector / 정확 검색용 벡터
+# 필터 캐시 전체 메모리 상한 (정확 검색용 벡터 행렬은 항목 하나가 수십 MB 가 될 수 있음)
+FILTER_CACHE_BYTES = int(os.environ.get("VECTOR_FILTER_CACHE_MB", "256")) * 1024 * 1024
+DOC_CACHE_SIZE = 2048       # id → 문서 메타/원문
+
+
+class LRUCache:
+    """
+    ✅ 크기 제한 LRU (스레드 안전)
+    - maxbytes 를 주면 sizeof(value) 합계도 그 이하로 유지 (혼자 넘는 값은 캐시 안 함)
+    """
+
+    def __init__(self, maxsize, maxbytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._sizeof = sizeof or (lambda value: 0)
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key][0]
+
+    def put(self, key, value):
+        size = self._sizeof(value)
+        with self._lock:
+            self._pop(key)
+            if self.maxbytes is not None and size > self.maxbytes:
+                return
+            self._data[key] = (value, size)
+            self._bytes += size
+            while len(self._data) > self.maxsize or (self.maxbytes is not None and self._bytes > self.maxbytes):
+                _, (_, old_size) = self._data.popitem(last=False)
+                self._bytes -= old_size
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def pop(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize(embs):
+    """
+    ✅ L2 정규화 (내적 검색 = 코사인 유사도)
+    """
+    import faiss
+
+    embs = np.ascontiguousarray(np.asarray(embs, dtype=np.float32))
+    if embs.ndim == 1:
+        embs = embs.reshape(1, -1)
+    faiss.normalize_L2(embs)
+    return embs
+
+
+# ================================
+# ✅ 인덱스 팩토리
+# ================================
+def _pick_pq_m(dim):
+    for m in (48, 32, 24, 16, 12, 8, 4):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def build_index(kind, dim, params, train_vectors=None):
+    """
+    ✅ 인덱스 생성 (모두 IndexIDMap2 로 감싸 id 기반 추가/재구성 지원)
+    - flat  : 정확 검색 (소규모)
+    - hnsw  : 그래프 ANN (학습 불필요, 중대형)
+    - ivfpq : 역색인 + 곱양자화 (수백만 이상, 학습 필요)
+    """
+    import faiss
+
+    if kind == "flat":
+        inner = faiss.IndexFlatIP(dim)
+    elif kind == "hnsw":
+        inner = faiss.IndexHNSWFlat(dim, params["hnsw_m"], faiss.METRIC_INNER_PRODUCT)
+        inner.hnsw.efConstruction = params["ef_construction"]
+        inner.hnsw.efSearch = params["ef_search"]
+    elif kind == "ivfpq":
+        n_train = 0 if train_vectors is None else len(train_vectors)
+        nlist = params["ivf_nlist"] or max(1, int(4 * math.sqrt(max(n_train, 1))))
+        # k-means 학습에는 리스트당 최소 39개 벡터가 필요
+        nlist = max(1, min(nlist, n_train // 39 or 1))
+        pq_m = params["pq_m"] or _pick_pq_m(dim)
+        inner = faiss.index_factory(dim, f"IVF{nlist},PQ{pq_m}x8", faiss.METRIC_INNER_PRODUCT)
+        inner.train(train_vectors)
+        faiss.extract_index_ivf(inner).nprobe = params["nprobe"]
+        params["ivf_nlist"], params["pq_m"] = nlist, pq_m
+    else:
+        raise ValueError(f"❌ 지원하지 않는 인덱스 종류: {kind}")
+    return faiss.IndexIDMap2(inner)
+
+
+def search_parameters(kind, params, selector=None):
+    """
+    ✅ 저장된 튜닝값(efSearch/nprobe) + 필터 selector → SearchParameters
+    """
+    import faiss
+
+    if kind == "hnsw":
+        sp = faiss.SearchParametersHNSW()
+        sp.efSearch = params["ef_search"]
+    elif kind == "ivfpq":
+        sp = faiss.SearchParametersIVF()
+        sp.nprobe = params["nprobe"]
+    else:
+        if selector is None:
+            return None
+        sp = faiss.SearchParameters()
+    if selector is not None:
+        sp.sel = selector
+    return sp
+
+
+def _filter_nbytes(flt):
+    # IDSelectorBatch 는 허용 id 를 한 번 더 들고 있음
+    size = flt["allowed"].nbytes * (2 if flt["selector"] is not None else 1)
+    return size + (0 if flt["matrix"] is None else flt["matrix"].nbytes)
+
+
+class VectorStore:
+    """
+    ✅ 전역 벡터 저장소 (키워드/기업별 FAISS 파일 대신 하나로)
+    - FAISS IndexIDMap2 → id 단위 증분 추가/삭제
+    - SQLite 사이드카 테이블 → source, keyword, corp, date, url, 원문, 정규화 벡터
+    - 검색 시 keyword/corp/source 로 필터 (IDSelector)
+    - 코사인(정규화 내적) 기준, 크기가 flat_max 를 넘으면 HNSW/IVF-PQ 로 전환 (백그라운드 / 유지보수 명령)
+    - 인덱스 파일 저장은 VECTOR_FLUSH_SECONDS 단위로 모아서 (flush() 로 즉시 저장)
+    """
+
+    def __init__(self, index_path=STORE_INDEX_PATH, db_path=STORE_DB_PATH,
+                 params_path=STORE_PARAMS_PATH):
+        self.index_path = index_path
+        self.db_path = db_path
+        self.params_path = params_path
+        self._lock = threading.RLock()
+        self._switch_thread = None
+        self._deletes = 0  # 삭제 횟수 (백그라운드 재구성 중 삭제가 있었는지 판단)
+        self._dirty = False  # 메모리 인덱스에 아직 파일로 저장 안 된 변경이 있음
+        self._flush_timer = None
+        self._conn = local_db.connect(db_path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS docs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "text_hash TEXT NOT NULL, text TEXT NOT NULL, "
+                "source TEXT NOT NULL DEFAULT '', keyword TEXT NOT NULL DEFAULT '', "
+                "corp TEXT NOT NULL DEFAULT '', date TEXT NOT NULL DEFAULT '', "
+                "url TEXT NOT NULL DEFAULT '', created_at REAL NOT NULL, vector BLOB, "
+                "UNIQUE (text_hash, source, keyword, corp))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_docs_keyword ON docs(keyword)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_docs_corp ON docs(corp)")
+
+        self._filter_cache = LRUCache(FILTER_CACHE_SIZE, FILTER_CACHE_BYTES, sizeof=_filter_nbytes)
+        self._doc_cache = LRUCache(DOC_CACHE_SIZE)
+        self.params = self._load_params()
+        self.index = None
+        self._index_mtime = None
+        self._read_index()
+
+    # ================================
+    # ✅ 메모리 인덱스 / 캐시 무효화
+    # ================================
+    def _index_file_mtime(self):
+        # os.replace 로 저장 → 저장마다 inode 가 바뀜 (mtime 해상도보다 빠른 연속 저장도 구분)
+        try:
+            st = os.stat(self.index_path)
+            return st.st_ino, st.st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _read_index(self):
+        """
+        ✅ 인덱스 파일 읽기 + SQLite 에는 있는데 파일에 없는 벡터 보충
+        - 저장 전에 종료됐거나, 다른 프로세스가 저장하면서 덮어쓴 벡터도 다시 들어감
+        """
+        import faiss
+
+        self._index_mtime = self._index_file_mtime()
+        self.index = faiss.read_index(self.index_path) if self._index_mtime is not None else None
+        self._filter_cache.clear()
+        self._doc_cache.clear()
+        self._add_missing_vectors()
+
+    def _add_missing_vectors(self):
+        import faiss
+
+        if self.index is None:
+            self.index, _ = self._build_from_db(self.params["kind"], self._conn, self.params)
+            self._dirty = self.index is not None
+            return
+        stored = np.asarray([r[0] for r in self._conn.execute("SELECT id FROM docs WHERE vector IS NOT NULL")],
+                            dtype=np.int64)
+        missing = np.setdiff1d(stored, faiss.vector_to_array(self.index.id_map))
+        for start in range(0, len(missing), REBUILD_BATCH):
+            vectors = self.get_vectors(missing[start:start + REBUILD_BATCH])
+            self.index.add_with_ids(np.vstack(list(vectors.values())), np.asarray(list(vectors), dtype=np.int64))
+            self._dirty = True
+
+    def _reload_locked(self):
+        if self._index_file_mtime() == self._index_mtime:
+            return False
+        self.params = self._load_params()
+        self._read_index()
+        return True
+
+    def reload_if_changed(self):
+        """
+        ✅ 다른 프로세스가 인덱스 파일을 바꿨을 때만 다시 읽음 (mtime 비교)
+        - 같은 프로세스 안에서는 메모리 인덱스를 그대로 사용
+        - 아직 저장 안 된 이 프로세스의 벡터는 SQLite 에서 다시 보충
+        """
+        with self._lock:
+            return self._reload_locked()
+
+    # ================================
+    # ✅ 파라미터 / 저장
+    # ================================
+    def _load_params(self):
+        params = dict(DEFAULT_INDEX_PARAMS)
+        if os.path.exists(self.params_path):
+            with open(self.params_path, "r", encoding="utf-8") as f:
+                params.update(json.load(f))
+        return params
+
+    def save_params(self):
+        os.makedirs(os.path.dirname(self.params_path), exist_ok=True)
+        with open(self.params_path, "w", encoding="utf-8") as f:
+            json.dump(self.params, f, ensure_ascii=False, indent=2)
+
+    def tune(self, ef_search=None, nprobe=None):
+        """
+        ✅ 검색 정확도/속도 튜닝값 변경 + 저장 (벤치마크 결과 반영용)
+        """
+        with self._lock:
+            if ef_search is not None:
+                self.params["ef_search"] = int(ef_search)
+            if nprobe is not None:
+                self.params["nprobe"] = int(nprobe)
+            self.save_params()
+
+    def _save(self):
+        import faiss
+
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        faiss.write_index(self.index, tmp_path)
+        os.replace(tmp_path, self.index_path)
+        self._index_mtime = self._index_file_mtime()
+        self._dirty = False
+        self.save_params()
+
+    def flush(self):
+        """
+        ✅ 저장 안 된 변경을 인덱스 파일로 (배치 작업 끝 / 종료 시 / 타이머)
+        - 그 사이 다른 프로세스가 파일을 바꿨으면 먼저 읽어 합친 뒤 저장
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._reload_locked()
+            if self._dirty and self.index is not None:
+                self._save()
+
+    def _schedule_flush(self):
+        """
+        ✅ 변경 후 VECTOR_FLUSH_SECONDS 뒤에 한 번 저장 (그 사이 추가는 같은 저장에 포함)
+        """
+        if VECTOR_FLUSH_SECONDS <= 0:
+            self.flush()
+            return
+        with self._lock:
+            if self._flush_timer is not None:
+                return
+            self._flush_timer = threading.Timer(VECTOR_FLUSH_SECONDS, self._flush_on_timer)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush_on_timer(self):
+        with self._lock:
+            self._flush_timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"⚠️ 벡터 인덱스 저장 실패: {e}")
+
+    def __len__(self):
+        return 0 if self.index is None else self.index.ntotal
+
+    # ================================
+    # ✅ 재구성 (HNSW 삭제 / 인덱스 전환)
+    # ================================
+    def _iter_vectors(self, conn, after_id=-1):
+        last_id = after_id
+        while True:
+            rows = conn.execute(
+                "SELECT id, vector FROM docs WHERE vector IS NOT NULL AND id > ? ORDER BY id LIMIT ?",
+                (last_id, REBUILD_BATCH),
+            ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            ids = np.asarray([r[0] for r in rows], dtype=np.int64)
+            vecs = np.vstack([np.frombuffer(r[1], dtype=np.float32) for r in rows])
+            yield ids, vecs
+
+    def _train_sample(self, conn):
+        rows = conn.execute(
+            "SELECT vector FROM docs WHERE vector IS NOT NULL ORDER BY RANDOM() LIMIT ?",
+            (TRAIN_SAMPLE_MAX,),
+        ).fetchall()
+        return np.vstack([np.frombuffer(r[0], dtype=np.float32) for r in rows])
+
+    def _build_from_db(self, kind, conn, params):
+        """
+        ✅ SQLite 에 저장된 정규화 벡터로 새 인덱스 구성 → (인덱스 또는 None, 마지막 id)
+        """
+        first = conn.execute("SELECT vector FROM docs WHERE vector IS NOT NULL LIMIT 1").fetchone()
+        if first is None:
+            return None, -1
+        dim = len(np.frombuffer(first[0], dtype=np.float32))
+        train = self._train_sample(conn) if kind == "ivfpq" else None
+        index = build_index(kind, dim, params, train_vectors=train)
+        last_id = -1
+        for ids, vecs in self._iter_vectors(conn):
+            index.add_with_ids(vecs, ids)
+            last_id = int(ids[-1])
+        return index, last_id
+
+    def _rebuild(self, kind):
+        """
+        ✅ 저장된 벡터로 인덱스 새로 구성 (잠금 안에서, HNSW 삭제용)
+        """
+        start = time.perf_counter()
+        self.index, _ = self._build_from_db(kind, self._conn, self.params)
+        self.params["kind"] = kind
+        self._filter_cache.clear()
+        if self.index is None:
+            self.save_params()
+            return
+        self._save()
+        print(f"✅ 벡터 인덱스 재구성: {kind} ({self.index.ntotal}건, {time.perf_counter() - start:.1f}s)")
+
+    def needs_switch(self):
+        return self.params["kind"] == "flat" and len(self) > self.params["flat_max"]
+
+    def switch_index(self, kind=None):
+        """
+        ✅ ANN 인덱스로 전환 (유지보수 단계 / 백그라운드 스레드에서 호출)
+        - 학습/추가는 잠금 밖에서 별도 SQLite 연결로 → 그동안 검색/추가는 기존 flat 인덱스로 계속
+        - 끝나면 잠금 안에서 그 사이 추가된 벡터만 더 넣고 교체
+        - 그 사이 삭제가 있었으면 결과를 버림 (다음 전환 때 다시)
+        """
+        kind = kind or self.params["ann_kind"]
+        start = time.perf_counter()
+        with self._lock:
+            deletes = self._deletes
+            params = dict(self.params)
+        conn = local_db.connect(self.db_path)
+        try:
+            index, last_id = self._build_from_db(kind, conn, params)
+        finally:
+            conn.close()
+        if index is None:
+            return False
+
+        with self._lock:
+            if self._deletes != deletes:
+                print("⚠️ 인덱스 전환 중 문서가 삭제되어 전환을 취소합니다.")
+                return False
+            for ids, vecs in self._iter_vectors(self._conn, after_id=last_id):
+                index.add_with_ids(vecs, ids)
+            self.index = index
+            self.params.update({k: params[k] for k in ("ivf_nlist", "pq_m")})
+            self.params["kind"] = kind
+            self._filter_cache.clear()
+            self._save()
+        print(f"✅ 벡터 인덱스 전환: {kind} ({index.ntotal}건, {time.perf_counter() - start:.1f}s)")
+        return True
+
+    def _schedule_switch(self):
+        """
+        ✅ flat 이 flat_max 를 넘으면 전환을 데몬 스레드로 (추가한 요청은 바로 반환)
+        """
+        if not VECTOR_AUTO_SWITCH or not self.needs_switch():
+            return
+        if self._switch_thread is not None and self._switch_thread.is_alive():
+            return
+
+        def run():
+            try:
+                self.switch_index()
+            except Exception as e:
+                print(f"⚠️ 벡터 인덱스 전환 실패: {e}")
+
+        self._switch_thread = threading.Thread(target=run, name="vector-index-switch", daemon=True)
+        self._switch_thread.start()
+
+    # ================================
+    # ✅ 추가 / 삭제
+    # ================================
+    def add(self, docs, source="", keyword="", corp="", date="", urls=None):
+        """
+        ✅ 문서 추가 (같은 source/keyword/corp 안의 동일 텍스트는 재사용)
+        - 임베딩 계산은 잠금 밖에서 → 그동안 다른 스레드의 검색이 막히지 않음
+        - 인덱스 파일 저장은 _schedule_flush 로 모아서
+        - 반환: docs 와 같은 순서의 id 리스트
+        """
+        urls = urls or [""] * len(docs)
+        hashes = [text_hash(doc) for doc in docs]
+        with self._lock:
+            known = self._existing_ids(set(hashes), source, keyword, corp)
+        pending = {}
+        for h, doc, url in zip(hashes, docs, urls):
+            if h not in known and h not in pending:
+                pending[h] = (doc, url or "")
+        if not pending:
+            return [known[h] for h in hashes]
+
+        embs = normalize(embedding_service.encode([doc for doc, _ in pending.values()]))
+        now = time.time()
+        with self._lock:
+            self._reload_locked()
+            new_ids, new_embs = [], []
+            with self._conn:
+                for (h, (doc, url)), emb in zip(pending.items(), embs):
+                    # 임베딩 계산 중 다른 스레드가 같은 문서를 넣었으면 그 id 사용
+                    row = self._conn.execute(
+                        "SELECT id FROM docs WHERE text_hash = ? AND source = ? AND keyword = ? AND corp = ?",
+                        (h, source, keyword, corp),
+                    ).fetchone()
+                    if row:
+                        known[h] = row[0]
+                        continue
+                    cur = self._conn.execute(
+                        "INSERT INTO docs (text_hash, text, source, keyword, corp, date, url, created_at, vector) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (h, doc, source, keyword, corp, date, url, now, emb.tobytes()),
+                    )
+                    known[h] = cur.lastrowid
+                    new_ids.append(cur.lastrowid)
+                    new_embs.append(emb)
+
+            if new_ids:
+                if self.index is None:
+                    self.index = build_index("flat", embs.shape[1], self.params)
+                    self.params["kind"] = "flat"
+                self.index.add_with_ids(np.vstack(new_embs), np.asarray(new_ids, dtype=np.int64))
+                self._dirty = True
+                self._filter_cache.clear()
+        if new_ids:
+            self._schedule_flush()
+            self._schedule_switch()
+        return [known[h] for h in hashes]
+
+    def _existing_ids(self, hashes, source, keyword, corp):
+        """
+        ✅ 이미 저장된 텍스트 해시 → id
+        """
+        found = {}
+        for h in hashes:
+            row = self._conn.execute(
+                "SELECT id FROM docs WHERE text_hash = ? AND source = ? AND keyword = ? AND corp = ?",
+                (h, source, keyword, corp),
+            ).fetchone()
+            if row:
+                found[h] = row[0]
+        return found
+
+    def delete(self, ids):
+        ids = [int(i) for i in ids]
+        if not ids:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.executemany("DELETE FROM docs WHERE id = ?", [(i,) for i in ids])
+            self._deletes += 1
+            self._filter_cache.clear()
+            for i in ids:
+                self._doc_cache.pop(i)
+            if self.index is None:
+                return
+            try:
+                self.index.remove_ids(np.asarray(ids, dtype=np.int64))
+            except RuntimeError:
+                # HNSW 는 개별 삭제 미지원 → 남은 벡터로 재구성
+                self._rebuild(self.params["kind"])
+                return
+            self._dirty = True
+        self._schedule_flush()
+
+    # ================================
+    # ✅ 조회 / 검색
+    # ================================
+    def filter_ids(self, keyword=None, corp=None, source=None):
+        clauses, params = [], []
+        for col, val in (("keyword", keyword), ("corp", corp), ("source", source)):
+            if val is not None:
+                clauses.append(f"{col} = ?")
+                params.append(val)
+        sql = "SELECT id FROM docs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return [r[0] for r in self._conn.execute(sql, params)]
+
+    def version(self):
+        """
+        ✅ 문서 집합 버전 (개수, 최대 id) → 추가/삭제되면 바뀜 (BM25 인덱스 증분 추가/재구성 판단용)
+        """
+        with self._lock:
+            return tuple(self._conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM docs").fetchone())
+
+    def iter_texts(self, after_id=-1):
+        """
+        ✅ 문서 (id, text) 를 id 순으로 배치 스트리밍 (after_id 보다 큰 id 만)
+        """
+        last_id = after_id
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, text FROM docs WHERE id > ? ORDER BY id LIMIT ?", (last_id, REBUILD_BATCH)
+                ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield from rows
+
+    def _filter(self, keyword=None, corp=None, source=None):
+        """
+        ✅ 필터 조건 → {"allowed": id 배열, "selector": IDSelectorBatch, "matrix": 정확 검색용 벡터}
+        - LRU 캐시, 추가/삭제/인덱스 교체 시 무효화
+        - 반환 None: 필터 없음 / allowed 가 빈 배열: 해당 문서 없음
+        - ANN 인덱스 + 허용 문서 FILTER_EXACT_MAX 이하 → selector 대신 저장된 벡터 행렬
+        """
+        import faiss
+
+        if keyword is None and corp is None and source is None:
+            return None
+        key = (keyword, corp, source)
+        cached = self._filter_cache.get(key)
+        if cached is None:
+            allowed = np.asarray(self.filter_ids(keyword=keyword, corp=corp, source=source),
+                                 dtype=np.int64)
+            cached = {"allowed": allowed, "selector": None, "matrix": None}
+            if len(allowed) and self.params["kind"] != "flat" and len(allowed) <= FILTER_EXACT_MAX:
+                vectors = self.get_vectors(allowed)
+                cached["allowed"] = np.asarray(list(vectors), dtype=np.int64)
+                if vectors:
+                    cached["matrix"] = np.vstack(list(vectors.values()))
+            elif len(allowed):
+                cached["selector"] = faiss.IDSelectorBatch(allowed)
+            self._filter_cache.put(key, cached)
+        return cached
+
+    @staticmethod
+    def _exact_search(query_embs, matrix, ids, k):
+        """
+        ✅ 허용 문서 벡터만으로 정확한 내적 top-k (FAISS 와 같은 (scores, ids) 모양)
+        """
+        scores = np.full((len(query_embs), k), -np.inf, dtype=np.float32)
+        out = np.full((len(query_embs), k), -1, dtype=np.int64)
+        sims = query_embs @ matrix.T
+        top = min(k, len(ids))
+        part = np.argpartition(-sims, top - 1, axis=1)[:, :top]
+        for r in range(len(query_embs)):
+            order = part[r][np.argsort(-sims[r, part[r]])]
+            scores[r, :top] = sims[r, order]
+            out[r, :top] = ids[order]
+        return scores, out
+
+    def get_docs(self, ids):
+        """
+        ✅ id → {"id", "text", "source", "keyword", "corp", "date", "url"}
+        - 최근 조회 문서는 메모리 LRU 에서 바로 반환
+        """
+        ids = [int(i) for i in ids if i >= 0]
+        found = {}
+        missing = []
+        for i in ids:
+            doc = self._doc_cache.get(i)
+            if doc is None:
+                missing.append(i)
+            else:
+                found[i] = doc
+        if not missing:
+            return found
+        marks = ",".join("?" * len(missing))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, text, source, keyword, corp, date, url FROM docs WHERE id IN ({marks})",
+                missing,
+            ).fetchall()
+        cols = ("id", "text", "source", "keyword", "corp", "date", "url")
+        for r in rows:
+            doc = dict(zip(cols, r))
+            self._doc_cache.put(r[0], doc)
+            found[r[0]] = doc
+        return found
+
+    def get_vectors(self, ids):
+        """
+        ✅ id → 정규화된 임베딩 (저장된 벡터, 없는 id 는 빠짐)
+        """
+        ids = [int(i) for i in ids if i >= 0]
+        if not ids:
+            return {}
+        marks = ",".join("?" * len(ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, vector FROM docs WHERE vector IS NOT NULL AND id IN ({marks})", ids
+            ).fetchall()
+        return {r[0]: np.frombuffer(r[1], dtype=np.float32) for r in rows}
+
+    def search(self, query_embs, k=1, keyword=None, corp=None, source=None):
+        """
+        ✅ 코사인 유사도 검색 → (scores, ids)  (결과가 k보다 적으면 id = -1)
+        """
+        query_embs = normalize(query_embs)
+        empty = (
+            np.full((len(query_embs), k), -np.inf, dtype=np.float32),
+            np.full((len(query_embs), k), -1, dtype=np.int64),
+        )
+        with self._lock:
+            if self.index is None or self.index.ntotal == 0:
+                return empty
+
+            flt = self._filter(keyword=keyword, corp=corp, source=source)
+            if flt is not None and not len(flt["allowed"]):
+                return empty
+            if flt is not None and flt["matrix"] is not None:
+                return self._exact_search(query_embs, flt["matrix"], flt["allowed"], k)
+            params = search_parameters(self.params["kind"], self.params, flt and flt["selector"])
+            return self.index.search(query_embs, k, params=params)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    ✅ 프로세스 공용 벡터 저장소 (메모리 상주)
+    - 인덱스 빌더가 추가한 벡터를 검색이 그대로 사용 → 디스크 재읽기 없음
+    - 다른 워커 프로세스가 파일을 갱신했으면 mtime 으로 감지해 다시 읽음
+    - 종료 시 저장 안 된 변경을 flush
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = VectorStore()
+                atexit.register(_store.flush)
+                return _store
+    _store.reload_if_changed()
+    return _store
+
+
+# ANN 인덱스 전환 (유지보수): python vector_store.py --switch [--kind hnsw|ivfpq]
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--switch", action="store_true", help="flat_max 와 상관없이 ANN 인덱스로 전환")
+    parser.add_argument("--kind", choices=["hnsw", "ivfpq"], default=None)
+    args = parser.parse_args()
+
+    store = VectorStore()
+    print(f"현재 인덱스: {store.params['kind']} ({len(store)}건, flat_max={store.params['flat_max']})")
+    if args.switch or store.needs_switch():
+        store.switch_index(args.kind)